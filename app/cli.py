@@ -0,0 +1,99 @@
+"""
+Command-line tools
+Run: python -m app.cli compile-corpus [--data-dir data] [--output .cache/corpus/corpus.snapshot]
+     python -m app.cli build-embeddings [--embedder hashing|openai] [--output .cache/embeddings/sections.npy]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+from app.services.corpus_snapshot import DEFAULT_SNAPSHOT_PATH, write_snapshot
+from app.services.corpus_validation import DATA_FILES, validate_corpus
+from app.services.semantic_index import DEFAULT_INDEX_PATH
+
+
+def compile_corpus(args: argparse.Namespace) -> int:
+    """Validate data/*.json and write the corpus snapshot DataLoader starts from"""
+    from app.services.data_loader import DataLoader
+
+    data_dir = Path(args.data_dir)
+    data = {}
+    for name in DATA_FILES:
+        try:
+            with open(data_dir / name, "r", encoding="utf-8") as f:
+                data[name] = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"error: {name}: {e}", file=sys.stderr)
+            return 1
+
+    errors, warnings = validate_corpus(data)
+    for warning in warnings:
+        print(f"warning: {warning}", file=sys.stderr)
+    for error in errors:
+        print(f"error: {error}", file=sys.stderr)
+    if errors:
+        print(f"{len(errors)} errors; snapshot not written", file=sys.stderr)
+        return 1
+    del data
+
+    started = time.perf_counter()
+    loader = DataLoader(str(data_dir), text_blob_dir=None, snapshot_path=None)
+    info = write_snapshot(loader, args.output)
+    print(
+        f"wrote {args.output}: {info['bytes'] / 1024:.0f} KiB "
+        f"(payload {info['payload_bytes'] / 1024:.0f} KiB, text {info['text_bytes'] / 1024:.0f} KiB), "
+        f"{sum(len(s) for s in loader.sections.values())} sections, "
+        f"source version {info['source_version']}, {time.perf_counter() - started:.2f}s"
+    )
+    return 0
+
+
+def build_embeddings(args: argparse.Namespace) -> int:
+    """Embed every section's title and summary into the semantic search index"""
+    from app.services.data_loader import DataLoader
+    from app.services.semantic_index import build_index, make_embedder, write_index
+
+    settings = None
+    if args.embedder != "hashing":
+        from app.config import get_settings
+
+        settings = get_settings()
+    embedder = make_embedder(args.embedder or settings.semantic_embedder, settings)
+
+    started = time.perf_counter()
+    loader = DataLoader(args.data_dir, text_blob_dir=None)
+    index, fingerprint = build_index(loader, embedder)
+    info = write_index(index, fingerprint, args.output)
+    print(
+        f"wrote {args.output}: {info['rows']} sections x {info['dim']} dims ({info['bytes'] / 1024:.0f} KiB), "
+        f"embedder {info['embedder']}, fingerprint {info['fingerprint']}, {time.perf_counter() - started:.2f}s"
+    )
+    return 0
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compile_parser = commands.add_parser("compile-corpus", help=compile_corpus.__doc__)
+    compile_parser.add_argument("--data-dir", default="data")
+    compile_parser.add_argument("--output", default=DEFAULT_SNAPSHOT_PATH)
+    compile_parser.set_defaults(handler=compile_corpus)
+
+    embeddings_parser = commands.add_parser("build-embeddings", help=build_embeddings.__doc__)
+    embeddings_parser.add_argument("--data-dir", default="data")
+    embeddings_parser.add_argument("--embedder", choices=("hashing", "openai"),
+                                   help="default: SEMANTIC_EMBEDDER (openai)")
+    embeddings_parser.add_argument("--output", default=DEFAULT_INDEX_PATH)
+    embeddings_parser.set_defaults(handler=build_embeddings)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
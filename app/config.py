@@ -22,11 +22,76 @@ class Settings(BaseSettings):
     # OpenAI
     openai_api_key: str
     openai_model: str = "gpt-5.1-chat-latest"  # GPT-5.1 Chat for production
+    openai_base_url: str = ""  # Override API endpoint (e.g. local stand-in for load tests)
+    openai_timeout_seconds: float = 120.0
+    openai_max_connections: int = 100  # Pooled keep-alive connections per worker
+
+    # Context assembly (history sent to the model)
+    context_budget_tokens: int = 6000  # Summary + history budget, system prompt excluded
+    context_keep_turns: int = 3  # Most recent turns always sent verbatim
+    context_summary_model: str = ""  # Model for rolling summaries (default: openai_model)
 
     # Supabase (optional - will use in-memory storage if not provided)
     supabase_url: str = ""
     supabase_key: str = ""
 
+    # Write-behind writer for conversation/analytics inserts
+    write_behind_enabled: bool = True
+    write_behind_max_queue: int = 10000  # Queued writes before callers fall back to direct inserts
+    write_behind_batch_size: int = 100
+    write_behind_flush_interval_ms: int = 1000  # Max wait for batched analytics rows
+    write_behind_max_retries: int = 5
+    write_behind_max_retry_seconds: float = 3.0  # Total backoff per failing batch before per-group fallback
+
+    # Profile cache (skips get_or_create_profile for known profiles)
+    profile_cache_size: int = 100000
+    profile_cache_ttl_seconds: int = 3600
+    profile_touch_interval_seconds: int = 60  # Debounce window for last_active bulk updates
+
+    # Session history cache (per process; keep the TTL short with multiple workers)
+    history_cache_enabled: bool = True
+    history_cache_max_mb: int = 64
+    history_cache_max_messages: int = 50
+    history_cache_ttl_seconds: int = 30  # Max age since the last database fetch (per process; raise for 1 worker or sticky sessions)
+
+    # In-memory conversation store (only when Supabase isn't configured)
+    memory_store_max_mb: int = 64
+    memory_store_max_messages: int = 200  # Per session; oldest dropped first
+    memory_store_ttl_seconds: int = 86400  # Idle sessions dropped after this
+
+    # Tool execution (a round's calls run concurrently; serialized results are memoized)
+    tool_executor_workers: int = 4
+    tool_result_cache_size: int = 256  # Distinct (tool, arguments) results kept; 0 = off
+    # Per-tool result budgets in estimated tokens (tool messages are resent on every later call); 0 = no limit
+    tool_budget_legal_knowledge_tokens: int = 4000
+    tool_budget_procedural_guidance_tokens: int = 6000
+    tool_budget_search_tokens: int = 8000
+
+    # Corpus hot reload (POST /admin/reload-corpus, or watch data/*.json)
+    corpus_reload_interval_seconds: float = 0  # Seconds between data file checks; 0 = no watcher
+
+    # Semantic search (search_legal_sections mode="semantic")
+    semantic_embedder: str = "openai"  # "openai" or "hashing" (local lexical stand-in for tests and benchmarks)
+    semantic_embedding_model: str = "text-embedding-3-small"  # openai embedder only
+    semantic_index_path: str = ".cache/embeddings/sections.npy"  # built at startup/reload if missing or stale
+
+    # Local intent classifier: on confident first turns, run the intent tools before the first GPT call
+    intent_fast_path_enabled: bool = False
+    intent_fast_path_min_score: float = 0.42  # Tune with benchmarks/intent_agreement.py
+    intent_fast_path_min_margin: float = 0.1
+
+    # First-turn response cache (answers to opening questions, keyed by normalized text)
+    response_cache_enabled: bool = False
+    response_cache_backend: str = "memory"  # "memory" (per process) or "disk" (shared on one host)
+    response_cache_dir: str = ".cache/responses"
+    response_cache_ttl_seconds: int = 86400
+    response_cache_max_entries: int = 1000
+
+    # Admin/debug endpoints (/stats); empty = only available when DEBUG is on
+    admin_token: str = ""
+    slow_turns_kept: int = 500  # Recent turn waterfalls kept for /debug/slow-turns
+    metrics_token: str = ""  # Bearer token for /metrics; empty = open (keep it off the public internet)
+
     # CORS
     cors_origins: list[str] = ["*"]  # In production, specify allowed origins
 
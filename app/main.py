@@ -3,12 +3,17 @@ Main FastAPI application
 Family Law Assistant for Bangladeshi Women
 """
 
+import asyncio
+import json
+import secrets
 import time
-from contextlib import asynccontextmanager
+from contextlib import aclosing, asynccontextmanager
+from datetime import datetime, timezone
+from typing import Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 import uuid
 import structlog
 
@@ -19,10 +24,18 @@ from app.models import (
     NewSessionRequest,
     NewSessionResponse,
     HealthResponse,
+    HistoryPageResponse,
 )
+from app.services.context_builder import SUMMARY_METADATA_KEY as CONTEXT_SUMMARY_KEY
+from app.services.corpus_reload import get_corpus_reloader
 from app.services.data_loader import get_data_loader
-from app.services.llm_service import get_llm_service
+from app.services.llm_service import get_llm_service, close_llm_service
+from app.services.metrics import REGISTRY, REQUEST_SECONDS, TURNS
+from app.services.response_cache import get_response_cache
+from app.services.semantic_index import prepare_semantic_index
 from app.services.supabase_service import get_supabase_service
+from app.services.tool_executor import close_tool_executor, get_tool_executor
+from app.services.turn_timings import TurnTimings, end_turn, get_recent_turns, record_span, start_turn
 
 # Initialize settings and logger
 settings = get_settings()
@@ -37,6 +50,9 @@ async def lifespan(app: FastAPI):
     # Pre-load data
     get_data_loader()
     logger.info("data_loaded")
+    await get_corpus_reloader().start()
+    # Load (or build) the semantic index off the event loop; semantic mode is unavailable until it is ready
+    semantic_index_task = asyncio.create_task(asyncio.to_thread(prepare_semantic_index, get_data_loader()))
 
     # Initialize LLM service
     try:
@@ -47,14 +63,25 @@ async def lifespan(app: FastAPI):
 
     # Initialize Supabase
     supabase_service = get_supabase_service()
+    try:
+        await supabase_service.connect()
+    except Exception as e:
+        logger.warning("supabase_connect_warning", error=str(e))
     if supabase_service.client:
         logger.info("supabase_connected")
     else:
         logger.warning("supabase_not_configured", message="Using in-memory storage")
+    await supabase_service.start_background_tasks()
 
     yield
 
     logger.info("app_shutting_down", app=settings.app_name)
+    await get_corpus_reloader().stop()
+    semantic_index_task.cancel()
+    # Flush queued conversation/analytics writes and last_active updates before exiting
+    await supabase_service.stop_background_tasks()
+    await close_llm_service()
+    close_tool_executor()
 
 
 # Create FastAPI app
@@ -86,6 +113,66 @@ async def health_check():
     )
 
 
+def verify_admin(x_admin_token: Optional[str] = Header(None)):
+    """Guard for admin/debug endpoints: ADMIN_TOKEN header, or DEBUG mode if no token is set."""
+    if settings.admin_token:
+        if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.admin_token):
+            raise HTTPException(status_code=403, detail="Forbidden")
+    elif not settings.debug:
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+def verify_metrics(authorization: Optional[str] = Header(None)):
+    """Guard for /metrics: `Authorization: Bearer <METRICS_TOKEN>` when a token is set, open otherwise."""
+    if settings.metrics_token:
+        expected = f"Bearer {settings.metrics_token}"
+        if not authorization or not secrets.compare_digest(authorization, expected):
+            raise HTTPException(status_code=403, detail="Forbidden")
+
+
+@app.get("/metrics", dependencies=[Depends(verify_metrics)])
+async def metrics():
+    """Prometheus scrape endpoint (this worker's latency histograms and counters)."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/stats", dependencies=[Depends(verify_admin)])
+async def stats():
+    """In-process performance counters (write-behind queue, caches, tool execution)."""
+    supabase_service = get_supabase_service()
+    response_cache = get_response_cache()
+    return {
+        "write_behind": supabase_service.writer.stats() if supabase_service.writer else None,
+        "profile_cache": supabase_service.profile_cache.stats(),
+        "history_cache": supabase_service.history_cache.stats() if supabase_service.history_cache else None,
+        "memory_store": supabase_service.memory_store.stats() if supabase_service.memory_store else None,
+        "response_cache": response_cache.stats() if response_cache else None,
+        "tools": get_tool_executor().stats(),
+        "corpus": get_corpus_reloader().stats(),
+    }
+
+
+# HTTP status per reload outcome; the report is the body either way
+_RELOAD_STATUS_CODES = {"reloaded": 200, "unchanged": 200, "in_progress": 409, "rejected": 422, "failed": 500}
+
+
+@app.post("/admin/reload-corpus", dependencies=[Depends(verify_admin)])
+async def reload_corpus():
+    """
+    Rebuild the legal corpus from data/*.json and swap it in (this worker only).
+    Returns the reload report: status, duration_ms, changed sections or validation errors.
+    """
+    report = await asyncio.to_thread(get_corpus_reloader().reload, "admin")
+    return JSONResponse(status_code=_RELOAD_STATUS_CODES[report["status"]], content=report)
+
+
+@app.get("/debug/slow-turns", dependencies=[Depends(verify_admin)])
+async def slow_turns(limit: int = Query(20, ge=1, le=200)):
+    """Slowest recent turns in this worker, with their timing waterfalls."""
+    recent_turns = get_recent_turns()
+    return {"turns_kept": len(recent_turns), "turns": recent_turns.slowest(limit)}
+
+
 @app.post("/chat/new", response_model=NewSessionResponse)
 async def create_new_session(request: NewSessionRequest = NewSessionRequest()):
     """
@@ -98,7 +185,7 @@ async def create_new_session(request: NewSessionRequest = NewSessionRequest()):
 
     # Ensure profile exists in Supabase
     supabase_service = get_supabase_service()
-    supabase_service.ensure_profile(profile_id)
+    await supabase_service.ensure_profile(profile_id)
 
     return NewSessionResponse(
         profile_id=profile_id,
@@ -107,33 +194,170 @@ async def create_new_session(request: NewSessionRequest = NewSessionRequest()):
     )
 
 
+@app.get("/chat/history", response_model=HistoryPageResponse)
+async def chat_history(
+    session_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    before_cursor: Optional[str] = None,
+):
+    """
+    Page back through a session's history.
+    Returns the latest page by default; pass next_cursor as before_cursor for older pages.
+    """
+    try:
+        page = await get_supabase_service().get_history_page(
+            session_id=session_id,
+            limit=limit,
+            before_cursor=before_cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return HistoryPageResponse(session_id=session_id, **page)
+
+
+def _detect_intent(tools_used: list[dict]) -> Optional[str]:
+    """Detect intent from the first get_legal_knowledge call, if any."""
+    for tool_use in tools_used:
+        args = tool_use["args"]
+        if tool_use["tool"] == "get_legal_knowledge" and isinstance(args, dict) and isinstance(args.get("intent"), str):
+            return args["intent"]
+    return None
+
+
+async def _persist_turn(
+    profile_id: str,
+    session_id: str,
+    user_message: str,
+    result: dict,
+    start_time: float,
+    timings: TurnTimings,
+) -> Optional[str]:
+    """
+    Store both sides of a completed turn and log its analytics.
+
+    Returns:
+        The detected intent (if any)
+    """
+    supabase_service = get_supabase_service()
+
+    # Store user message and assistant response (queued for the background writer)
+    started = time.perf_counter()
+    await supabase_service.store_turn(
+        profile_id=profile_id,
+        session_id=session_id,
+        user_content=user_message,
+        assistant_content=result["response"],
+        user_created_at=datetime.fromtimestamp(start_time, tz=timezone.utc),
+        assistant_metadata=(
+            {CONTEXT_SUMMARY_KEY: result["context_summary"]} if result.get("context_summary") else None
+        ),
+    )
+    record_span("store", started)
+
+    # Detect intent from tools used
+    intent_detected = _detect_intent(result["tools_used"])
+
+    # Calculate total sections retrieved
+    total_sections = sum(
+        tool["sections_count"]
+        for tool in result["tools_used"]
+        if "sections_count" in tool
+    )
+
+    # Log analytics at profile level
+    response_time_ms = int((time.time() - start_time) * 1000)
+    await supabase_service.log_analytics(
+        profile_id=profile_id,
+        user_query=user_message,
+        intent_detected=intent_detected,
+        tools_used=result["tools_used"],
+        sections_retrieved=total_sections,
+        tokens_used=result["tokens_used"],
+        response_time_ms=response_time_ms,
+        model=result["model"],
+        success=True,
+        context_tokens_saved=result.get("context_tokens_saved", 0),
+        dedup_tokens_saved=result.get("dedup_tokens_saved", 0),
+        prompt_tokens=result.get("prompt_tokens", 0),
+        cached_tokens=result.get("cached_tokens", 0),
+        response_cache=result.get("response_cache"),
+        timings=timings.waterfall()
+    )
+    return intent_detected
+
+
+async def _log_failure(profile_id: str, user_message: str, error: str, timings: TurnTimings):
+    """Log analytics for a failed turn without raising."""
+    try:
+        await get_supabase_service().log_analytics(
+            profile_id=profile_id,
+            user_query=user_message,
+            success=False,
+            error_message=error,
+            timings=timings.waterfall()
+        )
+    except Exception:
+        logger.warning("Failed to log analytics for failed request", exc_info=True)
+
+
+def _finish_turn(
+    timings: TurnTimings,
+    endpoint: str,
+    profile_id: str,
+    session_id: str,
+    outcome: str,
+    result: Optional[dict],
+):
+    """Stop timing the turn and keep its waterfall for /debug/slow-turns."""
+    end_turn()
+    tools_used = (result or {}).get("tools_used", [])
+    get_recent_turns().add({
+        "at": datetime.now(timezone.utc).isoformat(),
+        "endpoint": endpoint,
+        "outcome": outcome,
+        "profile_id": profile_id,
+        "session_id": session_id,
+        "intent": _detect_intent(tools_used),
+        "tools_used": [tool["tool"] for tool in tools_used],
+        **timings.waterfall(),
+    })
+
+
 @app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, response: Response):
     """
     Main chat endpoint.
     Processes user message and returns AI response.
 
     Flow:
     1. Fetch conversation history from Supabase (up to 50 messages)
-    2. Call LLM with history + current message
+    2. Call LLM with history (fitted to the token budget) + current message
     3. Store user message and assistant response
+
+    The per-stage timings are returned in a Server-Timing header.
     """
     start_time = time.time()
+    timings = start_turn()
     profile_id = request.profile_id
     session_id = request.session_id
+    outcome = "error"
+    result = None
 
     try:
         supabase_service = get_supabase_service()
         llm_service = get_llm_service()
 
         # Get conversation history scoped to this session
-        history = supabase_service.get_conversation_history(
+        started = time.perf_counter()
+        history = await supabase_service.get_conversation_history(
             session_id=session_id,
             limit=50
         )
+        record_span("history", started)
 
         # Call LLM with tools
-        result = llm_service.chat(
+        result = await llm_service.chat(
             user_message=request.message,
             conversation_history=history
         )
@@ -144,48 +368,11 @@ async def chat(request: ChatRequest):
                 detail=result.get("error", "Failed to generate response")
             )
 
-        # Store user message and assistant response
-        supabase_service.store_message(
-            profile_id=profile_id,
-            session_id=session_id,
-            role="user",
-            content=request.message
-        )
-        supabase_service.store_message(
-            profile_id=profile_id,
-            session_id=session_id,
-            role="assistant",
-            content=result["response"]
-        )
-
-        # Detect intent from tools used
-        intent_detected = None
-        if result["tools_used"]:
-            for tool_use in result["tools_used"]:
-                if tool_use["tool"] == "get_legal_knowledge":
-                    intent_detected = tool_use["args"].get("intent")
-                    break
-
-        # Calculate total sections retrieved
-        total_sections = sum(
-            tool["sections_count"]
-            for tool in result["tools_used"]
-            if "sections_count" in tool
-        )
-
-        # Log analytics at profile level
-        response_time_ms = int((time.time() - start_time) * 1000)
-        supabase_service.log_analytics(
-            profile_id=profile_id,
-            user_query=request.message,
-            intent_detected=intent_detected,
-            tools_used=result["tools_used"],
-            sections_retrieved=total_sections,
-            tokens_used=result["tokens_used"],
-            response_time_ms=response_time_ms,
-            model=result["model"],
-            success=True
+        intent_detected = await _persist_turn(
+            profile_id, session_id, request.message, result, start_time, timings
         )
+        outcome = "cached" if result.get("response_cache") == "hit" else "ok"
+        response.headers["Server-Timing"] = timings.server_timing()
 
         return ChatResponse(
             profile_id=profile_id,
@@ -199,21 +386,103 @@ async def chat(request: ChatRequest):
         raise
     except Exception as e:
         # Log failed analytics
-        try:
-            supabase_service.log_analytics(
-                profile_id=profile_id,
-                user_query=request.message,
-                success=False,
-                error_message=str(e)
-            )
-        except Exception:
-            logger.warning("Failed to log analytics for failed request", exc_info=True)
+        await _log_failure(profile_id, request.message, str(e), timings)
 
         raise HTTPException(
             status_code=500,
             detail="An internal error occurred. Please try again."
         )
 
+    finally:
+        REQUEST_SECONDS.observe(time.time() - start_time, "/chat")
+        TURNS.inc("/chat", outcome)
+        _finish_turn(timings, "/chat", profile_id, session_id, outcome, result)
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming chat endpoint (server-sent events).
+
+    Events:
+    - progress: {"stage": "thinking", "message"} while history loads, then
+      {"stage": "tool_start", "tool", "message"} / {"stage": "tool_end", "tool", "sections_count"}
+      around each tool call (fast path included)
+    - token: {"delta"} for each chunk of text
+    - discard: {"reason": "tool_calls"} drop the tokens received since the last
+      discard; they came with tool calls and are not part of the answer
+    - done: {"profile_id", "session_id", "intent", "tools_used", "timings"} after the answer
+    - error: {"message"} if generation failed
+
+    The message pair is persisted before the done event is sent.
+    """
+    start_time = time.time()
+    profile_id = request.profile_id
+    session_id = request.session_id
+
+    async def event_stream():
+        timings = start_turn()  # headers are already sent, so timings go in the done event instead of Server-Timing
+        outcome = "disconnected"  # unless the stream reaches an answer or an error
+        result = None
+        yield _sse("progress", {"stage": "thinking", "message": "আপনার প্রশ্নটি বোঝার চেষ্টা করছি…"})
+
+        try:
+            started = time.perf_counter()
+            history = await get_supabase_service().get_conversation_history(
+                session_id=session_id,
+                limit=50
+            )
+            record_span("history", started)
+
+            events = get_llm_service().chat_stream(user_message=request.message, conversation_history=history)
+            async with aclosing(events):  # closed here, not by the garbage collector, after the break
+                async for event in events:
+                    if event["event"] in ("done", "error"):
+                        result = event["data"]
+                        break
+                    yield _sse(event["event"], event["data"])
+
+            if not result or not result["success"]:
+                outcome = "error"
+                error = (result or {}).get("error", "Failed to generate response")
+                await _log_failure(profile_id, request.message, error, timings)
+                yield _sse("error", {"message": "দুঃখিত, একটি সমস্যা হয়েছে। অনুগ্রহ করে আবার চেষ্টা করুন।"})
+                return
+
+            # Stored before done: a client that disconnects on done would otherwise cancel the store
+            await _persist_turn(profile_id, session_id, request.message, result, start_time, timings)
+            outcome = "cached" if result.get("response_cache") == "hit" else "ok"
+
+            yield _sse("done", {
+                "profile_id": profile_id,
+                "session_id": session_id,
+                "intent": _detect_intent(result["tools_used"]),
+                "tools_used": [tool["tool"] for tool in result["tools_used"]],
+                "timings": timings.waterfall(),
+            })
+
+        except Exception as e:
+            outcome = "error"
+            logger.error("chat_stream_endpoint_error", error=str(e), error_type=type(e).__name__)
+            await _log_failure(profile_id, request.message, str(e), timings)
+            yield _sse("error", {"message": "দুঃখিত, একটি সমস্যা হয়েছে। অনুগ্রহ করে আবার চেষ্টা করুন।"})
+
+        finally:
+            REQUEST_SECONDS.observe(time.time() - start_time, "/chat/stream")
+            TURNS.inc("/chat/stream", outcome)
+            _finish_turn(timings, "/chat/stream", profile_id, session_id, outcome, result)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -26,6 +26,24 @@ class ChatResponse(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 
+class HistoryMessage(BaseModel):
+    """A stored conversation message"""
+
+    id: str
+    role: str
+    content: str
+    created_at: datetime
+
+
+class HistoryPageResponse(BaseModel):
+    """One page of session history (chronological), newest page first"""
+
+    session_id: str
+    messages: list[HistoryMessage]
+    next_cursor: Optional[str] = Field(None, description="Pass as before_cursor to load the previous (older) page")
+    has_more: bool
+
+
 class NewSessionRequest(BaseModel):
     """Request model for creating new session"""
     profile_id: Optional[str] = None
@@ -0,0 +1,192 @@
+"""
+Context Builder
+Fits conversation history into a token budget using a rolling summary of old turns
+"""
+
+import hashlib
+import time
+from typing import Any, Dict, List, Optional
+
+from openai import AsyncOpenAI
+import structlog
+
+from app.services.metrics import LLM_ROUND_SECONDS, TOKENS
+
+logger = structlog.get_logger()
+
+# Key under conversations.metadata (assistant rows) holding the rolling summary
+SUMMARY_METADATA_KEY = "context_summary"
+
+SUMMARY_PROMPT = """You maintain a running summary of an ongoing conversation between a Bangladeshi woman and a family-law assistant.
+Merge the existing summary with the new messages into one updated summary, written in Bengali, at most 200 words.
+Keep every fact that matters legally: her situation, religion / law of marriage, dates and durations, children, income figures, injuries and evidence, steps already taken (GD/FIR/case), her fears and decisions, and the advice and law sections already given.
+Return only the summary text."""
+
+SUMMARY_MESSAGE_PREFIX = "আগের কথোপকথনের সারসংক্ষেপ:\n"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (no tokenizer dependency)
+
+    ASCII averages ~4 chars/token; Bengali script ~2 chars/token.
+    """
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars) // 2 + 1
+
+
+def message_fingerprint(message: Dict[str, Any]) -> str:
+    """Stable identifier for a history message (history carries no IDs)"""
+    raw = f"{message['role']}\x00{message['content']}".encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()[:16]
+
+
+def _tokens(messages: List[Dict[str, str]]) -> int:
+    return sum(estimate_tokens(m["content"]) for m in messages)
+
+
+class ContextBuilder:
+    """
+    Assembles the history part of the prompt
+
+    The last `keep_turns` turns are always sent verbatim (shrunk further only
+    if they alone exceed the budget). Older messages are sent verbatim while
+    they fit; once they overflow the budget they are all folded into a rolling
+    summary, which frees room for the next few turns, so the summary is
+    regenerated every few turns rather than on every turn. The summary state
+    travels in the metadata of the assistant message that produced it.
+    """
+
+    def __init__(
+        self,
+        client: AsyncOpenAI,
+        model: str,
+        budget_tokens: int = 6000,
+        keep_turns: int = 3,
+    ):
+        """
+        Initialize builder
+
+        Args:
+            client: OpenAI client used for summarization
+            model: Model used for summarization
+            budget_tokens: Token budget for summary + history (system prompt excluded)
+            keep_turns: Most recent user/assistant turns always kept verbatim
+        """
+        self.client = client
+        self.model = model
+        self.budget_tokens = budget_tokens
+        self.keep_turns = keep_turns
+
+    async def build(self, history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Build the history messages for a completion call
+
+        Args:
+            history: Messages in chronological order; may carry "metadata"
+
+        Returns:
+            Dict with:
+            - messages: role/content messages to send after the system prompt
+            - summary: new summary state to persist, or None if unchanged
+            - tokens_full: estimated tokens of the full history
+            - tokens_sent: estimated tokens of the assembled messages
+            - summary_tokens_used: tokens spent on the summarization call
+        """
+        clean = [{"role": m["role"], "content": m["content"]} for m in history]
+        tokens_full = _tokens(clean)
+        summary = self._latest_summary(history)
+
+        # Recent turns, verbatim (always at least the last exchange)
+        kept = clean[-self.keep_turns * 2:] if self.keep_turns > 0 else []
+        while len(kept) > 2 and _tokens(kept) > self.budget_tokens:
+            kept = kept[1:]
+        older = clean[:len(clean) - len(kept)]
+
+        pending = self._unsummarized(older, kept, summary)
+        summary_text = summary["text"] if summary else ""
+        remaining = self.budget_tokens - _tokens(kept) - estimate_tokens(summary_text)
+
+        new_summary = None
+        summary_tokens_used = 0
+        if pending and _tokens(pending) > remaining:
+            try:
+                new_summary, summary_tokens_used = await self._summarize(summary_text, pending)
+                summary_text = new_summary["text"]
+                pending = []
+            except Exception as e:
+                logger.warning("context_summary_error", error=str(e))
+                # Keep whatever still fits, newest first
+                while pending and _tokens(pending) > remaining:
+                    pending = pending[1:]
+
+        messages = []
+        if summary_text:
+            messages.append({"role": "system", "content": SUMMARY_MESSAGE_PREFIX + summary_text})
+        messages.extend(pending)
+        messages.extend(kept)
+
+        tokens_sent = _tokens(messages)
+        if new_summary or tokens_sent < tokens_full:
+            logger.info(
+                "context_built",
+                history_messages=len(clean),
+                sent_messages=len(messages),
+                tokens_full=tokens_full,
+                tokens_sent=tokens_sent,
+                summary_updated=new_summary is not None,
+            )
+
+        return {
+            "messages": messages,
+            "summary": new_summary,
+            "tokens_full": tokens_full,
+            "tokens_sent": tokens_sent,
+            "summary_tokens_used": summary_tokens_used,
+        }
+
+    @staticmethod
+    def _latest_summary(history: List[Dict[str, Any]]) -> Optional[Dict[str, str]]:
+        for message in reversed(history):
+            summary = (message.get("metadata") or {}).get(SUMMARY_METADATA_KEY)
+            if summary:
+                return summary
+        return None
+
+    @staticmethod
+    def _unsummarized(
+        older: List[Dict[str, str]],
+        kept: List[Dict[str, str]],
+        summary: Optional[Dict[str, str]],
+    ) -> List[Dict[str, str]]:
+        """Older messages not yet covered by the summary"""
+        if not summary:
+            return older
+
+        through = summary.get("through")
+        for i in range(len(older) - 1, -1, -1):
+            if message_fingerprint(older[i]) == through:
+                return older[i + 1:]
+        if any(message_fingerprint(m) == through for m in kept):
+            return []
+        # Summarized point scrolled out of the fetched window: all of `older` is newer
+        return older
+
+    async def _summarize(self, previous: str, messages: List[Dict[str, str]]) -> tuple:
+        """Fold `messages` into the previous summary; returns (summary state, tokens used)"""
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        started = time.perf_counter()
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": f"Existing summary:\n{previous or '(none)'}\n\nNew messages:\n{transcript}"},
+            ],
+        )
+        LLM_ROUND_SECONDS.observe(time.perf_counter() - started, "summary")
+        text = (response.choices[0].message.content or "").strip()
+        if not text:
+            raise ValueError("Empty summary")
+        tokens_used = response.usage.total_tokens if response.usage else 0
+        TOKENS.inc("summary", amount=tokens_used)
+        return {"text": text, "through": message_fingerprint(messages[-1])}, tokens_used
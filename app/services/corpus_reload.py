@@ -0,0 +1,239 @@
+"""
+Corpus Reload
+Builds a new DataLoader generation from data/*.json and swaps it in without a restart
+"""
+
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+
+from app.config import get_settings
+from app.services.corpus_validation import DATA_FILES, data_signature, validate_corpus
+from app.services.data_loader import DataLoader, get_data_loader, swap_data_loader
+from app.services.intent_classifier import get_intent_classifier
+from app.services.semantic_index import prepare_semantic_index
+
+logger = structlog.get_logger()
+
+# Section references listed per change kind in a reload report (the counts are always exact)
+MAX_LISTED_SECTIONS = 50
+
+_SECTION_FIELDS = ("act_title", "section_title", "semantic_summary", "key_terms", "section_text")
+
+
+def diff_sections(old: DataLoader, new: DataLoader) -> Dict[str, List[str]]:
+    """
+    Section-level differences between two generations
+
+    Returns:
+        {"added", "removed", "changed"}: "act_id/section_number" references
+    """
+    added, removed, changed = [], [], []
+    for act_id in old.sections.keys() | new.sections.keys():
+        old_sections = old.sections.get(act_id, {})
+        new_sections = new.sections.get(act_id, {})
+        for section_number, section in new_sections.items():
+            previous = old_sections.get(section_number)
+            if previous is None:
+                added.append(f"{act_id}/{section_number}")
+            elif any(getattr(previous, field) != getattr(section, field) for field in _SECTION_FIELDS):
+                changed.append(f"{act_id}/{section_number}")
+        removed.extend(f"{act_id}/{number}" for number in old_sections if number not in new_sections)
+    return {"added": sorted(added), "removed": sorted(removed), "changed": sorted(changed)}
+
+
+class CorpusReloader:
+    """
+    Hot reload of the legal corpus
+
+    A reload parses and validates the data files (the same checks as
+    `compile-corpus`), builds a complete DataLoader next to the live one,
+    warms its semantic index, then swaps the global reference. Requests
+    already running keep the generation they started with; caches keyed on
+    the loader (tool results, intent classifier, semantic index) follow the
+    new one. A failed reload leaves the live generation untouched.
+
+    Note: each worker process holds its own generation. The admin endpoint
+    reloads the worker that serves it; with several workers use the file
+    watcher (`CORPUS_RELOAD_INTERVAL_SECONDS`), which runs in every worker.
+    """
+
+    def __init__(self, interval_seconds: float = 0):
+        """
+        Initialize reloader
+
+        Args:
+            interval_seconds: Seconds between data file checks (0 = no watcher)
+        """
+        self.interval_seconds = interval_seconds
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._signature: Optional[Tuple] = None
+        self.generation = 1
+        self.loaded_at = datetime.now(timezone.utc).isoformat()
+        self.last_reload: Optional[Dict[str, Any]] = None
+
+        # Counters
+        self.reloads = 0
+        self.failures = 0
+
+    def reload(self, trigger: str = "manual") -> Dict[str, Any]:
+        """
+        Build, validate and swap in a new corpus generation (blocking; ~0.5s from JSON)
+
+        Returns:
+            Report: status ("reloaded", "unchanged", "rejected", "failed" or
+            "in_progress"), duration_ms, and section changes or errors
+        """
+        if not self._lock.acquire(blocking=False):
+            return {"status": "in_progress"}
+        try:
+            report = self._reload(get_data_loader())
+        finally:
+            self._lock.release()
+
+        report = {"trigger": trigger, "at": datetime.now(timezone.utc).isoformat(), **report}
+        if report["status"] in ("rejected", "failed"):
+            self.failures += 1
+            logger.warning("corpus_reload_failed", **report)
+        else:
+            logger.info("corpus_reloaded", generation=self.generation, trigger=trigger, status=report["status"],
+                        duration_ms=report["duration_ms"], **{k: v["count"] for k, v in report["sections"].items()})
+        self.last_reload = report
+        return report
+
+    def _reload(self, current: DataLoader) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            signature = data_signature(current.data_dir)
+            data = {}
+            for name in DATA_FILES:
+                with open(current.data_dir / name, "r", encoding="utf-8") as f:
+                    data[name] = json.load(f)
+        except (OSError, ValueError) as e:
+            return {"status": "failed", "errors": [str(e)], "duration_ms": _elapsed_ms(started)}
+
+        try:
+            errors, warnings = validate_corpus(data)
+        except Exception as e:  # a shape the checks missed is still a bad corpus, not a server error
+            return {"status": "rejected", "errors": [str(e)], "duration_ms": _elapsed_ms(started)}
+        del data
+        if errors:
+            return {"status": "rejected", "errors": errors, "warnings": warnings, "duration_ms": _elapsed_ms(started)}
+
+        try:
+            loader = DataLoader(str(current.data_dir), text_blob_dir=current.text_blob_dir,
+                                snapshot_path=current.snapshot_path)
+        except Exception as e:
+            return {"status": "failed", "errors": [str(e)], "duration_ms": _elapsed_ms(started)}
+
+        changes = diff_sections(current, loader)
+        others_changed = [
+            name for name in ("intent_mappings", "procedural_knowledge", "act_summaries")
+            if getattr(current, name) != getattr(loader, name)
+        ]
+        self._signature = signature
+        if not any(changes.values()) and not others_changed:
+            return {"status": "unchanged", "duration_ms": _elapsed_ms(started), "warnings": warnings,
+                    "sections": _section_report(changes)}
+
+        prepare_semantic_index(loader)  # loaded or built before the swap, never on the request path
+        swap_data_loader(loader)
+        if get_settings().intent_fast_path_enabled:
+            get_intent_classifier()  # rebuilt for the new generation here, not by the next request
+        self.generation += 1
+        self.loaded_at = datetime.now(timezone.utc).isoformat()
+        self.reloads += 1
+        return {
+            "status": "reloaded",
+            "generation": self.generation,
+            "source": loader.source,
+            "duration_ms": _elapsed_ms(started),
+            "warnings": warnings,
+            "sections": _section_report(changes),
+            "other_changes": others_changed,
+        }
+
+    async def start(self):
+        """Start the data file watcher (no-op when interval_seconds is 0)"""
+        if self.interval_seconds <= 0 or self._task is not None:
+            return
+        self._signature = data_signature(get_data_loader().data_dir)
+        self._task = asyncio.create_task(self._watch_loop())
+
+    async def stop(self):
+        """Stop the data file watcher"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _watch_loop(self):
+        """Reload once the data files changed and then stayed the same for one interval"""
+        pending = None
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                signature = data_signature(get_data_loader().data_dir)
+            except OSError as e:
+                logger.warning("corpus_watch_error", error=str(e))
+                continue
+            if signature == self._signature:
+                pending = None
+            elif signature != pending:
+                pending = signature  # still being written, or first sighting: check again next interval
+            else:
+                pending = None
+                try:
+                    report = await asyncio.to_thread(self.reload, "watcher")
+                except Exception as e:  # keep watching; the live generation is untouched
+                    logger.error("corpus_watch_error", error=str(e), error_type=type(e).__name__)
+                    self._signature = signature
+                    continue
+                if report["status"] != "in_progress":
+                    self._signature = signature  # a rejected version isn't retried until the files change again
+
+    def stats(self) -> Dict[str, Any]:
+        """Current generation and reload counters"""
+        loader = get_data_loader()
+        return {
+            "generation": self.generation,
+            "loaded_at": self.loaded_at,
+            "source": loader.source,
+            "sections": sum(len(sections) for sections in loader.sections.values()),
+            "watching": self._task is not None,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_reload": self.last_reload,
+        }
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def _section_report(changes: Dict[str, List[str]]) -> Dict[str, Dict[str, Any]]:
+    return {kind: {"count": len(refs), "refs": refs[:MAX_LISTED_SECTIONS]} for kind, refs in changes.items()}
+
+
+# Global corpus reloader instance
+_corpus_reloader: Optional[CorpusReloader] = None
+
+
+def get_corpus_reloader() -> CorpusReloader:
+    """
+    Get global corpus reloader instance
+    Lazy initialization on first call
+    """
+    global _corpus_reloader
+    if _corpus_reloader is None:
+        _corpus_reloader = CorpusReloader(interval_seconds=get_settings().corpus_reload_interval_seconds)
+    return _corpus_reloader
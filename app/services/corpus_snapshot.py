@@ -0,0 +1,140 @@
+"""
+Corpus Snapshot
+Versioned binary snapshot of everything DataLoader builds from data/*.json
+"""
+
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import structlog
+
+from app.services.section_store import TextBlob, records_to_rows
+
+logger = structlog.get_logger()
+
+DEFAULT_SNAPSHOT_PATH = ".cache/corpus/corpus.snapshot"
+
+# Layout: header | pickled payload | section text (UTF-8, mapped in place)
+MAGIC = b"FLCORPUS"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sI16sQQ")  # magic, format, source version, payload bytes, text bytes
+
+# DataLoader attributes stored as-is (sections are stored as record rows)
+SNAPSHOT_ATTRIBUTES = (
+    "intent_mappings",
+    "procedural_knowledge",
+    "act_summaries",
+    "search_index",
+    "section_keys",
+    "act_aliases",
+    "browse_entries",
+    "browse_fragments",
+    "browse_act_json",
+    "act_summary_entries",
+    "act_summary_fragments",
+    "legal_knowledge_results",
+    "legal_knowledge_json",
+    "intent_guidance_json",
+    "general_procedure_json",
+)
+
+# Modules whose code shapes the snapshot; editing one makes old snapshots stale
+_SOURCE_MODULES = (
+    "corpus_snapshot.py",
+    "data_loader.py",
+    "search_index.py",
+    "section_store.py",
+    "text_normalization.py",
+)
+
+
+def source_version(data_dir: Path) -> str:
+    """Hash of the data files and of the code that builds the in-memory corpus"""
+    digest = hashlib.sha256(str(FORMAT_VERSION).encode("utf-8"))
+    for path in sorted(Path(data_dir).glob("*.json")):
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    module_dir = Path(__file__).parent
+    for name in _SOURCE_MODULES:
+        digest.update((module_dir / name).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def write_snapshot(loader: Any, path: str) -> Dict[str, Any]:
+    """
+    Serialize a loaded DataLoader
+
+    Args:
+        loader: DataLoader built from JSON
+        path: Output file (written atomically)
+
+    Returns:
+        Dict with source_version, bytes, payload_bytes, text_bytes
+    """
+    payload = {name: getattr(loader, name) for name in SNAPSHOT_ATTRIBUTES}
+    payload["sections"] = records_to_rows(loader.sections)
+    payload_bytes = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+    text = loader.section_text_blob.tobytes()
+    version = source_version(loader.data_dir)
+
+    output = Path(path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, version.encode("ascii"), len(payload_bytes), len(text)))
+        f.write(payload_bytes)
+        f.write(text)
+    os.replace(tmp_path, output)
+
+    return {
+        "source_version": version,
+        "bytes": HEADER.size + len(payload_bytes) + len(text),
+        "payload_bytes": len(payload_bytes),
+        "text_bytes": len(text),
+    }
+
+
+def read_snapshot(path: str, data_dir: Path) -> Optional[Dict[str, Any]]:
+    """
+    Map a snapshot and decode its payload
+
+    Only snapshots built by compile-corpus from this tree are trusted
+    (the payload is a pickle). Returns None, so the caller falls back to
+    the JSON files, when the snapshot is missing, corrupt, from another
+    format version, or built from different data or code.
+
+    Returns:
+        DataLoader attributes plus "sections" (record rows) and "text" (TextBlob)
+    """
+    snapshot_path = Path(path)
+    if not snapshot_path.exists():
+        return None
+
+    try:
+        with open(snapshot_path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, format_version, version, payload_size, text_size = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            logger.warning("corpus_snapshot_unsupported", path=str(snapshot_path), format=format_version)
+            return None
+        if HEADER.size + payload_size + text_size != len(data):
+            logger.warning("corpus_snapshot_truncated", path=str(snapshot_path))
+            return None
+        expected = source_version(data_dir)
+        if version.decode("ascii") != expected:
+            logger.warning("corpus_snapshot_stale", path=str(snapshot_path),
+                           snapshot_version=version.decode("ascii"), source_version=expected)
+            return None
+        payload = pickle.loads(data[HEADER.size:HEADER.size + payload_size])
+    except (OSError, ValueError, struct.error, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+        logger.warning("corpus_snapshot_unreadable", path=str(snapshot_path), error=str(e))
+        return None
+
+    payload["text"] = TextBlob(data, snapshot_path, base=HEADER.size + payload_size, size=text_size)
+    payload["source_version"] = expected
+    return payload
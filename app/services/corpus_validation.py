@@ -0,0 +1,128 @@
+"""
+Corpus Validation
+Consistency checks for data/*.json and change detection for the data files
+"""
+
+import hashlib
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+DATA_FILES = ("family_laws_final.json", "intent_mappings.json", "procedural_knowledge.json", "act_summaries.json")
+SECTION_FIELDS = ("act_id", "act_title", "section_number", "section_title", "section_text", "semantic_summary")
+
+
+def validate_corpus(data: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """
+    Check the data files against each other and against the tool schemas
+
+    Args:
+        data: Parsed JSON keyed by file name (DATA_FILES)
+
+    Returns:
+        (errors, warnings); errors block the snapshot
+    """
+    from app.services.intent_classifier import DEFAULT_FAST_PATH_TOPICS, FAST_PATH_TOPICS
+    from app.tools.legal_tools import INTENT_ENUM, TOPIC_ENUM
+
+    errors: List[str] = []
+    warnings: List[str] = []
+
+    sections = data["family_laws_final.json"]
+    if not isinstance(sections, list):
+        return ["family_laws_final.json: expected a list of sections"], warnings
+    keys = Counter()
+    for index, section in enumerate(sections):
+        if not isinstance(section, dict):
+            errors.append(f"family_laws_final.json[{index}]: expected an object")
+            continue
+        for field in SECTION_FIELDS:
+            if not isinstance(section.get(field), str):
+                errors.append(f"family_laws_final.json[{index}]: {field} missing or not a string")
+        if not (section.get("section_text") or "").strip():
+            warnings.append(f"family_laws_final.json[{index}]: empty section_text")
+        if not isinstance(section.get("key_terms", []), list):
+            errors.append(f"family_laws_final.json[{index}]: key_terms must be a list")
+        key = (section.get("act_id"), section.get("section_number"))
+        if all(isinstance(part, str) for part in key):
+            keys[key] += 1
+    duplicates = [key for key, count in keys.items() if count > 1]
+    if duplicates:
+        warnings.append(f"family_laws_final.json: {len(duplicates)} duplicate (act_id, section_number) pairs; the last one wins")
+    acts = {act_id for act_id, _ in keys}
+
+    mappings = data["intent_mappings.json"]
+    intents = mappings.get("intents") if isinstance(mappings, dict) else None
+    if not isinstance(intents, dict):
+        errors.append("intent_mappings.json: missing 'intents' object")
+        intents = {}
+    for intent in sorted(set(INTENT_ENUM) ^ set(intents)):
+        where = "INTENT_ENUM" if intent in INTENT_ENUM else "intent_mappings.json"
+        errors.append(f"intent {intent!r} only in {where}")
+    for intent, mapping in intents.items():
+        refs = mapping.get("mandatory_sections", []) if isinstance(mapping, dict) else None
+        if not isinstance(refs, list):
+            errors.append(f"intent_mappings.json: {intent} must be an object with a mandatory_sections list")
+            continue
+        for ref in refs:
+            if not isinstance(ref, dict):
+                errors.append(f"intent_mappings.json: {intent} has a section reference that is not an object")
+            elif (ref.get("act_id"), ref.get("section_number")) not in keys:
+                errors.append(f"intent_mappings.json: {intent} references missing section {ref.get('act_id')}/{ref.get('section_number')}")
+
+    procedural = data["procedural_knowledge.json"]
+    if not isinstance(procedural, dict):
+        errors.append("procedural_knowledge.json: expected an object")
+        procedural = {}
+    intent_specific = procedural.get("intent_specific", {})
+    if not isinstance(intent_specific, dict):
+        errors.append("procedural_knowledge.json: intent_specific must be an object")
+        intent_specific = {}
+    for intent in sorted(set(intent_specific) - set(intents)):
+        errors.append(f"procedural_knowledge.json: guidance for unknown intent {intent!r}")
+    general = procedural.get("general_procedures", {})
+    if not isinstance(general, dict):
+        errors.append("procedural_knowledge.json: general_procedures must be an object")
+        general = {}
+    topics = set(TOPIC_ENUM).union(DEFAULT_FAST_PATH_TOPICS, *FAST_PATH_TOPICS.values())
+    for topic in sorted(topics - set(general)):
+        errors.append(f"procedural_knowledge.json: no general procedure for topic {topic!r}")
+    for intent in sorted(set(FAST_PATH_TOPICS) - set(intents)):
+        errors.append(f"intent_classifier.FAST_PATH_TOPICS: unknown intent {intent!r}")
+
+    summaries = data["act_summaries.json"]
+    if not isinstance(summaries, list):
+        errors.append("act_summaries.json: expected a list of act summaries")
+        summaries = []
+    summary_acts = Counter()
+    for index, summary in enumerate(summaries):
+        if not isinstance(summary, dict) or not isinstance(summary.get("act_id"), str):
+            errors.append(f"act_summaries.json[{index}]: expected an object with a string act_id")
+            continue
+        summary_acts[summary["act_id"]] += 1
+    for act_id in sorted(act for act, count in summary_acts.items() if count > 1):
+        warnings.append(f"act_summaries.json: act {act_id} listed more than once")
+    for act_id in sorted(acts - set(summary_acts)):
+        warnings.append(f"act_summaries.json: no summary for act {act_id}")
+    for act_id in sorted(set(summary_acts) - acts):
+        warnings.append(f"act_summaries.json: summary for act {act_id} has no sections")
+
+    return errors, warnings
+
+
+def data_signature(data_dir: Path) -> Tuple:
+    """Cheap change detector: name, size and mtime of every data file"""
+    signature = []
+    for path in sorted(data_dir.glob("*.json")):
+        stat = path.stat()
+        signature.append((path.name, stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+
+def data_version(data_dir: Path) -> str:
+    """Content hash of every data file"""
+    digest = hashlib.sha256()
+    for path in sorted(data_dir.glob("*.json")):
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
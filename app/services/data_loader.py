@@ -4,12 +4,21 @@ Loads legal knowledge JSON files into memory for fast retrieval
 """
 
 import json
-from typing import Dict, List, Any
+import re
+from typing import Dict, List, Any, Optional, Set
 from pathlib import Path
 import structlog
 
+from app.services.corpus_snapshot import DEFAULT_SNAPSHOT_PATH, SNAPSHOT_ATTRIBUTES, read_snapshot
+from app.services.search_index import SectionIndex
+from app.services.section_store import SectionRecord, TextBlob, load_section_store, records_from_rows
+from app.services.text_normalization import normalize_act_title, normalize_section_number
+
 logger = structlog.get_logger()
 
+# "1256", "act 1256", "Act No. 1256", "act_id 1256" (after normalize_act_title)
+_ACT_ID_REFERENCE = re.compile(r"^(?:act\s*)?(?:id\s*|no\s*)?(\d+)$")
+
 
 class DataLoader:
     """
@@ -17,27 +26,87 @@ class DataLoader:
     All data loaded into memory for fast retrieval (<10ms)
     """
 
-    def __init__(self, data_dir: str = "data"):
+    def __init__(
+        self,
+        data_dir: str = "data",
+        text_blob_dir: Optional[str] = ".cache/corpus",
+        snapshot_path: Optional[str] = DEFAULT_SNAPSHOT_PATH,
+    ):
         """
         Initialize data loader
 
         Args:
             data_dir: Directory containing JSON data files
+            text_blob_dir: Directory for the memory-mapped section text shared by
+                workers (None = keep section text in process memory)
+            snapshot_path: Corpus snapshot written by `python -m app.cli compile-corpus`;
+                used when it matches the JSON files (None = always parse JSON)
         """
         self.data_dir = Path(data_dir)
-        self.sections: Dict[str, Dict[str, Any]] = {}  # family_laws_final.json
+        self.text_blob_dir = text_blob_dir
+        self.snapshot_path = snapshot_path
+        self.source = "json"  # or "snapshot"
+        self.sections: Dict[str, Dict[str, SectionRecord]] = {}  # family_laws_final.json
+        self.section_text_blob: TextBlob | None = None
         self.intent_mappings: Dict[str, Any] = {}  # intent_mappings.json
         self.procedural_knowledge: Dict[str, Any] = {}  # procedural_knowledge.json
         self.act_summaries: Dict[str, Any] = {}  # act_summaries.json
+        self.search_index: SectionIndex | None = None  # BM25 over sections (search_legal_sections query)
+
+        # Fuzzy reference lookups for tool arguments (see resolve_act_id / resolve_section_number)
+        self.section_keys: Dict[str, Dict[str, str]] = {}  # act_id -> normalized section number -> section_number
+        self.act_aliases: Dict[str, str] = {}  # normalized act title -> act_id
+
+        # search_legal_sections browse payloads, built once (treat as read-only)
+        self.browse_entries: Dict[str, Dict[str, Dict[str, str]]] = {}  # act_id -> section_number -> summary entry
+        self.browse_fragments: Dict[str, Dict[str, str]] = {}  # same entries pre-serialized as JSON objects
+        self.browse_act_json: Dict[str, str] = {}  # act_id -> all of its fragments joined
+        self.act_summary_entries: Dict[str, Dict[str, str]] = {}
+        self.act_summary_fragments: Dict[str, str] = {}
+
+        # Closed-domain tool results, built once (treat as read-only)
+        self.legal_knowledge_results: Dict[str, Dict[str, Any]] = {}  # intent -> get_legal_knowledge tool result
+        self.legal_knowledge_json: Dict[str, str] = {}  # same results serialized
+        self.intent_guidance_json: Dict[str, str] = {}  # intent -> intent_specific guidance serialized
+        self.general_procedure_json: Dict[str, str] = {}  # topic -> general procedure serialized
 
         self._load_all()
 
     def _load_all(self):
-        """Load all JSON files into memory"""
+        """Load the corpus snapshot if it is current, otherwise all JSON files"""
         logger.info("loading_legal_data")
 
+        if self.snapshot_path and self._load_snapshot():
+            self.source = "snapshot"
+        else:
+            self._load_json()
+
+        logger.info("legal_data_loaded",
+                    source=self.source,
+                    sections=len(self.sections),
+                    intents=len(self.intent_mappings),
+                    act_summaries=len(self.act_summaries),
+                    search_terms=self.search_index.vocabulary_size,
+                    section_text_bytes=len(self.section_text_blob),
+                    section_text_mapped=self.section_text_blob.mapped)
+
+    def _load_snapshot(self) -> bool:
+        """Restore every attribute from the compiled snapshot; False if it can't be used"""
+        snapshot = read_snapshot(self.snapshot_path, self.data_dir)
+        if snapshot is None:
+            return False
+
+        for name in SNAPSHOT_ATTRIBUTES:
+            setattr(self, name, snapshot[name])
+        self.section_text_blob = snapshot["text"]
+        self.sections = records_from_rows(snapshot["sections"], self.section_text_blob)
+        return True
+
+    def _load_json(self):
+        """Parse all JSON files and build the indexes"""
         # Load family_laws_final.json
         self._load_legal_sections()
+        self.search_index = SectionIndex(self.sections)
 
         # Load intent_mappings.json
         self._load_intent_mappings()
@@ -48,31 +117,20 @@ class DataLoader:
         # Load act_summaries.json
         self._load_act_summaries()
 
-        logger.info("legal_data_loaded",
-                    sections=len(self.sections),
-                    intents=len(self.intent_mappings),
-                    act_summaries=len(self.act_summaries))
+        self._build_reference_index()
+        self._build_browse_payloads()
+        self._build_tool_payloads()
 
     def _load_legal_sections(self):
         """
         Load family_laws_final.json
-        Organizes sections by act_id and section_number for fast lookup
+        Organizes sections by act_id and section_number for fast lookup; only
+        the fields the tools return are kept, and section text lives in the blob
         """
         file_path = self.data_dir / "family_laws_final.json"
 
-        with open(file_path, "r", encoding="utf-8") as f:
-            sections_list = json.load(f)
-
-        # Organize by act_id and section_number for O(1) lookup
-        for section in sections_list:
-            act_id = section.get("act_id")
-            section_number = section.get("section_number")
-
-            if act_id and section_number:
-                # Create nested dict structure: sections[act_id][section_number] = section
-                if act_id not in self.sections:
-                    self.sections[act_id] = {}
-                self.sections[act_id][section_number] = section
+        # sections[act_id][section_number] = SectionRecord
+        self.sections, self.section_text_blob = load_section_store(file_path, self.text_blob_dir)
 
     def _load_intent_mappings(self):
         """Load intent_mappings.json"""
@@ -103,6 +161,123 @@ class DataLoader:
             if act_id:
                 self.act_summaries[act_id] = summary
 
+    def _build_reference_index(self):
+        """
+        Index normalized section numbers and act titles
+
+        Section numbers are stored in Bengali numerals ('১২', '২ক'); GPT
+        sometimes sends '12' or '12A', or an act's title instead of its ID.
+        Titles shared by several acts are left out rather than guessed.
+        """
+        for act_id, act_sections in self.sections.items():
+            keys = {}
+            for section_number in act_sections:
+                keys.setdefault(normalize_section_number(section_number), section_number)
+            keys.pop("", None)
+            self.section_keys[act_id] = keys
+
+        titles: Dict[str, Set[str]] = {}
+        for act_id, act_sections in self.sections.items():
+            names = [next(iter(act_sections.values())).act_title]
+            if act_id in self.act_summaries:
+                names.append(self.act_summaries[act_id].get("title") or "")
+            for name in names:
+                title = normalize_act_title(name)
+                for alias in (title, re.sub(r"\s+\d{4}$", "", title)):
+                    if alias:
+                        titles.setdefault(alias, set()).add(act_id)
+        self.act_aliases = {alias: next(iter(ids)) for alias, ids in titles.items() if len(ids) == 1}
+
+    def resolve_act_id(self, reference: Any) -> Optional[str]:
+        """
+        Act ID for an act_ids entry: the ID itself, in either numeral set or
+        prefixed ("act 1256"), or the act's exact title with or without its year
+
+        Returns:
+            act_id, or None if the reference matches no act
+        """
+        if isinstance(reference, str) and reference in self.sections:
+            return reference
+        key = normalize_act_title(str(reference))
+        match = _ACT_ID_REFERENCE.match(key)
+        if match and match.group(1) in self.sections:
+            return match.group(1)
+        return self.act_aliases.get(key)
+
+    def resolve_section_number(self, act_id: str, reference: Any) -> Optional[str]:
+        """
+        Stored section_number of an act for a section_numbers entry
+        ('১২', '12', 'ধারা ১২', '12(1)' all resolve to '১২')
+
+        Returns:
+            section_number, or None if the act has no such section
+        """
+        act_sections = self.sections.get(act_id)
+        if not act_sections:
+            return None
+        if isinstance(reference, str) and reference in act_sections:
+            return reference
+        return self.section_keys[act_id].get(normalize_section_number(str(reference)))
+
+    def _build_browse_payloads(self):
+        """
+        Precompute search_legal_sections browse entries and their JSON
+
+        Serialized with json.dumps defaults (ensure_ascii=False), the same
+        format as every other tool message, so a browse response can be
+        assembled by joining strings instead of building and dumping dicts.
+        """
+        for act_id, act_sections in self.sections.items():
+            entries = {}
+            fragments = {}
+            for section_number, section in act_sections.items():
+                entry = {
+                    "act_id": act_id,
+                    "act_title": section.act_title,
+                    "section_number": section_number,
+                    "section_title": section.section_title,
+                    "semantic_summary": section.semantic_summary,
+                }
+                entries[section_number] = entry
+                fragments[section_number] = json.dumps(entry, ensure_ascii=False)
+            self.browse_entries[act_id] = entries
+            self.browse_fragments[act_id] = fragments
+            self.browse_act_json[act_id] = ", ".join(fragments.values())
+
+        for act_id, summary in self.act_summaries.items():
+            entry = {
+                "act_id": act_id,
+                "act_title": summary.get("title", ""),
+                "summary": summary.get("summary", ""),
+            }
+            self.act_summary_entries[act_id] = entry
+            self.act_summary_fragments[act_id] = json.dumps(entry, ensure_ascii=False)
+
+    def _build_tool_payloads(self):
+        """
+        Precompute get_legal_knowledge / get_procedural_guidance results
+
+        get_legal_knowledge has one result per intent, stored whole. A
+        get_procedural_guidance result is the intent's guidance plus the
+        requested topics in request order (8 topics, so hundreds of
+        orderings per intent); its parts are stored serialized and joined
+        per call instead.
+        """
+        for intent in self.intent_mappings:
+            legal_sections = self.get_legal_knowledge(intent)["legal_sections"]
+            result = {
+                "intent": intent,
+                "sections_count": len(legal_sections),
+                "legal_sections": legal_sections,
+            }
+            self.legal_knowledge_results[intent] = result
+            self.legal_knowledge_json[intent] = json.dumps(result, ensure_ascii=False)
+
+        for intent, guidance in self.procedural_knowledge.get("intent_specific", {}).items():
+            self.intent_guidance_json[intent] = json.dumps(guidance, ensure_ascii=False)
+        for topic, procedure in self.procedural_knowledge.get("general_procedures", {}).items():
+            self.general_procedure_json[topic] = json.dumps(procedure, ensure_ascii=False)
+
     def get_legal_knowledge(self, intent: str) -> Dict[str, Any]:
         """
         Get legal knowledge for a specific intent
@@ -138,18 +313,27 @@ class DataLoader:
 
             # Look up full section from family_laws_final
             if act_id in self.sections and section_number in self.sections[act_id]:
-                full_section = self.sections[act_id][section_number]
-                result["legal_sections"].append({
-                    "act_id": act_id,
-                    "act_title": full_section.get("act_title", ""),
-                    "section_number": section_number,
-                    "section_title": full_section.get("section_title", ""),
-                    "section_text": full_section.get("section_text", ""),
-                    "semantic_summary": full_section.get("semantic_summary", ""),
-                })
+                result["legal_sections"].append(self.section_with_text(act_id, section_number))
 
         return result
 
+    def section_with_text(self, act_id: str, section_number: str) -> Dict[str, Any]:
+        """
+        Tool-result entry for a section sent with its full text
+
+        semantic_summary is left out: it is an English gloss of the same
+        text, worth sending only while browsing (search_legal_sections
+        summaries), not next to the law itself.
+        """
+        section = self.sections[act_id][section_number]
+        return {
+            "act_id": act_id,
+            "act_title": section.act_title,
+            "section_number": section_number,
+            "section_title": section.section_title,
+            "section_text": section.section_text,
+        }
+
     def get_procedural_guidance(self, intent: str, topics: List[str] = None) -> Dict[str, Any]:
         """
         Get procedural guidance for an intent
@@ -198,3 +382,18 @@ def get_data_loader() -> DataLoader:
     if _data_loader is None:
         _data_loader = DataLoader()
     return _data_loader
+
+
+def swap_data_loader(loader: DataLoader) -> DataLoader | None:
+    """
+    Make a fully built loader the global instance (corpus reload)
+
+    A single reference assignment: tool calls that already fetched the
+    previous instance finish against it, and later calls see the new one.
+
+    Returns:
+        The previous instance
+    """
+    global _data_loader
+    previous, _data_loader = _data_loader, loader
+    return previous
@@ -0,0 +1,168 @@
+"""
+History Cache
+Per-process LRU cache of recent session messages with a memory budget
+"""
+
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+# Fixed per-message overhead (dict + role string) added to the content size
+_MESSAGE_OVERHEAD_BYTES = 300
+
+
+def _message_size(message: Dict[str, str]) -> int:
+    """Approximate resident size of one cached message"""
+    return sys.getsizeof(message["content"]) + _MESSAGE_OVERHEAD_BYTES
+
+
+class _SessionEntry:
+    __slots__ = ("messages", "size", "complete", "fetched_at")
+
+    def __init__(self):
+        self.messages: List[Dict[str, str]] = []
+        self.size = 0
+        self.complete = False  # True if `messages` is the whole session, not just its tail
+        self.fetched_at = time.monotonic()  # when the database last confirmed this history
+
+
+class HistoryCache:
+    """
+    Keeps the tail of each active session's history in memory
+
+    Populated from the database on first fetch, then appended to locally as
+    this process stores messages, so later turns need no history round-trip.
+    Each session keeps at most `max_messages` messages and the whole cache at
+    most `max_bytes`; least recently used sessions are evicted first.
+
+    Note: the cache is per process, so a turn stored by another worker is
+    only seen after a refetch. The TTL counts from the last database fetch
+    (hits and local appends don't extend it), which bounds how stale a
+    history can be. Raise it with a single worker or sticky sessions.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_messages: int = 50, ttl_seconds: float = 30):
+        """
+        Initialize cache
+
+        Args:
+            max_bytes: Memory budget across all sessions
+            max_messages: Messages kept per session (oldest trimmed first)
+            ttl_seconds: Seconds after a database fetch before a session is refetched
+        """
+        self.max_bytes = max_bytes
+        self.max_messages = max_messages
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, _SessionEntry]" = OrderedDict()
+        self._bytes = 0
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, session_id: str, limit: int) -> Optional[List[Dict[str, str]]]:
+        """
+        Get the last `limit` messages of a session
+
+        Returns:
+            Messages in chronological order, or None if the cache can't answer
+        """
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if time.monotonic() - entry.fetched_at > self.ttl_seconds:
+            self._remove(session_id)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        if not entry.complete and len(entry.messages) < limit:
+            self.misses += 1
+            return None
+
+        self._sessions.move_to_end(session_id)
+        self.hits += 1
+        return entry.messages[-limit:] if limit > 0 else []
+
+    def put(self, session_id: str, messages: List[Dict[str, str]], complete: bool):
+        """
+        Replace a session's cached history with a fresh database fetch
+
+        Args:
+            session_id: Session identifier
+            messages: Messages in chronological order
+            complete: Whether `messages` is the entire session
+        """
+        self._remove(session_id)
+        entry = _SessionEntry()
+        entry.complete = complete
+        self._sessions[session_id] = entry
+        self._extend(entry, messages)
+        self._evict()
+
+    def append(self, session_id: str, messages: List[Dict[str, str]]):
+        """
+        Append newly stored messages to a cached session
+
+        Sessions that aren't cached are left alone: a partial history must not
+        be mistaken for the whole session.
+        """
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return
+        self._sessions.move_to_end(session_id)
+        self._extend(entry, messages)
+        self._evict()
+
+    def invalidate(self, session_id: str):
+        """Drop a session from the cache"""
+        self._remove(session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit-rate counters"""
+        lookups = self.hits + self.misses
+        return {
+            "sessions": len(self._sessions),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _extend(self, entry: _SessionEntry, messages: List[Dict[str, str]]):
+        for message in messages:
+            cached = {"role": message["role"], "content": message["content"]}
+            if message.get("metadata"):
+                cached["metadata"] = message["metadata"]  # e.g. rolling context summary
+            size = _message_size(cached)
+            entry.messages.append(cached)
+            entry.size += size
+            self._bytes += size
+
+        # Long conversations keep only their tail
+        overflow = len(entry.messages) - self.max_messages
+        if overflow > 0:
+            trimmed = sum(_message_size(m) for m in entry.messages[:overflow])
+            del entry.messages[:overflow]
+            entry.size -= trimmed
+            self._bytes -= trimmed
+            entry.complete = False
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._sessions:
+            session_id, entry = self._sessions.popitem(last=False)
+            self._bytes -= entry.size
+            self.evictions += 1
+
+    def _remove(self, session_id: str):
+        entry = self._sessions.pop(session_id, None)
+        if entry is not None:
+            self._bytes -= entry.size
@@ -0,0 +1,174 @@
+"""
+Intent Classifier
+Local character n-gram TF-IDF classifier over intent descriptions and keywords
+"""
+
+import math
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+
+from app.config import get_settings
+from app.services.data_loader import DataLoader, get_data_loader
+from app.services.text_normalization import normalize_query
+
+logger = structlog.get_logger()
+
+# Character n-gram lengths, taken inside space-padded words
+NGRAM_MIN = 2
+NGRAM_MAX = 4
+
+# General procedures pre-fetched with get_procedural_guidance on the fast path
+FAST_PATH_TOPICS: Dict[str, List[str]] = {
+    "rape_sexual_violence": ["emergency_helplines", "file_fir", "evidence_collection"],
+    "domestic_violence_general": ["safety_planning", "file_fir", "emergency_helplines"],
+    "dowry": ["file_fir", "evidence_collection", "get_legal_aid"],
+    "child_marriage": ["emergency_helplines", "file_gd", "safety_planning"],
+    "sexual_harassment": ["evidence_collection", "file_gd", "get_legal_aid"],
+    "cybercrime": ["evidence_collection", "file_gd", "get_legal_aid"],
+}
+DEFAULT_FAST_PATH_TOPICS = ["court_process", "get_legal_aid"]
+
+
+def char_ngrams(text: str) -> Counter:
+    """Character n-gram counts of the normalized text (script-agnostic, no tokenizer)"""
+    grams = Counter()
+    for word in normalize_query(text).split():
+        padded = f" {word} "
+        for n in range(NGRAM_MIN, NGRAM_MAX + 1):
+            for i in range(len(padded) - n + 1):
+                grams[padded[i:i + n]] += 1
+    return grams
+
+
+class IntentClassifier:
+    """
+    Picks an INTENT_ENUM value for a user message without an LLM call
+
+    Every intent description and keyword in intent_mappings.json is one short
+    document; a message scores each intent by its best cosine similarity to
+    one of that intent's documents. A prediction is confident only when the
+    best score clears `min_score` and beats the runner-up by `min_margin`, so
+    mixed messages (dowry + beating) are left to the model.
+    """
+
+    def __init__(self, loader: DataLoader, min_score: float = 0.42, min_margin: float = 0.1):
+        """
+        Initialize classifier
+
+        Args:
+            loader: Data loader holding intent_mappings
+            min_score: Minimum cosine similarity of the best intent
+            min_margin: Minimum lead over the second-best intent
+        """
+        self.min_score = min_score
+        self.min_margin = min_margin
+
+        documents: List[Tuple[str, Counter]] = []
+        for intent, data in loader.intent_mappings.items():
+            for text in [data.get("description", "")] + data.get("keywords", []):
+                grams = char_ngrams(text)
+                if grams:
+                    documents.append((intent, grams))
+
+        document_frequency = Counter()
+        for _, grams in documents:
+            document_frequency.update(grams.keys())
+        total = len(documents)
+        self._idf = {
+            gram: math.log((1 + total) / (1 + df)) + 1.0
+            for gram, df in document_frequency.items()
+        }
+        self._max_idf = max(self._idf.values(), default=1.0)
+
+        # Inverted index: n-gram -> [(document index, weight)]
+        self._intents = [intent for intent, _ in documents]
+        self._postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        for index, (_, grams) in enumerate(documents):
+            for gram, weight in self._vector(grams).items():
+                self._postings[gram].append((index, weight))
+
+        logger.info("intent_classifier_initialized", intents=len(set(self._intents)), documents=total)
+
+    def _vector(self, grams: Counter) -> Dict[str, float]:
+        """
+        Sublinear TF-IDF, L2-normalized
+
+        N-grams unseen in training count toward the norm at the highest IDF, so
+        a message that is mostly unknown text can't score high on a few shared
+        fragments.
+        """
+        vector = {}
+        norm_sq = 0.0
+        for gram, count in grams.items():
+            weight = (1.0 + math.log(count)) * self._idf.get(gram, self._max_idf)
+            norm_sq += weight * weight
+            if gram in self._idf:
+                vector[gram] = weight
+        norm = math.sqrt(norm_sq)
+        return {gram: w / norm for gram, w in vector.items()} if vector else {}
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Best cosine similarity per intent (intents with no overlap are omitted)"""
+        similarity = defaultdict(float)
+        for gram, weight in self._vector(char_ngrams(text)).items():
+            for index, doc_weight in self._postings[gram]:
+                similarity[index] += weight * doc_weight
+
+        best: Dict[str, float] = {}
+        for index, score in similarity.items():
+            intent = self._intents[index]
+            if score > best.get(intent, 0.0):
+                best[intent] = score
+        return best
+
+    def classify(self, text: str) -> Dict[str, Any]:
+        """
+        Classify a user message
+
+        Returns:
+            Dict with:
+            - intent: Best intent, or None if nothing matched
+            - score: Its similarity
+            - runner_up: Second-best intent (or None)
+            - margin: Lead over the runner-up
+            - confident: Whether the fast path may act on it
+        """
+        ranked = sorted(self.scores(text).items(), key=lambda item: item[1], reverse=True)
+        if not ranked:
+            return {"intent": None, "score": 0.0, "runner_up": None, "margin": 0.0, "confident": False}
+
+        intent, score = ranked[0]
+        runner_up, runner_up_score = ranked[1] if len(ranked) > 1 else (None, 0.0)
+        margin = score - runner_up_score
+        return {
+            "intent": intent,
+            "score": round(score, 4),
+            "runner_up": runner_up,
+            "margin": round(margin, 4),
+            "confident": score >= self.min_score and margin >= self.min_margin,
+        }
+
+
+# Global classifier instance, rebuilt when the DataLoader instance changes (corpus reload)
+_intent_classifier: Optional[IntentClassifier] = None
+_intent_classifier_loader: Optional[DataLoader] = None
+
+
+def get_intent_classifier() -> IntentClassifier:
+    """
+    Get global intent classifier instance
+    Lazy initialization on first call
+    """
+    global _intent_classifier, _intent_classifier_loader
+    loader = get_data_loader()
+    if _intent_classifier is None or _intent_classifier_loader is not loader:
+        settings = get_settings()
+        _intent_classifier = IntentClassifier(
+            loader,
+            min_score=settings.intent_fast_path_min_score,
+            min_margin=settings.intent_fast_path_min_margin,
+        )
+        _intent_classifier_loader = loader
+    return _intent_classifier
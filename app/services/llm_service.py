@@ -3,16 +3,36 @@ LLM Service
 Handles OpenAI GPT-5.1 Chat integration with tool calling
 """
 
+import hashlib
 import json
-from typing import List, Dict, Any, Optional
-from openai import OpenAI
+import time
+from typing import AsyncIterator, List, Dict, Any, Optional, Set, Tuple
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+import httpx
 import structlog
 
-from app.tools.legal_tools import LEGAL_TOOLS, execute_tool
+from app.tools.legal_tools import KEYWORD_TOOLS, LEGAL_TOOLS, semantic_search_available
 from app.config import get_settings
+from app.services.context_builder import ContextBuilder, estimate_tokens
+from app.services.intent_classifier import DEFAULT_FAST_PATH_TOPICS, FAST_PATH_TOPICS, get_intent_classifier
+from app.services.metrics import LLM_ROUND_SECONDS, LLM_ROUNDS, TOKENS
+from app.services.response_cache import get_response_cache
+from app.services.tool_executor import get_tool_executor
+from app.services.turn_timings import record_span
 
 logger = structlog.get_logger()
 
+# Follow-up tool rounds after the first call (browse summaries → drill-down full text)
+TOOL_ROUNDS = 2
+
+# Progress messages streamed to the user while tools run
+TOOL_PROGRESS_MESSAGES = {
+    "get_legal_knowledge": "আইনের ধারা খোঁজা হচ্ছে…",
+    "get_procedural_guidance": "করণীয় পদক্ষেপগুলো দেখা হচ্ছে…",
+    "search_legal_sections": "সংশ্লিষ্ট আইনগুলো অনুসন্ধান করা হচ্ছে…",
+}
+DEFAULT_PROGRESS_MESSAGE = "তথ্য খোঁজা হচ্ছে…"
+
 # System prompt for Bangladesh legal assistant
 SYSTEM_PROMPT = """তুমি বাংলাদেশের নারীদের জন্য একজন বন্ধুর মতো পারিবারিক আইন সহায়ক। তুমি একজন অভিজ্ঞ আইনজীবীর মতো পরামর্শ দাও, কিন্তু সহজ ভাষায়, বন্ধুসুলভ স্বরে।
 
@@ -164,20 +184,434 @@ Assistant: "হ্যাঁ, আপনি হেফাজত পাবেন।
 আদালত ৬-১২ মাসে হেফাজত ঠিক করে, তবে অন্তর্বর্তী আদেশে আগেই সন্তানদের আপনার কাছে রাখতে পারেন। বিনামূল্যে আইন সহায়তার জন্য 16430 নম্বরে ফোন করুন।"""
 
 
+class PromptPrefix:
+    """
+    Static prompt prefix: the system prompt and tool schemas, identical for every user
+
+    Frozen once at import in a canonical form (sorted keys, fixed separators)
+    so the bytes OpenAI sees never drift and its automatic prompt caching can
+    reuse the prefix. The cache key routes requests sharing the prefix to the
+    same cache and changes whenever the prefix does.
+    """
+
+    def __init__(self, tools: List[Dict[str, Any]]):
+        canonical_tools = json.dumps(tools, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        self.tools: List[Dict[str, Any]] = json.loads(canonical_tools)
+        self.hash = hashlib.sha256((SYSTEM_PROMPT + "\x00" + canonical_tools).encode("utf-8")).hexdigest()
+        self.cache_key = f"family-law-{self.hash[:16]}"
+
+
+STATIC_SYSTEM_MESSAGE: Dict[str, str] = {"role": "system", "content": SYSTEM_PROMPT}
+# search_legal_sections offers mode "semantic" only while a real embedding index is loaded
+KEYWORD_PREFIX = PromptPrefix(KEYWORD_TOOLS)
+SEMANTIC_PREFIX = PromptPrefix(LEGAL_TOOLS)
+
+
+def current_prompt_prefix() -> PromptPrefix:
+    """Prefix for a new turn (kept for all of its calls, so they share one cached prefix)"""
+    return SEMANTIC_PREFIX if semantic_search_available() else KEYWORD_PREFIX
+
+
+class TurnUsage:
+    """Token accounting across the completion calls of one turn"""
+
+    def __init__(self):
+        self.total_tokens = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_calls = 0
+
+    def add(self, usage, round_label: Any, started: float):
+        """
+        Record one completion call's usage and latency
+
+        Args:
+            usage: API usage (may be None if the API omitted it)
+            round_label: Round number or "final", for logging and metrics
+            started: time.perf_counter() when the call was made
+        """
+        self.completion_calls += 1
+        LLM_ROUND_SECONDS.observe(time.perf_counter() - started, str(round_label))
+        record_span(f"llm_{round_label}", started)
+        if usage is None:
+            return
+
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = (getattr(details, "cached_tokens", 0) or 0) if details else 0
+        self.total_tokens += usage.total_tokens
+        self.prompt_tokens += usage.prompt_tokens
+        self.cached_tokens += cached
+        TOKENS.inc("prompt", amount=usage.prompt_tokens)
+        TOKENS.inc("cached", amount=cached)
+        TOKENS.inc("completion", amount=usage.completion_tokens)
+        logger.info(
+            "completion_usage",
+            round=round_label,
+            prompt_tokens=usage.prompt_tokens,
+            cached_tokens=cached,
+            completion_tokens=usage.completion_tokens,
+        )
+
+
+class TurnSections:
+    """
+    Law sections sent in full during one turn
+
+    A section whose text is already in the conversation (e.g. from
+    get_legal_knowledge, then again in a search_legal_sections drill-down)
+    is replaced in later tool results by a short reference to it. The
+    tokens avoided are counted for every completion call made after the
+    replacement, since each of them would have resent the duplicate.
+    """
+
+    def __init__(self, usage: TurnUsage):
+        self.usage = usage
+        self.delivered: Set[Tuple[str, str]] = set()  # (act_id, section_number)
+        self.duplicates = 0
+        self._avoided: List[Tuple[int, int]] = []  # (tokens, completion calls made before the replacement)
+
+    def dedup(self, content: str) -> Tuple[str, int]:
+        """
+        Replace already-delivered full-text sections in one tool result
+
+        Returns:
+            (content, number of sections replaced)
+        """
+        if '"section_text"' not in content:
+            return content, 0
+        result = json.loads(content)
+        sections = result.get("legal_sections") if isinstance(result, dict) else None
+        if not sections:
+            return content, 0
+
+        replaced = 0
+        avoided = 0
+        for index, section in enumerate(sections):
+            if "section_text" not in section:
+                continue
+            key = (section["act_id"], section["section_number"])
+            if key not in self.delivered:
+                if not section.get("section_text_truncated"):
+                    self.delivered.add(key)
+                continue
+            reference = {
+                "act_id": section["act_id"],
+                "section_number": section["section_number"],
+                "section_title": section.get("section_title"),
+                "already_provided": f"already provided above: act {key[0]} §{key[1]}",
+            }
+            avoided += (
+                estimate_tokens(json.dumps(section, ensure_ascii=False))
+                - estimate_tokens(json.dumps(reference, ensure_ascii=False))
+            )
+            sections[index] = reference
+            replaced += 1
+
+        if not replaced:
+            return content, 0
+        self.duplicates += replaced
+        self._avoided.append((avoided, self.usage.completion_calls))
+        return json.dumps(result, ensure_ascii=False), replaced
+
+    def tokens_saved(self) -> int:
+        """Duplicate law-text tokens not sent, over every call this turn"""
+        return sum(tokens * (self.usage.completion_calls - calls_before) for tokens, calls_before in self._avoided)
 
 
 class LLMService:
     """Service for interacting with OpenAI GPT-5.1 Chat"""
 
     def __init__(self):
-        """Initialize OpenAI client"""
+        """Initialize async OpenAI client with a pooled HTTP client"""
         settings = get_settings()
 
-        self.client = OpenAI(api_key=settings.openai_api_key)
+        # One keep-alive pool shared by every request in this worker
+        self.http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=settings.openai_max_connections,
+                max_keepalive_connections=settings.openai_max_connections,
+            ),
+        )
+        self.client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url or None,
+            timeout=httpx.Timeout(settings.openai_timeout_seconds, connect=10.0),
+            http_client=self.http_client,
+        )
         self.model = settings.openai_model
-        logger.info("llm_service_initialized", model=self.model)
+        self.context_builder = ContextBuilder(
+            self.client,
+            model=settings.context_summary_model or self.model,
+            budget_tokens=settings.context_budget_tokens,
+            keep_turns=settings.context_keep_turns,
+        )
+        self.intent_fast_path_enabled = settings.intent_fast_path_enabled
+        logger.info("llm_service_initialized", model=self.model, keyword_prefix_hash=KEYWORD_PREFIX.hash[:16],
+                    semantic_prefix_hash=SEMANTIC_PREFIX.hash[:16])
+
+    async def close(self):
+        """Close the underlying HTTP connection pool"""
+        await self.client.close()
+
+    def _build_messages(
+        self,
+        user_message: str,
+        context_messages: List[Dict[str, str]],
+    ) -> List[Dict[str, Any]]:
+        """Build the messages array: system prompt + assembled history + current user message"""
+        messages = [STATIC_SYSTEM_MESSAGE]
+
+        # Add conversation history (summary + recent turns from the context builder)
+        messages.extend(context_messages)
+
+        # Add current user message
+        messages.append({"role": "user", "content": user_message})
+        return messages
+
+    def _completion_kwargs(
+        self,
+        messages: List[Dict[str, Any]],
+        prefix: PromptPrefix,
+        allow_tools: bool,
+        stream: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Arguments for one completion call
+
+        Tools are always sent, even on the forced-text final round (which uses
+        tool_choice="none"), so every call shares the same cached prefix.
+        """
+        kwargs = {
+            "model": self.model,
+            "messages": messages,
+            "tools": prefix.tools,
+            "tool_choice": "auto" if allow_tools else "none",
+            "parallel_tool_calls": True,  # Call all tools in parallel
+            "reasoning_effort": "medium",  # GPT-5.1-chat-latest supports 'medium'
+            "extra_body": {"prompt_cache_key": prefix.cache_key},
+        }
+        if stream:
+            kwargs["stream"] = True
+            kwargs["stream_options"] = {"include_usage": True}
+        return kwargs
+
+    @staticmethod
+    def _parse_arguments(arguments: Optional[str]) -> Any:
+        """Tool call arguments; malformed JSON is passed on as the raw string, which the tool rejects"""
+        try:
+            return json.loads(arguments or "{}")
+        except ValueError:
+            return arguments
+
+    async def _execute_tool_calls(
+        self,
+        tool_calls: List[Dict[str, str]],
+        messages: List[Dict[str, Any]],
+        tools_used: List[Dict[str, Any]],
+        sections: TurnSections,
+        round_label: Any,
+        fast_path: bool = False,
+    ):
+        """
+        Execute one round of tool calls (concurrently) and append the tool messages
+
+        Args:
+            tool_calls: List of {"id", "name", "arguments"} (arguments as JSON string)
+            messages: Conversation messages (tool results are appended)
+            tools_used: Accumulated tool usage records (appended)
+            sections: This turn's delivered sections (repeated law text becomes a reference)
+            round_label: Round number, "final" or "fast_path", for logging
+            fast_path: Calls were made by the local classifier, not the model
+        """
+        calls = [(tool_call["name"], self._parse_arguments(tool_call["arguments"])) for tool_call in tool_calls]
+        for function_name, function_args in calls:
+            logger.info("executing_tool", tool=function_name, args=function_args, round=round_label)
+        started = time.perf_counter()
+        results = await get_tool_executor().run(calls)
+        record_span(f"tools_{round_label}", started)
+
+        for tool_call, (function_name, function_args), (content, tool_info) in zip(tool_calls, calls, results):
+            content, repeated = sections.dedup(content)
+            tool_use = {
+                "tool": function_name,
+                "args": function_args,
+                "sections_count": tool_info["sections_count"],
+                "tokens": tool_info["tokens"],
+            }
+            if fast_path:
+                tool_use["fast_path"] = True  # Not the model's choice; excluded from intent evaluation
+            if tool_info["cached"]:
+                tool_use["cached"] = True
+            if tool_info.get("trimmed"):
+                tool_use["trimmed"] = True
+            if tool_info.get("reference_misses"):
+                tool_use["reference_misses"] = tool_info["reference_misses"]
+            if repeated:
+                tool_use["sections_already_provided"] = repeated
+                tool_use["tokens"] = estimate_tokens(content)
+            tools_used.append(tool_use)
+            messages.append({
+                "role": "tool",
+                "tool_call_id": tool_call["id"],
+                "name": function_name,
+                "content": content
+            })
+
+    @staticmethod
+    def _assistant_tool_call_message(tool_calls: List[Dict[str, str]], content: Optional[str] = None) -> Dict[str, Any]:
+        """Assistant message carrying plain {"id", "name", "arguments"} tool calls"""
+        return {
+            "role": "assistant",
+            "content": content,
+            "tool_calls": [
+                {
+                    "id": call["id"],
+                    "type": "function",
+                    "function": {"name": call["name"], "arguments": call["arguments"]},
+                }
+                for call in tool_calls
+            ],
+        }
+
+    def _fast_path_calls(
+        self,
+        user_message: str,
+        conversation_history: Optional[List[Dict[str, str]]],
+    ) -> Tuple[Optional[str], List[Dict[str, str]]]:
+        """
+        Intent tool calls to pre-execute when the local classifier is confident
+
+        Only on first turns. The calls are run as if the model had made them,
+        so the first completion starts with the law text and guidance instead
+        of spending a round choosing the intent.
+
+        Returns:
+            (intent acted on, tool calls), or (None, []) when the model decides
+        """
+        if not self.intent_fast_path_enabled or conversation_history:
+            return None, []
+
+        # Looked up per turn: the classifier is rebuilt for each corpus generation
+        prediction = get_intent_classifier().classify(user_message)
+        logger.info("intent_fast_path_prediction", **prediction)
+        if not prediction["confident"]:
+            return None, []
+
+        intent = prediction["intent"]
+        topics = FAST_PATH_TOPICS.get(intent, DEFAULT_FAST_PATH_TOPICS)
+        return intent, [
+            {
+                "id": "call_fast_path_legal",
+                "name": "get_legal_knowledge",
+                "arguments": json.dumps({"intent": intent}),
+            },
+            {
+                "id": "call_fast_path_guidance",
+                "name": "get_procedural_guidance",
+                "arguments": json.dumps({"intent": intent, "topics": topics}),
+            },
+        ]
+
+    async def _run_fast_path(
+        self,
+        user_message: str,
+        conversation_history: Optional[List[Dict[str, str]]],
+        messages: List[Dict[str, Any]],
+        tools_used: List[Dict[str, Any]],
+        sections: TurnSections,
+    ) -> Optional[str]:
+        """
+        Pre-execute the intent tools when the local classifier is confident
 
-    def chat(
+        Returns:
+            The intent acted on, or None
+        """
+        intent, tool_calls = self._fast_path_calls(user_message, conversation_history)
+        if tool_calls:
+            messages.append(self._assistant_tool_call_message(tool_calls))
+            await self._execute_tool_calls(tool_calls, messages, tools_used, sections, "fast_path", fast_path=True)
+        return intent
+
+    async def _stream_tool_round(
+        self,
+        tool_calls: List[Dict[str, str]],
+        messages: List[Dict[str, Any]],
+        tools_used: List[Dict[str, Any]],
+        sections: TurnSections,
+        round_label: Any,
+        fast_path: bool = False,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Execute one round of tool calls, with a tool_start event per call before and a tool_end event after"""
+        for call in tool_calls:
+            yield {
+                "event": "progress",
+                "data": {
+                    "stage": "tool_start",
+                    "tool": call["name"],
+                    "message": TOOL_PROGRESS_MESSAGES.get(call["name"], DEFAULT_PROGRESS_MESSAGE),
+                },
+            }
+
+        first = len(tools_used)
+        await self._execute_tool_calls(tool_calls, messages, tools_used, sections, round_label, fast_path=fast_path)
+        for tool_use in tools_used[first:]:
+            yield {
+                "event": "progress",
+                "data": {"stage": "tool_end", "tool": tool_use["tool"], "sections_count": tool_use["sections_count"]},
+            }
+
+    @staticmethod
+    def _tokens_saved(context: Dict[str, Any], completion_calls: int) -> int:
+        """History tokens not sent thanks to the context builder, over every call this turn"""
+        saved_per_call = max(0, context["tokens_full"] - context["tokens_sent"])
+        return saved_per_call * completion_calls - context["summary_tokens_used"]
+
+    def _response_cache_key(
+        self,
+        user_message: str,
+        conversation_history: Optional[List[Dict[str, str]]],
+        prefix: PromptPrefix,
+    ) -> Optional[str]:
+        """Response cache key for a first turn, or None if this turn can't be cached"""
+        response_cache = get_response_cache()
+        if response_cache is None or conversation_history:
+            return None
+        return response_cache.key(user_message, self.model, prefix.hash)
+
+    def _cached_result(self, cached: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn result for a response cache hit (no completion calls made)"""
+        return {
+            "response": cached["response"],
+            "tools_used": cached["tools_used"],
+            "tokens_used": 0,
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+            "model": self.model,
+            "context_summary": None,
+            "context_tokens_saved": 0,
+            "dedup_tokens_saved": 0,
+            "response_cache": "hit",
+            "success": True
+        }
+
+    def _store_cached_result(self, cache_key: Optional[str], result: Dict[str, Any]):
+        """Remember a successful first-turn answer"""
+        if cache_key and result["response"]:
+            get_response_cache().set(cache_key, {"response": result["response"], "tools_used": result["tools_used"]})
+
+    @staticmethod
+    def _tool_calls_from_message(message) -> List[Dict[str, str]]:
+        """Convert SDK tool call objects into plain {"id", "name", "arguments"} dicts"""
+        return [
+            {
+                "id": tool_call.id,
+                "name": tool_call.function.name,
+                "arguments": tool_call.function.arguments,
+            }
+            for tool_call in message.tool_calls
+        ]
+
+    async def chat(
         self,
         user_message: str,
         conversation_history: Optional[List[Dict[str, str]]] = None,
@@ -192,119 +626,87 @@ class LLMService:
         Returns:
             Dict with response, tools_used, tokens_used, etc.
         """
-        # Build messages array
-        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
-
-        # Add conversation history
-        if conversation_history:
-            messages.extend(conversation_history)
-
-        # Add current user message
-        messages.append({"role": "user", "content": user_message})
-
         # Track tools used
         tools_used = []
-        total_tokens = 0
+        usage = TurnUsage()
+        sections = TurnSections(usage)
 
         logger.info("chat_request", user_message=user_message[:100], history_length=len(conversation_history or []))
 
+        prefix = current_prompt_prefix()
+        cache_key = self._response_cache_key(user_message, conversation_history, prefix)
+        if cache_key:
+            cached = get_response_cache().get(cache_key)
+            if cached:
+                logger.info("response_cache_hit", response_length=len(cached["response"]))
+                return self._cached_result(cached)
+
         try:
+            started = time.perf_counter()
+            context = await self.context_builder.build(conversation_history or [])
+            record_span("context", started)
+            usage.total_tokens += context["summary_tokens_used"]
+            messages = self._build_messages(user_message, context["messages"])
+            fast_path_intent = await self._run_fast_path(user_message, conversation_history, messages, tools_used, sections)
+
             # First API call with tools
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                tools=LEGAL_TOOLS,
-                tool_choice="auto",
-                reasoning_effort="medium",  # GPT-5.1-chat-latest supports 'medium'
-                parallel_tool_calls=True,  # Call both tools in parallel
+            started = time.perf_counter()
+            response = await self.client.chat.completions.create(
+                **self._completion_kwargs(messages, prefix, allow_tools=True)
             )
 
             message = response.choices[0].message
-            total_tokens += response.usage.total_tokens
+            usage.add(response.usage, round_label=0, started=started)
 
-            # Allow up to 2 rounds of tool calling (browse summaries → drill-down full text)
-            for round_num in range(2):
+            # Allow up to 2 rounds of tool calling (browse summaries → drill-down full text);
+            # if the model still calls tools after that, run them and force a text answer
+            for round_num in range(TOOL_ROUNDS + 1):
                 if not message.tool_calls:
                     break
 
+                final_round = round_num == TOOL_ROUNDS
+                round_label = "final" if final_round else round_num + 1
                 messages.append(message.model_dump())
-
-                for tool_call in message.tool_calls:
-                    function_name = tool_call.function.name
-                    function_args = json.loads(tool_call.function.arguments)
-                    logger.info("executing_tool", tool=function_name, args=function_args, round=round_num + 1)
-                    tool_result = execute_tool(function_name, function_args)
-                    tools_used.append({
-                        "tool": function_name,
-                        "args": function_args,
-                        "sections_count": tool_result.get("sections_count", 0)
-                    })
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "name": function_name,
-                        "content": json.dumps(tool_result, ensure_ascii=False)
-                    })
-
-                # Next call WITH tools so model can do a second round if needed
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    tools=LEGAL_TOOLS,
-                    tool_choice="auto",
-                    reasoning_effort="medium",
-                    parallel_tool_calls=True,
+                await self._execute_tool_calls(
+                    self._tool_calls_from_message(message), messages, tools_used, sections, round_label
                 )
-                message = response.choices[0].message
-                total_tokens += response.usage.total_tokens
-
-            # If the last response still has tool calls (after 2 rounds), execute and force text
-            if message.tool_calls:
-                messages.append(message.model_dump())
 
-                for tool_call in message.tool_calls:
-                    function_name = tool_call.function.name
-                    function_args = json.loads(tool_call.function.arguments)
-                    logger.info("executing_tool", tool=function_name, args=function_args, round="final")
-                    tool_result = execute_tool(function_name, function_args)
-                    tools_used.append({
-                        "tool": function_name,
-                        "args": function_args,
-                        "sections_count": tool_result.get("sections_count", 0)
-                    })
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "name": function_name,
-                        "content": json.dumps(tool_result, ensure_ascii=False)
-                    })
-
-                # Final call WITHOUT tools — force text response
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    reasoning_effort="medium",
+                started = time.perf_counter()
+                response = await self.client.chat.completions.create(
+                    **self._completion_kwargs(messages, prefix, allow_tools=not final_round)
                 )
                 message = response.choices[0].message
-                total_tokens += response.usage.total_tokens
+                usage.add(response.usage, round_label=round_label, started=started)
 
             # Get final text response
             final_response = message.content or ""
 
+            LLM_ROUNDS.observe(usage.completion_calls)
             logger.info(
                 "chat_response_complete",
+                fast_path_intent=fast_path_intent,
                 tools_used_count=len(tools_used),
-                total_tokens=total_tokens,
+                duplicate_sections=sections.duplicates,
+                total_tokens=usage.total_tokens,
+                cached_tokens=usage.cached_tokens,
                 response_length=len(final_response)
             )
 
-            return {
+            result = {
                 "response": final_response,
                 "tools_used": tools_used,
-                "tokens_used": total_tokens,
+                "tokens_used": usage.total_tokens,
+                "prompt_tokens": usage.prompt_tokens,
+                "cached_tokens": usage.cached_tokens,
                 "model": self.model,
+                "context_summary": context["summary"],
+                "context_tokens_saved": self._tokens_saved(context, usage.completion_calls),
+                "dedup_tokens_saved": sections.tokens_saved(),
+                "response_cache": "miss" if cache_key else None,
                 "success": True
             }
+            self._store_cached_result(cache_key, result)
+            return result
 
         except Exception as e:
             logger.error("chat_error", error=str(e), error_type=type(e).__name__)
@@ -312,10 +714,151 @@ class LLMService:
                 "response": "দুঃখিত, একটি সমস্যা হয়েছে। অনুগ্রহ করে আবার চেষ্টা করুন।",
                 "error": str(e),
                 "tools_used": tools_used,
-                "tokens_used": total_tokens,
+                "tokens_used": usage.total_tokens,
                 "success": False
             }
 
+    async def chat_stream(
+        self,
+        user_message: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of chat()
+
+        Every completion call is streamed. Text deltas are forwarded as soon as
+        they arrive; tool-call deltas are accumulated and executed between rounds
+        (and the fast-path tools before the first), with tool_start / tool_end
+        progress events so the user sees activity immediately. Only the last
+        round's text is the answer: a round that ends with tool calls is
+        followed by a "discard" event, so the client drops the text it sent.
+
+        Args:
+            user_message: The user's message
+            conversation_history: Previous messages in conversation
+
+        Yields:
+            Events as {"event": "progress" | "token" | "discard" | "done" | "error", "data": {...}}.
+            The "done" event carries the same dict chat() returns.
+        """
+        tools_used = []
+        usage = TurnUsage()
+        sections = TurnSections(usage)
+        round_content: List[str] = []
+
+        logger.info("chat_stream_request", user_message=user_message[:100], history_length=len(conversation_history or []))
+
+        prefix = current_prompt_prefix()
+        cache_key = self._response_cache_key(user_message, conversation_history, prefix)
+        if cache_key:
+            cached = get_response_cache().get(cache_key)
+            if cached:
+                logger.info("response_cache_hit", response_length=len(cached["response"]))
+                yield {"event": "token", "data": {"delta": cached["response"]}}
+                yield {"event": "done", "data": self._cached_result(cached)}
+                return
+
+        try:
+            started = time.perf_counter()
+            context = await self.context_builder.build(conversation_history or [])
+            record_span("context", started)
+            usage.total_tokens += context["summary_tokens_used"]
+            messages = self._build_messages(user_message, context["messages"])
+            fast_path_intent, fast_path_calls = self._fast_path_calls(user_message, conversation_history)
+            if fast_path_calls:
+                messages.append(self._assistant_tool_call_message(fast_path_calls))
+                async for event in self._stream_tool_round(
+                    fast_path_calls, messages, tools_used, sections, "fast_path", fast_path=True
+                ):
+                    yield event
+
+            # First call + TOOL_ROUNDS follow-ups with tools, then one forced text call
+            for round_num in range(TOOL_ROUNDS + 2):
+                final_round = round_num == TOOL_ROUNDS + 1
+                started = time.perf_counter()
+                stream = await self.client.chat.completions.create(
+                    **self._completion_kwargs(messages, prefix, allow_tools=not final_round, stream=True)
+                )
+                round_usage = None
+
+                round_content = []  # text of this round only; the last round's is the answer
+                tool_calls: Dict[int, Dict[str, str]] = {}
+                async for chunk in stream:
+                    if chunk.usage:
+                        round_usage = chunk.usage
+                    if not chunk.choices:
+                        continue
+
+                    delta = chunk.choices[0].delta
+                    if delta.content:
+                        round_content.append(delta.content)
+                        yield {"event": "token", "data": {"delta": delta.content}}
+
+                    # Tool call arguments arrive in fragments keyed by index
+                    for tool_delta in delta.tool_calls or []:
+                        entry = tool_calls.setdefault(tool_delta.index, {"id": "", "name": "", "arguments": ""})
+                        if tool_delta.id:
+                            entry["id"] = tool_delta.id
+                        if tool_delta.function:
+                            entry["name"] += tool_delta.function.name or ""
+                            entry["arguments"] += tool_delta.function.arguments or ""
+
+                usage.add(round_usage, round_label="final" if final_round else round_num, started=started)
+                if not tool_calls:
+                    break
+                if round_content:
+                    # Not the answer: neither stored nor cached, so the client must not keep it either
+                    yield {"event": "discard", "data": {"reason": "tool_calls"}}
+
+                ordered_calls = [tool_calls[index] for index in sorted(tool_calls)]
+                messages.append(self._assistant_tool_call_message(ordered_calls, "".join(round_content) or None))
+
+                round_label = round_num + 1 if round_num < TOOL_ROUNDS else "final"
+                async for event in self._stream_tool_round(ordered_calls, messages, tools_used, sections, round_label):
+                    yield event
+
+            final_response = "".join(round_content)
+
+            LLM_ROUNDS.observe(usage.completion_calls)
+            logger.info(
+                "chat_stream_complete",
+                fast_path_intent=fast_path_intent,
+                tools_used_count=len(tools_used),
+                duplicate_sections=sections.duplicates,
+                total_tokens=usage.total_tokens,
+                cached_tokens=usage.cached_tokens,
+                response_length=len(final_response)
+            )
+
+            result = {
+                "response": final_response,
+                "tools_used": tools_used,
+                "tokens_used": usage.total_tokens,
+                "prompt_tokens": usage.prompt_tokens,
+                "cached_tokens": usage.cached_tokens,
+                "model": self.model,
+                "context_summary": context["summary"],
+                "context_tokens_saved": self._tokens_saved(context, usage.completion_calls),
+                "dedup_tokens_saved": sections.tokens_saved(),
+                "response_cache": "miss" if cache_key else None,
+                "success": True
+            }
+            self._store_cached_result(cache_key, result)
+            yield {"event": "done", "data": result}
+
+        except Exception as e:
+            logger.error("chat_stream_error", error=str(e), error_type=type(e).__name__)
+            yield {
+                "event": "error",
+                "data": {
+                    "response": "দুঃখিত, একটি সমস্যা হয়েছে। অনুগ্রহ করে আবার চেষ্টা করুন।",
+                    "error": str(e),
+                    "tools_used": tools_used,
+                    "tokens_used": usage.total_tokens,
+                    "success": False
+                },
+            }
+
 
 # Global LLM service instance
 _llm_service: Optional[LLMService] = None
@@ -330,3 +873,11 @@ def get_llm_service() -> LLMService:
     if _llm_service is None:
         _llm_service = LLMService()
     return _llm_service
+
+
+async def close_llm_service():
+    """Close the global LLM service (called on shutdown)"""
+    global _llm_service
+    if _llm_service is not None:
+        await _llm_service.close()
+        _llm_service = None
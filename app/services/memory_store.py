@@ -0,0 +1,204 @@
+"""
+Memory Store
+Bounded in-process conversation storage used when Supabase isn't configured
+"""
+
+import sys
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from itertools import islice
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Fixed per-message overhead (dict, id/role/timestamp strings) added to the content size
+_MESSAGE_OVERHEAD_BYTES = 600
+
+
+def _message_size(message: Dict[str, Any]) -> int:
+    """Approximate resident size of one stored message"""
+    size = sys.getsizeof(message["content"]) + _MESSAGE_OVERHEAD_BYTES
+    for value in message["metadata"].values():
+        if isinstance(value, str):
+            size += sys.getsizeof(value)  # e.g. rolling context summary
+    return size
+
+
+class _Session:
+    __slots__ = ("messages", "size", "next_id", "touched_at")
+
+    def __init__(self, max_messages: int):
+        self.messages: Deque[Dict[str, Any]] = deque(maxlen=max_messages)
+        self.size = 0
+        self.next_id = 0  # message ids are mem-0, mem-1, ... and survive trimming
+        self.touched_at = time.monotonic()
+
+    @property
+    def first_id(self) -> int:
+        return self.next_id - len(self.messages)
+
+
+class MemoryConversationStore:
+    """
+    Conversation rows kept in process memory, with bounds
+
+    Each session is a deque (O(1) append, O(k) reads of its last k
+    messages) holding at most `max_messages`; older messages fall off.
+    Sessions idle for `ttl_seconds` expire, and the least recently used
+    sessions are evicted while the store is over `max_bytes`. Sessions are
+    kept in last-use order, so both checks only look at the oldest end.
+
+    Note: this is the no-Supabase fallback (local runs, staging, load
+    tests); nothing survives a restart and workers don't share sessions.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_messages: int = 200, ttl_seconds: float = 86400):
+        """
+        Initialize store
+
+        Args:
+            max_bytes: Memory budget across all sessions
+            max_messages: Messages kept per session (oldest dropped first)
+            ttl_seconds: Idle seconds before a session is dropped
+        """
+        self.max_bytes = max_bytes
+        self.max_messages = max_messages
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._bytes = 0
+        self._messages = 0
+
+        # Counters
+        self.stored = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.trimmed = 0
+
+    def append(
+        self,
+        profile_id: str,
+        session_id: str,
+        role: str,
+        content: str,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Store one message
+
+        Returns:
+            The stored row (id, profile_id, session_id, role, content, metadata, created_at)
+        """
+        self._expire()
+        session = self._session(session_id, create=True)
+        message = {
+            "id": f"mem-{session.next_id}",
+            "profile_id": profile_id,
+            "session_id": session_id,
+            "role": role,
+            "content": content,
+            "metadata": metadata or {},
+            "created_at": datetime.now().isoformat(),
+        }
+        if len(session.messages) == session.messages.maxlen:
+            dropped = _message_size(session.messages[0])
+            session.size -= dropped
+            self._bytes -= dropped
+            self._messages -= 1
+            self.trimmed += 1
+
+        size = _message_size(message)
+        session.messages.append(message)
+        session.next_id += 1
+        session.size += size
+        self._bytes += size
+        self._messages += 1
+        self.stored += 1
+        self._evict(keep=session_id)
+        return message
+
+    def tail(self, session_id: str, limit: int) -> List[Dict[str, Any]]:
+        """Last `limit` messages of a session, in chronological order"""
+        session = self._session(session_id)
+        if session is None or limit <= 0:
+            return []
+        messages = list(islice(reversed(session.messages), limit))
+        messages.reverse()
+        return messages
+
+    def page(self, session_id: str, limit: int, before_id: Optional[str] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        One page of a session, newest first (same contract as the keyset RPC)
+
+        Args:
+            session_id: Session identifier
+            limit: Messages per page
+            before_id: Return messages older than this message id (None = latest)
+
+        Returns:
+            (messages in chronological order, whether older messages exist)
+        """
+        session = self._session(session_id)
+        if session is None:
+            return [], False
+
+        end = len(session.messages)
+        if before_id is not None:
+            try:
+                end = int(before_id.removeprefix("mem-")) - session.first_id
+            except ValueError:
+                end = 0
+            end = min(max(end, 0), len(session.messages))
+        start = max(0, end - limit)
+        return list(islice(session.messages, start, end)), start > 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and eviction counters"""
+        return {
+            "sessions": len(self._sessions),
+            "messages": self._messages,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "stored": self.stored,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "trimmed": self.trimmed,
+        }
+
+    def _session(self, session_id: str, create: bool = False) -> Optional[_Session]:
+        """Get (and touch) a live session; expired ones are dropped"""
+        session = self._sessions.get(session_id)
+        now = time.monotonic()
+        if session is not None and now - session.touched_at > self.ttl_seconds:
+            self._remove(session_id)
+            self.expirations += 1
+            session = None
+        if session is None:
+            if not create:
+                return None
+            session = _Session(self.max_messages)
+            self._sessions[session_id] = session
+        session.touched_at = now
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def _expire(self):
+        now = time.monotonic()
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.touched_at <= self.ttl_seconds:
+                break
+            self._remove(session_id)
+            self.expirations += 1
+
+    def _evict(self, keep: str):
+        while self._bytes > self.max_bytes and len(self._sessions) > 1:
+            session_id = next(iter(self._sessions))
+            if session_id == keep:
+                break
+            self._remove(session_id)
+            self.evictions += 1
+
+    def _remove(self, session_id: str):
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            self._bytes -= session.size
+            self._messages -= len(session.messages)
@@ -0,0 +1,155 @@
+"""
+Metrics
+In-process Prometheus counters and histograms, exposed at GET /metrics
+"""
+
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+# Upper bounds in seconds, per kind of stage
+REQUEST_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 7.5, 10, 15, 20, 30, 45, 60, 90, 120)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 3, 5, 7.5, 10, 15, 20, 30, 45, 60, 90)
+IO_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Completion calls per turn: first call, up to two tool rounds, forced final
+ROUND_BUCKETS = (1, 2, 3, 4)
+TOOL_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter per label combination"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        """Add amount for the given label values (positional, in labelnames order)"""
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_labels(self.labelnames, labels)} {value:g}" for labels, value in sorted(self._values.items())]
+
+
+class _Series:
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size  # per bucket, not cumulative; last slot is +Inf
+        self.sum = 0.0
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram per label combination
+
+    An observation is a bisect over the bounds plus two additions, so it can
+    sit on the request path. Quantiles (p95) are computed by Prometheus
+    from the cumulative buckets.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = IO_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], _Series] = {}
+
+    def observe(self, value: float, *labels: str):
+        """Record one value (seconds, or a count) for the given label values"""
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = _Series(len(self.buckets) + 1)
+        series.counts[bisect_left(self.buckets, value)] += 1
+        series.sum += value
+
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series.counts):
+                cumulative += count
+                le = '"+Inf"' if bound == float("inf") else f'"{bound:g}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, 'le=' + le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series.sum:.6g}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Metrics rendered together in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: List = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry. Observations are made on the event loop thread
+# (tool timings are recorded after the worker threads return), so plain
+# dict and int updates are enough.
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "family_law_request_duration_seconds", "Chat request time, history fetch to persisted turn",
+    ("endpoint",), REQUEST_BUCKETS,
+))
+HISTORY_FETCH_SECONDS = REGISTRY.register(Histogram(
+    "family_law_history_fetch_seconds", "Conversation history fetch time by source",
+    ("source",), IO_BUCKETS,
+))
+LLM_ROUND_SECONDS = REGISTRY.register(Histogram(
+    "family_law_llm_round_duration_seconds", "Completion call time by tool round (0 = first call)",
+    ("round",), LLM_BUCKETS,
+))
+LLM_ROUNDS = REGISTRY.register(Histogram(
+    "family_law_llm_rounds_per_turn", "Completion calls per completed turn (cached answers excluded)",
+    (), ROUND_BUCKETS,
+))
+TOOL_SECONDS = REGISTRY.register(Histogram(
+    "family_law_tool_duration_seconds", "Tool execution time, cache misses only",
+    ("tool",), TOOL_BUCKETS,
+))
+SUPABASE_WRITE_SECONDS = REGISTRY.register(Histogram(
+    "family_law_supabase_write_duration_seconds", "Supabase insert/update time by table",
+    ("table",), IO_BUCKETS,
+))
+SUPABASE_WRITE_ERRORS = REGISTRY.register(Counter(
+    "family_law_supabase_write_errors_total", "Failed Supabase writes by table", ("table",),
+))
+TURNS = REGISTRY.register(Counter(
+    "family_law_turns_total", "Chat turns by endpoint and outcome", ("endpoint", "outcome"),
+))
+TOOL_CALLS = REGISTRY.register(Counter(
+    "family_law_tool_calls_total", "Tool calls by tool and whether the result was cached", ("tool", "cached"),
+))
+TOKENS = REGISTRY.register(Counter(
+    "family_law_tokens_total", "Tokens by kind (prompt includes cached; summary = rolling context summary)", ("kind",),
+))
@@ -0,0 +1,94 @@
+"""
+Profile Cache
+Per-process TTL/LRU cache of profile IDs known to exist in user_profiles
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+
+class ProfileCache:
+    """
+    Remembers which profiles already exist so ensure_profile can skip the RPC
+
+    Hits also record a pending `last_active` touch; the owner drains those
+    periodically and writes them as one bulk UPDATE.
+    """
+
+    def __init__(self, max_size: int = 100000, ttl_seconds: float = 3600):
+        """
+        Initialize cache
+
+        Args:
+            max_size: Maximum profile IDs kept (least recently used evicted first)
+            ttl_seconds: Seconds before a cached profile is re-verified with the RPC
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, float]" = OrderedDict()  # profile_id -> verified_at
+        self._pending_touches: Dict[str, None] = {}  # Insertion-ordered set
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.touches_flushed = 0
+
+    def contains(self, profile_id: str) -> bool:
+        """Check (and count) whether a profile is known to exist"""
+        verified_at = self._entries.get(profile_id)
+        if verified_at is None:
+            self.misses += 1
+            return False
+
+        if time.monotonic() - verified_at > self.ttl_seconds:
+            del self._entries[profile_id]
+            self.expirations += 1
+            self.misses += 1
+            return False
+
+        self._entries.move_to_end(profile_id)
+        self.hits += 1
+        return True
+
+    def add(self, profile_id: str):
+        """Mark a profile as existing (just created or verified by the RPC)"""
+        if self.max_size <= 0:
+            return
+        self._entries[profile_id] = time.monotonic()
+        self._entries.move_to_end(profile_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def discard(self, profile_id: str):
+        """Forget a profile (e.g. an insert referencing it failed)"""
+        self._entries.pop(profile_id, None)
+
+    def touch(self, profile_id: str):
+        """Record that a profile was active; written later by drain_touches()"""
+        self._pending_touches[profile_id] = None
+
+    def drain_touches(self) -> List[str]:
+        """Return and clear the profile IDs whose last_active needs updating"""
+        profile_ids = list(self._pending_touches)
+        self._pending_touches.clear()
+        self.touches_flushed += len(profile_ids)
+        return profile_ids
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit-rate counters"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "pending_touches": len(self._pending_touches),
+            "touches_flushed": self.touches_flushed,
+        }
@@ -0,0 +1,289 @@
+"""
+Response Cache
+Opt-in cache of complete answers to first-turn questions (no history)
+"""
+
+import abc
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import structlog
+
+from app.config import get_settings
+from app.services.corpus_validation import data_signature, data_version
+from app.services.text_normalization import normalize_query
+
+logger = structlog.get_logger()
+
+
+class CacheBackend(abc.ABC):
+    """Key/value store with per-entry expiry; values are JSON-serializable dicts"""
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Stored value, or None if missing or expired"""
+
+    @abc.abstractmethod
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float):
+        """Store a value for ttl_seconds"""
+
+    @abc.abstractmethod
+    def clear(self):
+        """Remove every entry"""
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        """Number of stored entries"""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Per-process LRU with TTL"""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()  # key -> (expires_at, value)
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.time() > expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.time() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCacheBackend(CacheBackend):
+    """
+    One JSON file per entry under a local directory
+
+    Survives restarts and can be shared by workers on the same host. Files are
+    written atomically (temp file + rename); reads refresh the mtime so the
+    least recently used files are the ones evicted past `max_entries`.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 1000):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._count = len(list(self.directory.glob("*.json")))
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() > entry.get("expires_at", 0):
+            self._unlink(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry.get("value")
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float):
+        if self.max_entries <= 0:
+            return
+        path = self._path(key)
+        existed = path.exists()
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"expires_at": time.time() + ttl_seconds, "value": value}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        if not existed:
+            self._count += 1
+        if self._count > self.max_entries:
+            self._evict()
+
+    def clear(self):
+        for path in self.directory.glob("*.json"):
+            self._unlink(path)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _evict(self):
+        """Drop the least recently used files down to 90% of max_entries"""
+        files = []
+        for path in self.directory.glob("*.json"):
+            try:
+                files.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        files.sort()
+        target = int(self.max_entries * 0.9)
+        for _, path in files[:max(0, len(files) - target)]:
+            self._unlink(path)
+            self.evictions += 1
+        self._count = min(len(files), target)
+
+    def _unlink(self, path: Path):
+        try:
+            path.unlink()
+            self._count = max(0, self._count - 1)
+        except OSError:
+            pass
+
+
+class ResponseCache:
+    """
+    Answers to first-turn questions, keyed by normalized text
+
+    Only turns without history are cached: the same opening question gets the
+    same answer regardless of who asks it. The key also covers the model, the
+    static prompt prefix and a content hash of the legal data, so changing any
+    of them makes old entries unreachable. The data files are re-checked every
+    `check_interval` seconds and the store is cleared when they change.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        ttl_seconds: float = 86400,
+        data_dir: str = "data",
+        check_interval: float = 5.0,
+    ):
+        """
+        Initialize cache
+
+        Args:
+            backend: Storage backend (memory or disk)
+            ttl_seconds: Seconds an answer stays valid
+            data_dir: Directory whose JSON files the answers were built from
+            check_interval: Minimum seconds between data file checks
+        """
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.data_dir = Path(data_dir)
+        self.check_interval = check_interval
+        self._signature = data_signature(self.data_dir)
+        self.data_version = data_version(self.data_dir)
+        self._checked_at = time.monotonic()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.invalidations = 0
+
+    def key(self, user_message: str, model: str, prompt_version: str) -> Optional[str]:
+        """
+        Cache key for a first-turn message
+
+        Returns:
+            Hex key, or None if the message normalizes to nothing
+        """
+        self._check_data()
+        normalized = normalize_query(user_message)
+        if not normalized:
+            return None
+        raw = "\x00".join((self.data_version, model, prompt_version, normalized))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up (and count) a cached answer"""
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """Store an answer; storage errors are logged, never raised"""
+        try:
+            self.backend.set(key, value, self.ttl_seconds)
+            self.stores += 1
+        except Exception as e:
+            logger.warning("response_cache_store_error", error=str(e))
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit-rate counters"""
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": getattr(self.backend, "evictions", 0),
+            "invalidations": self.invalidations,
+            "data_version": self.data_version,
+        }
+
+    def _check_data(self):
+        """Clear the store if the data files changed since the last check"""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        try:
+            signature = data_signature(self.data_dir)
+            if signature == self._signature:
+                return
+            self._signature = signature
+            version = data_version(self.data_dir)
+        except OSError as e:
+            logger.warning("response_cache_data_check_error", error=str(e))
+            return
+        if version != self.data_version:
+            logger.info("response_cache_invalidated", old_version=self.data_version, new_version=version)
+            self.data_version = version
+            self.backend.clear()
+            self.invalidations += 1
+
+
+# Global response cache instance (None when disabled)
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Get global response cache instance
+    Lazy initialization on first call; None unless RESPONSE_CACHE_ENABLED
+    """
+    global _response_cache
+    if _response_cache is None:
+        settings = get_settings()
+        if not settings.response_cache_enabled:
+            return None
+        if settings.response_cache_backend == "disk":
+            backend = DiskCacheBackend(settings.response_cache_dir, settings.response_cache_max_entries)
+        else:
+            backend = MemoryCacheBackend(settings.response_cache_max_entries)
+        _response_cache = ResponseCache(backend, ttl_seconds=settings.response_cache_ttl_seconds)
+        logger.info("response_cache_initialized", backend=settings.response_cache_backend,
+                    data_version=_response_cache.data_version)
+    return _response_cache
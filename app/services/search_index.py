@@ -0,0 +1,150 @@
+"""
+Section Search Index
+In-memory BM25 inverted index over legal sections, built at load time
+"""
+
+import math
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.services.section_store import SectionRecord
+from app.services.text_normalization import tokenize
+
+# Field weights: a term in the title counts as much as three in the body text
+FIELD_WEIGHTS = {
+    "section_title": 3,
+    "key_terms": 2,
+    "semantic_summary": 1,
+    "section_text": 1,
+}
+
+# Bengali words users type → English legal terms. Most acts (and every
+# semantic_summary) are in English, so a Bengali query alone would miss them.
+QUERY_EXPANSIONS = {
+    "তালাক": "talaq divorce", "ডিভোর্স": "divorce", "বিবাহবিচ্ছেদ": "divorce dissolution",
+    "বিয়ে": "marriage", "বিবাহ": "marriage", "বহুবিবাহ": "polygamy", "সতীন": "polygamy",
+    "দ্বিতীয়": "second another", "অনুমতি": "permission",
+    "স্বামী": "husband", "স্ত্রী": "wife", "বিধবা": "widow", "সন্তান": "child children minor",
+    "ছেলে": "son", "মেয়ে": "daughter", "বাবা": "father", "পিতা": "father", "মা": "mother", "মাতা": "mother",
+    "নাবালক": "minor", "নাবালিকা": "minor", "বয়স": "age", "ভাই": "brother", "বোন": "sister",
+    "ভরণপোষণ": "maintenance", "খোরপোশ": "maintenance", "খরচ": "maintenance expenses",
+    "দেনমোহর": "dower", "মোহর": "dower", "হেফাজত": "custody guardianship", "অভিভাবক": "guardian",
+    "সম্পত্তি": "property", "উত্তরাধিকার": "inheritance succession heir", "ওয়ারিশ": "heir", "উইল": "will",
+    "জমি": "land", "দত্তক": "adoption", "পৃথক": "separate", "আলাদা": "separate", "বসবাস": "residence",
+    "আদালত": "court", "মামলা": "suit case", "আবেদন": "application petition", "সালিশ": "arbitration council",
+    "চেয়ারম্যান": "chairman", "নোটিশ": "notice", "নিবন্ধন": "registration", "রেজিস্ট্রেশন": "registration",
+    "কাজী": "registrar kazi", "কাবিননামা": "nikahnama registration", "নিকাহনামা": "nikahnama registration",
+    "যৌতুক": "dowry", "নির্যাতন": "cruelty violence", "মারধর": "cruelty hurt", "ধর্ষণ": "rape",
+    "শাস্তি": "punishment penalty", "জরিমানা": "fine", "কারাদণ্ড": "imprisonment", "জেল": "imprisonment",
+    "হিন্দু": "hindu", "মুসলিম": "muslim", "মুসলমান": "muslim", "খ্রিস্টান": "christian",
+    "বাল্যবিবাহ": "child marriage",
+}
+
+# BM25 parameters (standard defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+# Keyed by the tokenized form so lookups match stemmed query terms
+_EXPANSIONS = {
+    tokenize(word)[0]: tokenize(english)
+    for word, english in QUERY_EXPANSIONS.items()
+    if tokenize(word)
+}
+
+
+def query_terms(query: str) -> Counter:
+    """Query term counts, with English equivalents added for known Bengali words"""
+    terms = Counter()
+    for term in tokenize(query):
+        terms[term] += 1
+        for expansion in _EXPANSIONS.get(term, ()):
+            terms[expansion] += 1
+    return terms
+
+
+class SectionIndex:
+    """
+    BM25 over section_title, key_terms, semantic_summary and section_text
+
+    Fields are folded into one weighted term-frequency vector per section
+    (title terms count FIELD_WEIGHTS times), so one posting list per term
+    covers all fields. Search can be restricted to a set of acts.
+    """
+
+    def __init__(self, sections: Dict[str, Dict[str, SectionRecord]]):
+        """
+        Build the index
+
+        Args:
+            sections: sections[act_id][section_number] = SectionRecord (DataLoader layout)
+        """
+        self._docs: List[Tuple[str, str]] = []  # doc id -> (act_id, section_number)
+        self._postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)  # term -> [(doc id, tf)]
+        lengths = []
+
+        for act_id, act_sections in sections.items():
+            for section_number, section in act_sections.items():
+                term_freqs = Counter()
+                for field, weight in FIELD_WEIGHTS.items():
+                    value = getattr(section, field) or ""
+                    if isinstance(value, (list, tuple)):
+                        value = " ".join(value)
+                    for term in tokenize(value):
+                        term_freqs[term] += weight
+
+                doc_id = len(self._docs)
+                self._docs.append((act_id, section_number))
+                lengths.append(sum(term_freqs.values()))
+                for term, tf in term_freqs.items():
+                    self._postings[term].append((doc_id, tf))
+
+        self._lengths = lengths
+        self._avg_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+        doc_count = len(self._docs)
+        self._idf = {
+            term: math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    @property
+    def size(self) -> int:
+        return len(self._docs)
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self._postings)
+
+    def search(
+        self,
+        query: str,
+        act_ids: Optional[Iterable[str]] = None,
+        limit: int = 20,
+    ) -> List[Tuple[str, str, float]]:
+        """
+        Rank sections by BM25 relevance to a query
+
+        Args:
+            query: Free text (Bengali or English)
+            act_ids: Only consider sections of these acts (None = all acts)
+            limit: Maximum results
+
+        Returns:
+            [(act_id, section_number, score)] best first; only sections sharing a term with the query
+        """
+        allowed = set(act_ids) if act_ids is not None else None
+        scores: Dict[int, float] = defaultdict(float)
+
+        for term, query_tf in query_terms(query).items():
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf[term]
+            for doc_id, tf in postings:
+                if allowed is not None and self._docs[doc_id][0] not in allowed:
+                    continue
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[doc_id] / self._avg_length)
+                scores[doc_id] += query_tf * idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(*self._docs[doc_id], score) for doc_id, score in ranked]
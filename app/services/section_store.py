@@ -0,0 +1,249 @@
+"""
+Section Store
+Compact legal section records; full text is read lazily from a shared memory-mapped file
+"""
+
+import hashlib
+import json
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger()
+
+BLOB_PREFIX = "section_text."
+
+
+class TextBlob:
+    """
+    Read-only UTF-8 text addressed by (offset, length)
+
+    Backed by an mmap of a file, so every worker mapping the same file shares
+    one copy through the OS page cache. Falls back to private bytes when the
+    file can't be written or mapped. The text may start `base` bytes into the
+    buffer (e.g. after a corpus snapshot's header).
+    """
+
+    def __init__(self, data: Any, path: Optional[Path] = None, base: int = 0, size: Optional[int] = None):
+        self._data = data
+        self.path = path
+        self._base = base
+        self._size = len(data) - base if size is None else size
+
+    @classmethod
+    def open(cls, path: Path) -> "TextBlob":
+        """Map an existing blob file read-only"""
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return cls(b"", path)
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), path)
+
+    @property
+    def mapped(self) -> bool:
+        return isinstance(self._data, mmap.mmap)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def read(self, offset: int, length: int) -> str:
+        start = self._base + offset
+        return self._data[start:start + length].decode("utf-8")
+
+    def tobytes(self) -> bytes:
+        return bytes(self._data[self._base:self._base + self._size])
+
+
+class SectionRecord:
+    """
+    One legal section: the fields the tools return, nothing else
+
+    `section_text` (the bulk of the corpus) is not held by the record; it is
+    decoded from the shared blob on access.
+    """
+
+    __slots__ = (
+        "act_id", "act_title", "section_number", "section_title",
+        "semantic_summary", "key_terms", "_blob", "_offset", "_length",
+    )
+
+    def __init__(
+        self,
+        act_id: str,
+        act_title: str,
+        section_number: str,
+        section_title: str,
+        semantic_summary: str,
+        key_terms: Tuple[str, ...],
+        blob: TextBlob,
+        offset: int,
+        length: int,
+    ):
+        self.act_id = act_id
+        self.act_title = act_title
+        self.section_number = section_number
+        self.section_title = section_title
+        self.semantic_summary = semantic_summary
+        self.key_terms = key_terms
+        self._blob = blob
+        self._offset = offset
+        self._length = length
+
+    @property
+    def section_text(self) -> str:
+        return self._blob.read(self._offset, self._length)
+
+
+def _write_blob(directory: Path, content: bytes) -> Path:
+    """
+    Write the text blob under a content-addressed name (no-op if present)
+
+    Workers starting together write the same bytes to the same name; the
+    temp file + rename keeps readers from ever seeing a partial file. Blobs
+    of older data versions are removed (open mappings stay valid on POSIX).
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256(content).hexdigest()[:16]
+    path = directory / f"{BLOB_PREFIX}{digest}.bin"
+
+    if not path.exists() or path.stat().st_size != len(content):
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    for stale in directory.glob(f"{BLOB_PREFIX}*.bin"):
+        if stale != path:
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+    return path
+
+
+def build_section_store(
+    sections: Iterable[Dict[str, Any]],
+    blob_dir: Optional[str] = None,
+) -> Tuple[Dict[str, Dict[str, SectionRecord]], TextBlob]:
+    """
+    Turn raw family_laws_final.json entries into compact records
+
+    Args:
+        sections: Section dicts as parsed from JSON
+        blob_dir: Directory for the shared text blob (None = keep text in process memory)
+
+    Returns:
+        (store[act_id][section_number] = SectionRecord, text blob)
+    """
+    rows = []
+    chunks = []
+    offset = 0
+    act_titles: Dict[str, str] = {}  # one title string per act instead of one per section
+
+    for section in sections:
+        act_id = section.get("act_id")
+        section_number = section.get("section_number")
+        if not (act_id and section_number):
+            continue
+        text = (section.get("section_text") or "").encode("utf-8")
+        chunks.append(text)
+        rows.append((
+            act_id,
+            act_titles.setdefault(act_id, section.get("act_title", "")),
+            section_number,
+            section.get("section_title", ""),
+            section.get("semantic_summary", ""),
+            tuple(section.get("key_terms") or ()),
+            offset,
+            len(text),
+        ))
+        offset += len(text)
+
+    content = b"".join(chunks)
+    del chunks
+
+    blob = None
+    if blob_dir:
+        try:
+            blob = TextBlob.open(_write_blob(Path(blob_dir), content))
+        except (OSError, ValueError) as e:
+            logger.warning("section_text_blob_unavailable", blob_dir=blob_dir, error=str(e))
+    if blob is None:
+        blob = TextBlob(content)
+
+    return records_from_rows(rows, blob), blob
+
+
+def records_from_rows(rows: Iterable[Tuple], blob: TextBlob) -> Dict[str, Dict[str, SectionRecord]]:
+    """
+    Build store[act_id][section_number] from record rows
+
+    A row is (act_id, act_title, section_number, section_title,
+    semantic_summary, key_terms, text offset, text length); later rows win
+    on duplicate (act_id, section_number).
+    """
+    store: Dict[str, Dict[str, SectionRecord]] = {}
+    for act_id, act_title, section_number, section_title, semantic_summary, key_terms, start, length in rows:
+        store.setdefault(act_id, {})[section_number] = SectionRecord(
+            act_id=act_id,
+            act_title=act_title,
+            section_number=section_number,
+            section_title=section_title,
+            semantic_summary=semantic_summary,
+            key_terms=key_terms,
+            blob=blob,
+            offset=start,
+            length=length,
+        )
+    return store
+
+
+def records_to_rows(store: Dict[str, Dict[str, SectionRecord]]) -> List[Tuple]:
+    """Inverse of records_from_rows (for serializing the store)"""
+    return [
+        (
+            record.act_id, record.act_title, record.section_number, record.section_title,
+            record.semantic_summary, record.key_terms, record._offset, record._length,
+        )
+        for act_sections in store.values()
+        for record in act_sections.values()
+    ]
+
+
+def iter_json_array(text: str) -> Iterator[Any]:
+    """
+    Decode a top-level JSON array one element at a time
+
+    Unlike json.loads, only one element is alive at once, so fields dropped
+    from each section never pile up (and never fragment the heap) while the
+    rest of the file is parsed.
+    """
+    decoder = json.JSONDecoder()
+    skip = json.decoder.WHITESPACE.match
+    index = skip(text, 0).end()
+    if text[index:index + 1] != "[":
+        raise ValueError("expected a JSON array")
+    index = skip(text, index + 1).end()
+    if text[index:index + 1] == "]":
+        return
+    while True:
+        value, index = decoder.raw_decode(text, index)
+        yield value
+        index = skip(text, index).end()
+        if text[index:index + 1] == "]":
+            return
+        if text[index:index + 1] != ",":
+            raise ValueError(f"expected ',' or ']' at position {index}")
+        index = skip(text, index + 1).end()
+
+
+def load_section_store(
+    path: Path,
+    blob_dir: Optional[str] = None,
+) -> Tuple[Dict[str, Dict[str, SectionRecord]], TextBlob]:
+    """Read family_laws_final.json straight into compact records (see build_section_store)"""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    return build_section_store(iter_json_array(text), blob_dir)
@@ -0,0 +1,347 @@
+"""
+Semantic Index
+Dense-vector index over section titles and summaries, scored with one NumPy matrix product
+"""
+
+import abc
+import hashlib
+import json
+import math
+import os
+import threading
+import weakref
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import structlog
+
+from app.services.search_index import query_terms
+
+try:
+    import fcntl
+except ImportError:  # Windows: workers may build the index concurrently
+    fcntl = None
+
+logger = structlog.get_logger()
+
+# Matrix (float32, one L2-normalized row per section) and its metadata sidecar.
+# Next to the corpus snapshot, so it stays writable when data/ is mounted read-only.
+DEFAULT_INDEX_PATH = ".cache/embeddings/sections.npy"
+
+# Scores at or below this are treated as no match
+MIN_SCORE = 0.05
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+@lru_cache(maxsize=65536)
+def _hash_feature(term: str, dim: int) -> Tuple[int, float]:
+    """Bucket and sign of a term (blake2b, so the same in every process, unlike hash())"""
+    digest = int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+    return digest % dim, 1.0 if digest >> 63 else -1.0
+
+
+def _term_code_version() -> str:
+    """Hash of the code producing search terms; hashed vectors change whenever it does"""
+    digest = hashlib.sha256()
+    module_dir = Path(__file__).parent
+    for name in ("search_index.py", "text_normalization.py"):
+        digest.update((module_dir / name).read_bytes())
+    return digest.hexdigest()[:8]
+
+
+class Embedder(abc.ABC):
+    """Turns texts into L2-normalized float32 vectors; `name` identifies the vector space"""
+
+    name = ""
+
+    @abc.abstractmethod
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts into an (n, dim) float32 matrix with unit-length rows"""
+
+
+class HashingEmbedder(Embedder):
+    """
+    Deterministic local embedder: signed feature hashing of search terms
+
+    Uses the BM25 index's terms (stemmed, stopwords dropped, Bengali words
+    expanded with English legal terms), so a Bengali question lands near
+    the English summaries. Needs no network or model files, so tests and
+    benchmarks run with it; it matches words, not meaning, so the model is
+    not offered semantic mode on top of it.
+    """
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+        self.name = f"hashing-{dim}-{_term_code_version()}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for term, count in query_terms(text).items():
+                index, sign = _hash_feature(term, self.dim)
+                matrix[row, index] += sign * (1.0 + math.log(count))
+        return _normalize(matrix)
+
+
+class OpenAIEmbedder(Embedder):
+    """
+    OpenAI embeddings API (query embedding is one network call per search)
+
+    Blocking client: query embeddings run in the tool executor's threads,
+    never on the event loop, and every call is bounded by `timeout`.
+    """
+
+    def __init__(self, api_key: str, model: str = "text-embedding-3-small", base_url: Optional[str] = None,
+                 batch_size: int = 256, timeout: float = 30.0, max_retries: int = 1):
+        from openai import OpenAI
+
+        self.client = OpenAI(api_key=api_key, base_url=base_url, timeout=timeout, max_retries=max_retries)
+        self.model = model
+        self.batch_size = batch_size
+        self.name = f"openai-{model}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        rows = []
+        for start in range(0, len(texts), self.batch_size):
+            response = self.client.embeddings.create(model=self.model, input=texts[start:start + self.batch_size])
+            rows.extend(item.embedding for item in response.data)
+        return _normalize(np.asarray(rows, dtype=np.float32))
+
+
+def section_documents(loader) -> Tuple[List[Tuple[str, str]], List[str]]:
+    """(act_id, section_number) keys and the text embedded for each, in corpus order"""
+    keys = []
+    texts = []
+    for act_id, act_sections in loader.sections.items():
+        for section_number, section in act_sections.items():
+            keys.append((act_id, section_number))
+            texts.append(f"{section.section_title}. {section.semantic_summary}")
+    return keys, texts
+
+
+def _fingerprint(keys: List[Tuple[str, str]], texts: List[str]) -> str:
+    digest = hashlib.sha256()
+    for (act_id, section_number), text in zip(keys, texts):
+        digest.update(f"{act_id}\x00{section_number}\x00{text}\x01".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class SemanticIndex:
+    """
+    Cosine top-k over section embeddings
+
+    Rows follow the corpus order, so each act is one contiguous row range
+    and an act filter is a handful of slices rather than a per-row mask.
+    """
+
+    def __init__(self, matrix: np.ndarray, keys: List[Tuple[str, str]], embedder: Embedder):
+        """
+        Initialize index
+
+        Args:
+            matrix: (sections, dim) float32 with unit-length rows (may be memory-mapped)
+            keys: (act_id, section_number) per row
+            embedder: Embedder that produced the matrix (used for queries)
+        """
+        self.matrix = matrix
+        self.keys = keys
+        self.embedder = embedder
+        self.act_rows: Dict[str, Tuple[int, int]] = {}
+        for row, (act_id, _) in enumerate(keys):
+            start, _ = self.act_rows.get(act_id, (row, row))
+            self.act_rows[act_id] = (start, row + 1)
+
+    @property
+    def size(self) -> int:
+        return len(self.keys)
+
+    def search(self, query: str, act_ids: Optional[List[str]] = None, limit: int = 30) -> List[Tuple[str, str, float]]:
+        """
+        Rank sections by cosine similarity to the query
+
+        Args:
+            query: User question or search text
+            act_ids: Only rank sections of these acts (None = every act)
+            limit: Maximum results
+
+        Returns:
+            [(act_id, section_number, score)] best first, scores above MIN_SCORE only
+        """
+        vector = self.embedder.embed([query])[0]
+        if not vector.any():
+            return []
+        scores = self.matrix @ vector
+        if act_ids is not None:
+            masked = np.full(scores.shape, -1.0, dtype=np.float32)
+            for act_id in act_ids:
+                if act_id in self.act_rows:
+                    start, end = self.act_rows[act_id]
+                    masked[start:end] = scores[start:end]
+            scores = masked
+
+        k = min(limit, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(*self.keys[row], float(scores[row])) for row in top if scores[row] > MIN_SCORE]
+
+
+def build_index(loader, embedder: Embedder) -> Tuple[SemanticIndex, str]:
+    """Embed every section of a loaded corpus; returns the index and its corpus fingerprint"""
+    keys, texts = section_documents(loader)
+    matrix = embedder.embed(texts)
+    return SemanticIndex(matrix, keys, embedder), _fingerprint(keys, texts)
+
+
+def write_index(index: SemanticIndex, fingerprint: str, path: str) -> Dict[str, Any]:
+    """
+    Save the matrix as .npy plus a .meta.json sidecar (both written atomically)
+
+    Returns:
+        Dict with rows, dim, bytes, embedder and fingerprint
+    """
+    matrix_path = Path(path)
+    matrix_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = matrix_path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, np.ascontiguousarray(index.matrix, dtype=np.float32))
+    os.replace(tmp_path, matrix_path)
+
+    meta = {
+        "embedder": index.embedder.name,
+        "rows": index.size,
+        "dim": int(index.matrix.shape[1]),
+        "fingerprint": fingerprint,
+    }
+    meta_path = matrix_path.with_suffix(".meta.json")
+    tmp_meta = meta_path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_meta.write_text(json.dumps(meta), encoding="utf-8")
+    os.replace(tmp_meta, meta_path)
+    return {**meta, "bytes": matrix_path.stat().st_size}
+
+
+def load_index(path: str, loader, embedder: Embedder) -> Optional[SemanticIndex]:
+    """
+    Memory-map a saved index if it matches the loaded corpus and the embedder
+
+    Returns:
+        The index, or None (logged) if missing, stale, or from another embedder
+    """
+    matrix_path = Path(path)
+    meta_path = matrix_path.with_suffix(".meta.json")
+    if not matrix_path.exists() or not meta_path.exists():
+        return None
+
+    keys, texts = section_documents(loader)
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        matrix = np.load(matrix_path, mmap_mode="r")
+    except (OSError, ValueError) as e:
+        logger.warning("semantic_index_unreadable", path=str(matrix_path), error=str(e))
+        return None
+
+    if meta.get("embedder") != embedder.name:
+        logger.warning("semantic_index_other_embedder", path=str(matrix_path),
+                       index_embedder=meta.get("embedder"), embedder=embedder.name)
+        return None
+    if meta.get("fingerprint") != _fingerprint(keys, texts) or matrix.shape[0] != len(keys):
+        logger.warning("semantic_index_stale", path=str(matrix_path))
+        return None
+    return SemanticIndex(matrix, keys, embedder)
+
+
+def make_embedder(backend: str, settings: Any = None) -> Embedder:
+    """Embedder for a backend name ("hashing" or "openai"; openai needs settings)"""
+    if backend == "hashing":
+        return HashingEmbedder()
+    if backend == "openai":
+        return OpenAIEmbedder(
+            api_key=settings.openai_api_key,
+            model=settings.semantic_embedding_model,
+            base_url=settings.openai_base_url or None,
+            timeout=settings.openai_timeout_seconds,
+        )
+    raise ValueError(f"Unknown embedder: {backend}")
+
+
+# Semantic index per DataLoader generation (old generations keep theirs while in use)
+_semantic_indexes: "weakref.WeakKeyDictionary[Any, Optional[SemanticIndex]]" = weakref.WeakKeyDictionary()
+_semantic_index_lock = threading.Lock()
+
+
+@contextmanager
+def _build_lock(path: Path):
+    """Exclusive lock file next to the index, so the workers on a host build it once"""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(path.with_suffix(".lock"), "w")
+    except OSError:
+        yield  # read-only cache directory: every worker builds its own copy in memory
+        return
+    with lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+def prepare_semantic_index(loader) -> Optional[SemanticIndex]:
+    """
+    Load or build the semantic index for a corpus generation (blocking)
+
+    Called at startup and by corpus reloads, never on the request path.
+    The saved matrix is memory-mapped when it matches the corpus and the
+    embedder; otherwise it is rebuilt (hashing: ~0.15s, openai: one
+    embeddings call per 256 sections) and saved for the other workers.
+
+    Returns:
+        The index, or None (logged) if it couldn't be loaded or built
+    """
+    from app.config import get_settings
+
+    with _semantic_index_lock:
+        if loader in _semantic_indexes:
+            return _semantic_indexes[loader]
+
+        settings = get_settings()
+        path = settings.semantic_index_path
+        index = None
+        try:
+            embedder = make_embedder(settings.semantic_embedder, settings)
+            index = load_index(path, loader, embedder)
+            if index is None:
+                with _build_lock(Path(path)):
+                    index = load_index(path, loader, embedder)  # another worker may have just built it
+                    if index is None:
+                        index, fingerprint = build_index(loader, embedder)
+                        try:
+                            write_index(index, fingerprint, path)
+                            index = load_index(path, loader, embedder) or index  # mapped, shared by workers
+                        except OSError as e:
+                            logger.warning("semantic_index_write_failed", path=path, error=str(e))
+        except Exception as e:
+            logger.warning("semantic_index_unavailable", embedder=settings.semantic_embedder, error=str(e))
+
+        if index is not None:
+            logger.info("semantic_index_ready", embedder=index.embedder.name, sections=index.size,
+                        mapped=isinstance(index.matrix, np.memmap))
+        _semantic_indexes[loader] = index
+        return index
+
+
+def get_semantic_index(loader) -> Optional[SemanticIndex]:
+    """
+    Get the prepared semantic index for a loaded corpus (never loads or builds)
+
+    Returns:
+        The index, or None if semantic search isn't available (yet)
+    """
+    return _semantic_indexes.get(loader)
@@ -3,58 +3,225 @@ Supabase Service
 Handles conversation storage and analytics logging with profile-based tracking
 """
 
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+import asyncio
+import base64
 import json
-from supabase import create_client, Client
+import time
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timezone
+from supabase import acreate_client, AsyncClient
 import structlog
 
 from app.config import get_settings
+from app.services.history_cache import HistoryCache
+from app.services.memory_store import MemoryConversationStore
+from app.services.metrics import HISTORY_FETCH_SECONDS, SUPABASE_WRITE_ERRORS, SUPABASE_WRITE_SECONDS
+from app.services.profile_cache import ProfileCache
+from app.services.write_behind import WriteBehindWriter
 
 logger = structlog.get_logger()
 
 
+def encode_history_cursor(created_at: str, message_id: str) -> str:
+    """Encode the oldest message of a page as an opaque before_cursor"""
+    raw = json.dumps([created_at, message_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_history_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Decode a before_cursor into (created_at, message_id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        created_at, message_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception as e:
+        raise ValueError("Invalid history cursor") from e
+    if not isinstance(created_at, str) or not isinstance(message_id, str):
+        raise ValueError("Invalid history cursor")
+    return created_at, message_id
+
+
 class SupabaseService:
     """Service for interacting with Supabase"""
 
     def __init__(self):
-        """Initialize Supabase client"""
+        """Initialize Supabase settings (async client is created on connect)"""
         settings = get_settings()
-        supabase_url = settings.supabase_url
-        supabase_key = settings.supabase_key
+        self._supabase_url = settings.supabase_url
+        self._supabase_key = settings.supabase_key
+        self.enabled = bool(self._supabase_url and self._supabase_key)
+        self.client: Optional[AsyncClient] = None
+        self._connect_lock = asyncio.Lock()
+        self.writer: Optional[WriteBehindWriter] = None
+        self.profile_cache = ProfileCache(
+            max_size=settings.profile_cache_size,
+            ttl_seconds=settings.profile_cache_ttl_seconds,
+        )
+        self._profile_touch_interval = settings.profile_touch_interval_seconds
+        self.history_cache: Optional[HistoryCache] = None
+        if settings.history_cache_enabled:
+            self.history_cache = HistoryCache(
+                max_bytes=settings.history_cache_max_mb * 1024 * 1024,
+                max_messages=settings.history_cache_max_messages,
+                ttl_seconds=settings.history_cache_ttl_seconds,
+            )
+        self._profile_touch_task: Optional[asyncio.Task] = None
+        self.memory_store: Optional[MemoryConversationStore] = None
 
-        if not supabase_url or not supabase_key:
+        if not self.enabled:
             logger.warning("supabase_not_configured",
                          message="Supabase credentials not found. Using in-memory storage.")
-            self.client: Optional[Client] = None
-            self._in_memory_conversations: Dict[str, List[Dict]] = {}
-        else:
-            self.client = create_client(supabase_url, supabase_key)
-            logger.info("supabase_initialized")
+            self.memory_store = MemoryConversationStore(
+                max_bytes=settings.memory_store_max_mb * 1024 * 1024,
+                max_messages=settings.memory_store_max_messages,
+                ttl_seconds=settings.memory_store_ttl_seconds,
+            )
+        elif settings.write_behind_enabled:
+            # Conversation rows go out on the next loop tick; analytics are batched
+            self.writer = WriteBehindWriter(
+                self._insert_rows,
+                immediate_tables=("conversations",),
+                max_queue_size=settings.write_behind_max_queue,
+                batch_size=settings.write_behind_batch_size,
+                flush_interval=settings.write_behind_flush_interval_ms / 1000,
+                max_retries=settings.write_behind_max_retries,
+                max_retry_seconds=settings.write_behind_max_retry_seconds,
+            )
 
-    def ensure_profile(self, profile_id: str) -> bool:
+    async def connect(self) -> Optional[AsyncClient]:
+        """
+        Create the async Supabase client (idempotent)
+
+        Returns:
+            The connected client, or None in in-memory mode
+        """
+        if not self.enabled or self.client is not None:
+            return self.client
+
+        async with self._connect_lock:
+            if self.client is None:
+                self.client = await acreate_client(self._supabase_url, self._supabase_key)
+                logger.info("supabase_initialized")
+        return self.client
+
+    async def start_background_tasks(self):
+        """Start the write-behind writer and last_active flusher (no-op in in-memory mode)"""
+        if not self.enabled:
+            return
+        if self.writer:
+            await self.writer.start()
+        if self._profile_touch_task is None:
+            self._profile_touch_task = asyncio.create_task(self._profile_touch_loop())
+
+    async def stop_background_tasks(self):
+        """Flush queued writes and pending last_active updates, then stop background tasks"""
+        if self.writer:
+            await self.writer.stop()
+        if self._profile_touch_task is not None:
+            self._profile_touch_task.cancel()
+            try:
+                await self._profile_touch_task
+            except asyncio.CancelledError:
+                pass
+            self._profile_touch_task = None
+        await self.flush_profile_touches()
+
+    async def _profile_touch_loop(self):
+        """Write debounced last_active updates once per interval"""
+        while True:
+            await asyncio.sleep(self._profile_touch_interval)
+            await self.flush_profile_touches()
+
+    async def flush_profile_touches(self) -> int:
+        """
+        Update last_active for every profile seen since the last flush (one bulk UPDATE)
+
+        Returns:
+            Number of profiles touched
+        """
+        profile_ids = self.profile_cache.drain_touches()
+        if not profile_ids or not self.enabled:
+            return 0
+
+        try:
+            client = await self.connect()
+            await self._write("user_profiles", client.rpc('touch_profiles', {'p_profile_ids': profile_ids}))
+            logger.info("profiles_touched", count=len(profile_ids))
+        except Exception as e:
+            # last_active is best-effort; don't retry
+            logger.error("profile_touch_error", error=str(e), count=len(profile_ids))
+        return len(profile_ids)
+
+    @staticmethod
+    async def _write(table: str, request) -> Any:
+        """Execute a write request, recording its latency (and any failure) under the table name"""
+        started = time.perf_counter()
+        try:
+            return await request.execute()
+        except Exception:
+            SUPABASE_WRITE_ERRORS.inc(table)
+            raise
+        finally:
+            SUPABASE_WRITE_SECONDS.observe(time.perf_counter() - started, table)
+
+    async def _insert_rows(self, table: str, rows: List[Dict[str, Any]]):
+        """
+        Insert rows into a table with a single multi-row insert (raises on failure)
+
+        Args:
+            table: Table name
+            rows: Rows to insert
+        """
+        if table == "conversations":
+            # conversations.profile_id references user_profiles
+            for profile_id in {row["profile_id"] for row in rows}:
+                await self.ensure_profile(profile_id)
+
+        client = await self.connect()
+        try:
+            await self._write(table, client.table(table).insert(rows))
+        except Exception:
+            if table == "conversations":
+                # A cached profile may have been deleted; re-verify on the retry
+                for profile_id in {row["profile_id"] for row in rows}:
+                    self.profile_cache.discard(profile_id)
+            raise
+
+    async def ensure_profile(self, profile_id: str) -> bool:
         """
         Ensure profile exists (creates if doesn't exist, updates last_active if exists)
 
+        Profiles already verified by this process are served from the profile
+        cache; their last_active update is deferred to the next bulk touch.
+
         Args:
             profile_id: Unique profile identifier
 
         Returns:
             True if successful, False otherwise
         """
-        if not self.client:
+        if not self.enabled:
             return True  # In-memory mode
 
+        if self.profile_cache.contains(profile_id):
+            self.profile_cache.touch(profile_id)
+            return True
+
         try:
+            client = await self.connect()
             # Call the get_or_create_profile function
-            result = self.client.rpc('get_or_create_profile', {'p_profile_id': profile_id}).execute()
+            await self._write("user_profiles", client.rpc('get_or_create_profile', {'p_profile_id': profile_id}))
+            self.profile_cache.add(profile_id)
             logger.info("profile_ensured", profile_id=profile_id)
             return True
         except Exception as e:
             logger.error("profile_ensure_error", error=str(e), profile_id=profile_id)
             return False
 
-    def store_message(
+    async def store_message(
         self,
         profile_id: str,
         session_id: str,
@@ -75,38 +242,29 @@ class SupabaseService:
         Returns:
             Message ID if successful, None otherwise
         """
-        if not self.client:
+        if not self.enabled:
             # In-memory fallback keyed by session_id
-            if session_id not in self._in_memory_conversations:
-                self._in_memory_conversations[session_id] = []
-
-            message = {
-                "id": f"mem-{len(self._in_memory_conversations[session_id])}",
-                "profile_id": profile_id,
-                "session_id": session_id,
-                "role": role,
-                "content": content,
-                "metadata": metadata or {},
-                "created_at": datetime.now().isoformat()
-            }
-            self._in_memory_conversations[session_id].append(message)
+            message = self.memory_store.append(profile_id, session_id, role, content, metadata)
             logger.info("message_stored_in_memory", session_id=session_id, role=role)
             return message["id"]
 
         try:
             # Ensure profile exists first
-            self.ensure_profile(profile_id)
+            await self.ensure_profile(profile_id)
 
             # Store message
-            result = self.client.table("conversations").insert({
+            client = await self.connect()
+            result = await self._write("conversations", client.table("conversations").insert({
                 "profile_id": profile_id,
                 "session_id": session_id,
                 "role": role,
                 "content": content,
                 "metadata": metadata or {}
-            }).execute()
+            }))
 
             message_id = result.data[0]["id"] if result.data else None
+            if self.history_cache:
+                self.history_cache.append(session_id, [{"role": role, "content": content}])
             logger.info("message_stored", session_id=session_id, role=role, message_id=message_id)
             return message_id
 
@@ -114,48 +272,184 @@ class SupabaseService:
             logger.error("message_store_error", error=str(e), session_id=session_id)
             return None
 
-    def get_conversation_history(
+    async def store_turn(
+        self,
+        profile_id: str,
+        session_id: str,
+        user_content: str,
+        assistant_content: str,
+        user_created_at: Optional[datetime] = None,
+        assistant_metadata: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """
+        Store a user message and the assistant's reply as one write
+
+        With the write-behind writer running, both rows are queued and inserted
+        together in the background; otherwise they are inserted directly.
+        Timestamps are set client-side so the pair keeps its order even though
+        both rows land in the same insert.
+
+        Args:
+            profile_id: Unique profile identifier
+            session_id: Session identifier for this conversation
+            user_content: The user's message
+            assistant_content: The assistant's response
+            user_created_at: When the user message was received (defaults to now)
+            assistant_metadata: Optional metadata for the assistant row (e.g. context summary)
+
+        Returns:
+            True if stored or queued, False otherwise
+        """
+        if not self.enabled:
+            await self.store_message(profile_id, session_id, "user", user_content)
+            await self.store_message(profile_id, session_id, "assistant", assistant_content, assistant_metadata)
+            return True
+
+        assistant_created_at = datetime.now(timezone.utc)
+        rows = [
+            {
+                "profile_id": profile_id,
+                "session_id": session_id,
+                "role": "user",
+                "content": user_content,
+                "metadata": {},
+                "created_at": (user_created_at or assistant_created_at).isoformat(),
+            },
+            {
+                "profile_id": profile_id,
+                "session_id": session_id,
+                "role": "assistant",
+                "content": assistant_content,
+                "metadata": assistant_metadata or {},
+                "created_at": assistant_created_at.isoformat(),
+            },
+        ]
+
+        if self.history_cache:
+            # Visible to the next turn even before the background insert lands
+            self.history_cache.append(session_id, rows)
+
+        if self.writer and self.writer.enqueue("conversations", rows):
+            return True
+
+        try:
+            await self._insert_rows("conversations", rows)
+            logger.info("turn_stored", session_id=session_id)
+            return True
+        except Exception as e:
+            logger.error("turn_store_error", error=str(e), session_id=session_id)
+            if self.history_cache:
+                self.history_cache.invalidate(session_id)
+            return False
+
+    async def get_conversation_history(
         self,
         session_id: str,
         limit: int = 50
     ) -> List[Dict[str, str]]:
         """
-        Retrieve conversation history for a session
+        Retrieve the most recent messages of a session
+
+        Served from the history cache when this process already holds the
+        session; the database is only queried on a miss.
 
         Args:
             session_id: Session identifier
             limit: Maximum number of messages to retrieve
 
         Returns:
-            List of messages in chronological order
+            List of messages (role, content, metadata) in chronological order
         """
-        if not self.client:
+        started = time.perf_counter()
+        if not self.enabled:
             # In-memory fallback keyed by session_id
-            messages = self._in_memory_conversations.get(session_id, [])
-            return [
-                {"role": msg["role"], "content": msg["content"]}
-                for msg in messages[-limit:]
+            messages = [
+                {"role": msg["role"], "content": msg["content"], "metadata": msg["metadata"]}
+                for msg in self.memory_store.tail(session_id, limit)
             ]
+            HISTORY_FETCH_SECONDS.observe(time.perf_counter() - started, "memory")
+            return messages
+
+        if self.history_cache:
+            cached = self.history_cache.get(session_id, limit)
+            if cached is not None:
+                HISTORY_FETCH_SECONDS.observe(time.perf_counter() - started, "cache")
+                return cached
 
         try:
-            # Use the helper function
-            result = self.client.rpc('get_conversation_history', {
-                'p_session_id': session_id,
-                'p_limit': limit
-            }).execute()
-
-            if result.data:
-                return [
-                    {"role": msg["role"], "content": msg["content"]}
-                    for msg in result.data
-                ]
-            return []
+            page = await self.get_history_page(session_id, limit=limit)
+            messages = [
+                {"role": msg["role"], "content": msg["content"], "metadata": msg["metadata"]}
+                for msg in page["messages"]
+            ]
+            if self.history_cache:
+                self.history_cache.put(session_id, messages, complete=not page["has_more"])
+            HISTORY_FETCH_SECONDS.observe(time.perf_counter() - started, "supabase")
+            return messages
 
         except Exception as e:
+            HISTORY_FETCH_SECONDS.observe(time.perf_counter() - started, "error")
             logger.error("conversation_history_error", error=str(e), session_id=session_id)
             return []
 
-    def log_analytics(
+    async def get_history_page(
+        self,
+        session_id: str,
+        limit: int = 50,
+        before_cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Retrieve one page of a session's history, newest page first
+
+        Uses a keyset query (created_at DESC, id DESC) so every page costs the
+        same regardless of how long the session is or how far back it pages.
+
+        Args:
+            session_id: Session identifier
+            limit: Messages per page
+            before_cursor: Cursor from a previous page's next_cursor (None = latest page)
+
+        Returns:
+            Dict with messages (chronological), next_cursor (older page, or None)
+            and has_more
+
+        Raises:
+            ValueError: If before_cursor is malformed
+        """
+        before = decode_history_cursor(before_cursor) if before_cursor else None
+
+        if not self.enabled:
+            page, has_more = self.memory_store.page(session_id, limit, before[1] if before else None)
+        else:
+            params = {
+                'p_session_id': session_id,
+                'p_limit': limit + 1,  # One extra row tells us whether an older page exists
+            }
+            if before:
+                params['p_before_created_at'], params['p_before_id'] = before
+
+            client = await self.connect()
+            result = await client.rpc('get_conversation_page', params).execute()
+            rows = result.data or []
+            has_more = len(rows) > limit
+            page = list(reversed(rows[:limit]))
+
+        return {
+            "messages": [
+                {
+                    "id": msg["id"],
+                    "role": msg["role"],
+                    "content": msg["content"],
+                    "metadata": msg.get("metadata") or {},
+                    "created_at": msg["created_at"],
+                }
+                for msg in page
+            ],
+            "next_cursor": encode_history_cursor(page[0]["created_at"], page[0]["id"]) if has_more and page else None,
+            "has_more": has_more,
+        }
+
+    async def log_analytics(
         self,
         profile_id: str,
         user_query: str,
@@ -166,7 +460,13 @@ class SupabaseService:
         response_time_ms: int = 0,
         model: Optional[str] = None,
         success: bool = True,
-        error_message: Optional[str] = None
+        error_message: Optional[str] = None,
+        context_tokens_saved: int = 0,
+        dedup_tokens_saved: int = 0,
+        prompt_tokens: int = 0,
+        cached_tokens: int = 0,
+        response_cache: Optional[str] = None,
+        timings: Optional[Dict[str, Any]] = None
     ) -> Optional[str]:
         """
         Log query analytics
@@ -182,14 +482,20 @@ class SupabaseService:
             model: Model used
             success: Whether the query was successful
             error_message: Error message (if failed)
+            context_tokens_saved: Prompt tokens avoided by the context builder this turn
+            dedup_tokens_saved: Prompt tokens avoided by not resending law text already in the turn
+            prompt_tokens: Prompt tokens across the turn's completion calls
+            cached_tokens: Of those, tokens served from OpenAI's prompt cache
+            response_cache: "hit" / "miss" for cacheable first turns, None otherwise
+            timings: Span waterfall of the turn ({"total_ms", "spans"})
 
         Returns:
-            Analytics record ID if successful, None otherwise
+            Analytics record ID if inserted directly, None if queued or failed
         """
         if model is None:
             model = get_settings().openai_model
 
-        if not self.client:
+        if not self.enabled:
             # In-memory: just log
             logger.info(
                 "analytics_in_memory",
@@ -198,23 +504,39 @@ class SupabaseService:
                 tools_count=len(tools_used or []),
                 sections=sections_retrieved,
                 tokens=tokens_used,
+                cached_tokens=cached_tokens,
+                response_cache=response_cache,
                 success=success
             )
             return None
 
+        row = {
+            "profile_id": profile_id,
+            "user_query": user_query,
+            "intent_detected": intent_detected,
+            "tools_used": tools_used or [],
+            "sections_retrieved": sections_retrieved,
+            "tokens_used": tokens_used,
+            "response_time_ms": response_time_ms,
+            "model": model,
+            "success": success,
+            "error_message": error_message,
+            "context_tokens_saved": context_tokens_saved,
+            "dedup_tokens_saved": dedup_tokens_saved,
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached_tokens,
+            "response_cache": response_cache,
+            "timings": timings,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+        # Batched in the background when the writer is running (no ID returned)
+        if self.writer and self.writer.enqueue("query_analytics", [row]):
+            return None
+
         try:
-            result = self.client.table("query_analytics").insert({
-                "profile_id": profile_id,
-                "user_query": user_query,
-                "intent_detected": intent_detected,
-                "tools_used": tools_used or [],
-                "sections_retrieved": sections_retrieved,
-                "tokens_used": tokens_used,
-                "response_time_ms": response_time_ms,
-                "model": model,
-                "success": success,
-                "error_message": error_message
-            }).execute()
+            client = await self.connect()
+            result = await self._write("query_analytics", client.table("query_analytics").insert(row))
 
             analytics_id = result.data[0]["id"] if result.data else None
             logger.info("analytics_logged", profile_id=profile_id, analytics_id=analytics_id)
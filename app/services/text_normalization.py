@@ -0,0 +1,156 @@
+"""
+Text Normalization
+Canonical forms of Bengali/English user text for cache keys and lookups
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import List
+
+# Bengali digits ০-৯ → ASCII 0-9
+BENGALI_DIGITS = str.maketrans("০১২৩৪৫৬৭৮৯", "0123456789")
+
+# Zero-width joiners/non-joiners, BOM and soft hyphen vary between keyboards
+_INVISIBLE = dict.fromkeys(map(ord, "​‌‍⁠﻿­"))
+
+_WHITESPACE = re.compile(r"\s+")
+_THOUSANDS_SEPARATOR = re.compile(r"(?<=\d),(?=\d)")
+
+
+def _is_punctuation(ch: str) -> bool:
+    """Unicode punctuation or symbol (covers danda ।, ॥, ?, !, emoji, ...)"""
+    return unicodedata.category(ch)[0] in ("P", "S")
+
+
+def normalize_query(text: str) -> str:
+    """
+    Canonicalize a user message for exact-match caching
+
+    - Unicode NFC (so precomposed and decomposed য়/ড়/ঢ় compare equal)
+    - Invisible joiners removed, case folded
+    - Bengali digits transliterated to ASCII, thousands separators dropped
+      (৫০,০০০ == 50000; the amount itself is kept since answers depend on it)
+    - Punctuation and symbols replaced by spaces, whitespace collapsed
+
+    Args:
+        text: Raw user message
+
+    Returns:
+        Canonical string ("" if nothing meaningful is left)
+    """
+    text = unicodedata.normalize("NFC", text).translate(_INVISIBLE).casefold()
+    text = text.translate(BENGALI_DIGITS)
+    text = _THOUSANDS_SEPARATOR.sub("", text)
+    text = "".join(" " if _is_punctuation(ch) else ch for ch in text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+# Words: Latin letters/digits or Bengali-block characters. `\w` alone is not
+# enough: Bengali vowel signs and the virama (্) are combining marks, which
+# `\w` doesn't match, so it would split স্বামী into single letters.
+_WORD = re.compile(r"[0-9a-z\u0980-\u09FF]+")
+
+# Inflectional suffixes stripped by the light stemmer, in match order, with
+# whether they only follow a vowel (স্বামীর, বাড়িতে, ঢাকায়; after a consonant
+# they belong to the word: দেনমোহর, আদালত)
+_BENGALI_SUFFIXES = tuple((unicodedata.normalize("NFC", suffix), after_vowel) for suffix, after_vowel in (
+    ("গুলোর", False), ("গুলির", False), ("দিগকে", False), ("দিগের", False), ("দেরকে", False),
+    ("গুলো", False), ("গুলি", False), ("য়ের", False), ("দের", False), ("টির", False), ("টার", False),
+    ("কে", False), ("ের", False), ("টি", False), ("টা", False),
+    ("তে", True), ("য়", True), ("র", True),
+    ("ে", False),
+))
+_VOWELS = frozenset("অআইঈউঊঋএঐওঔািীুূৃেৈোৌ")
+_MIN_STEM_CHARS = 2
+
+# Function words that carry no legal meaning (matched before and after stemming)
+STOPWORDS = frozenset(unicodedata.normalize("NFC", word) for word in (
+    "এবং ও বা কি কী কোন কোনো এই সেই যে যা যদি তবে না নয় হয় হইবে হইয়া করিয়া "
+    "করিতে করা কর আমি আমা আমার আমাকে আপনি তিনি তাহা তাহার উহা উক্ত সহিত জন্য "
+    "থেকে হতে পর্যন্ত দ্বারা প্রতি চাই পারি পারব "
+    "a an the of to in on for and or is are was be by with my me i what how can"
+).split())
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """Strip one inflectional suffix (Bengali case/plural endings, English plural -s)"""
+    if word < "\u0980":
+        # ASCII word or number: guardians → guardian, but not ss (process)
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            return word[:-1]
+        return word
+    for suffix, after_vowel in _BENGALI_SUFFIXES:
+        if not word.endswith(suffix) or len(word) - len(suffix) < _MIN_STEM_CHARS:
+            continue
+        if after_vowel and word[-len(suffix) - 1] not in _VOWELS:
+            continue
+        return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split Bengali/English text into search terms
+
+    Same canonicalization as normalize_query (NFC, invisibles removed, case
+    folded, Bengali digits → ASCII), then words are stemmed and stopwords
+    dropped.
+
+    Args:
+        text: Query or document text
+
+    Returns:
+        Terms in text order (duplicates kept, for term frequencies)
+    """
+    text = unicodedata.normalize("NFC", text).translate(_INVISIBLE).casefold()
+    text = text.translate(BENGALI_DIGITS)
+    terms = []
+    for word in _WORD.findall(text):
+        if word in STOPWORDS:
+            continue
+        term = stem(word)
+        if term not in STOPWORDS:
+            terms.append(term)
+    return terms
+
+
+# Bengali letter suffixes of inserted sections (২ক = 2A) → Latin, in alphabet order
+_SECTION_SUFFIX_LETTERS = str.maketrans("কখগঘঙচছজঝ", "abcdefghi")
+
+# Optional "section"/"ধারা"/§ prefix, number, optional letter suffix, ignored
+# subsection parts: "Section 12A", "ধারা ১২ক", "12 (1)(b)"
+_SECTION_REF = re.compile(
+    r"^(?:sections?|sec|s|ধারা|§)?\s*(\d+)\s*([a-i])?\s*(?:\(.*\))?$"
+)
+
+
+@lru_cache(maxsize=4096)
+def normalize_section_number(text: str) -> str:
+    """
+    Canonicalize a section number reference for lookups
+
+    Bengali digits and suffix letters are transliterated ('১২ক' == '12A' ==
+    'section 12 a' == 'ধারা ১২ক' → '12a'), leading zeros and subsection
+    parts ('12(1)') dropped.
+
+    Args:
+        text: Section number as stored or as sent in a tool call
+
+    Returns:
+        Canonical key ("" if text isn't a section number)
+    """
+    text = unicodedata.normalize("NFC", text).translate(_INVISIBLE).casefold()
+    text = text.translate(BENGALI_DIGITS).translate(_SECTION_SUFFIX_LETTERS).replace(".", " ")
+    match = _SECTION_REF.match(_WHITESPACE.sub(" ", text).strip())
+    if not match:
+        return ""
+    number, suffix = match.groups()
+    return str(int(number)) + (suffix or "")
+
+
+def normalize_act_title(text: str) -> str:
+    """Canonical act title for alias lookups (normalize_query without a leading "the")"""
+    text = normalize_query(text)
+    return text[4:] if text.startswith("the ") else text
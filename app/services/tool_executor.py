@@ -0,0 +1,246 @@
+"""
+Tool Executor
+Runs a round of tool calls concurrently and memoizes their serialized results
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import structlog
+
+from app.config import get_settings
+from app.services.context_builder import estimate_tokens
+from app.services.data_loader import get_data_loader
+from app.services.metrics import TOOL_CALLS, TOOL_SECONDS
+from app.tools.legal_tools import execute_tool_json, fit_tool_result
+
+logger = structlog.get_logger()
+
+# Recent execution times kept per tool for the latency percentiles in stats()
+LATENCY_WINDOW = 1000
+
+
+class ToolMetrics:
+    """Call, cache-hit, latency and size counters for one tool"""
+
+    def __init__(self):
+        self.calls = 0
+        self.cache_hits = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.latencies_ms: Deque[float] = deque(maxlen=LATENCY_WINDOW)  # executed calls only
+        # Size of every result added to the conversation, cached or not
+        self.bytes_total = 0
+        self.tokens_total = 0
+        self.budget_trims = 0
+        # act/section references in the arguments, and those matching nothing
+        self.references = 0
+        self.reference_misses = 0
+
+    def record(self, duration_ms: float):
+        self.total_ms += duration_ms
+        self.latencies_ms.append(duration_ms)
+
+    def record_result(self, info: Dict[str, Any]):
+        self.bytes_total += info["bytes"]
+        self.tokens_total += info["tokens"]
+        if info.get("trimmed"):
+            self.budget_trims += 1
+        self.references += info.get("references", 0)
+        self.reference_misses += info.get("reference_misses", 0)
+
+    def stats(self) -> Dict[str, Any]:
+        executed = self.calls - self.cache_hits - self.errors
+        returned = self.calls - self.errors
+        ordered = sorted(self.latencies_ms)
+
+        def percentile(p: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 3) if ordered else 0.0
+
+        return {
+            "calls": self.calls,
+            "cache_hits": self.cache_hits,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / executed, 3) if executed else 0.0,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "max_ms": round(ordered[-1], 3) if ordered else 0.0,
+            "bytes_total": self.bytes_total,
+            "tokens_total": self.tokens_total,
+            "avg_tokens": round(self.tokens_total / returned) if returned else 0,
+            "budget_trims": self.budget_trims,
+            "references": self.references,
+            "reference_misses": self.reference_misses,
+            "reference_miss_rate": round(self.reference_misses / self.references, 4) if self.references else 0.0,
+        }
+
+
+class ToolExecutor:
+    """
+    Executes tool calls off the event loop, with a result cache
+
+    Every tool is a pure function of its arguments and the loaded corpus, so
+    the serialized result is cached by (tool, canonical arguments) across
+    calls and turns; the cache is dropped when the DataLoader instance
+    changes. Within a round, identical calls run once and the misses are
+    dispatched to a small thread pool together, keeping the event loop free
+    for other requests while they run. Results over their tool's token
+    budget are trimmed before they are cached.
+    """
+
+    def __init__(self, max_workers: int = 4, cache_size: int = 256, budgets: Optional[Dict[str, int]] = None):
+        """
+        Initialize executor
+
+        Args:
+            max_workers: Threads running tool calls
+            cache_size: Serialized results kept (LRU); 0 disables the cache
+            budgets: Tool name -> max estimated tokens per result (missing or 0 = no limit)
+        """
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self.cache_size = cache_size
+        self.budgets = budgets or {}
+        self._results: "OrderedDict[str, Tuple[str, Dict[str, Any]]]" = OrderedDict()  # key -> (content, info)
+        self._loader = None
+        self.metrics: Dict[str, ToolMetrics] = {}
+
+    @staticmethod
+    def cache_key(tool_name: str, arguments: Dict[str, Any]) -> str:
+        """Canonical (tool, arguments) key: key order and whitespace don't matter"""
+        return json.dumps([tool_name, arguments], ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+    def _cached(self, key: str, loader) -> Optional[Tuple[str, Dict[str, Any]]]:
+        if loader is not self._loader:
+            self._results.clear()
+            self._loader = loader
+        entry = self._results.get(key)
+        if entry is not None:
+            self._results.move_to_end(key)
+        return entry
+
+    def _store(self, key: str, entry: Tuple[str, Dict[str, Any]]):
+        if self.cache_size <= 0:
+            return
+        self._results[key] = entry
+        self._results.move_to_end(key)
+        while len(self._results) > self.cache_size:
+            self._results.popitem(last=False)
+
+    def _timed(self, tool_name: str, arguments: Dict[str, Any]) -> Tuple[str, Dict[str, Any], float]:
+        started = time.perf_counter()
+        content, info = execute_tool_json(tool_name, arguments)
+        tokens = estimate_tokens(content)
+        budget = self.budgets.get(tool_name, 0)
+        if budget and tokens > budget:
+            content, info = fit_tool_result(tool_name, arguments, budget)
+            info = {**info, "trimmed": True, "untrimmed_tokens": tokens}
+            tokens = estimate_tokens(content)
+        info = {**info, "bytes": len(content.encode("utf-8")), "tokens": tokens}
+        return content, info, (time.perf_counter() - started) * 1000
+
+    async def run(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Execute one round of tool calls
+
+        Args:
+            calls: [(tool name, parsed arguments)] in the model's order
+
+        Returns:
+            [(JSON content, {"sections_count", "bytes", "tokens", "cached"} plus
+            "trimmed" / "untrimmed_tokens" when cut to budget)] in the same order
+        """
+        keys = [self.cache_key(name, arguments) for name, arguments in calls]
+        loader = get_data_loader()  # corpus generation the cache is checked against
+        results: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        pending: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+
+        for key, (name, arguments) in zip(keys, calls):
+            self.metrics.setdefault(name, ToolMetrics()).calls += 1
+            if key in results or key in pending:
+                self.metrics[name].cache_hits += 1  # repeated within the round
+                continue
+            cached = self._cached(key, loader)
+            if cached is not None:
+                self.metrics[name].cache_hits += 1
+                results[key] = cached
+            else:
+                pending[key] = (name, arguments)
+
+        if pending:
+            loop = asyncio.get_running_loop()
+            outcomes = await asyncio.gather(
+                *(loop.run_in_executor(self._pool, self._timed, name, arguments) for name, arguments in pending.values()),
+                return_exceptions=True,
+            )
+            for (key, (name, arguments)), outcome in zip(pending.items(), outcomes):
+                if isinstance(outcome, BaseException):
+                    self.metrics[name].errors += 1
+                    logger.error("tool_error", tool=name, args=arguments, error=str(outcome))
+                    raise outcome
+                content, info, duration_ms = outcome
+                self.metrics[name].record(duration_ms)
+                TOOL_SECONDS.observe(duration_ms / 1000, name)
+                logger.info("tool_executed", tool=name, duration_ms=round(duration_ms, 3),
+                            content_length=len(content), tokens=info["tokens"], trimmed=info.get("trimmed", False))
+                results[key] = (content, info)
+                if get_data_loader() is loader:  # not cached if the corpus was reloaded meanwhile
+                    self._store(key, (content, info))
+
+        round_results = []
+        seen = set()
+        for key, (name, _) in zip(keys, calls):
+            content, info = results[key]
+            cached = key not in pending or key in seen
+            self.metrics[name].record_result(info)
+            TOOL_CALLS.inc(name, "true" if cached else "false")
+            round_results.append((content, {**info, "cached": cached}))
+            seen.add(key)
+        return round_results
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache size and per-tool counters/latency"""
+        return {
+            "cached_results": len(self._results),
+            "cache_size": self.cache_size,
+            "tools": {name: metrics.stats() for name, metrics in sorted(self.metrics.items())},
+        }
+
+    def close(self):
+        """Stop the worker threads"""
+        self._pool.shutdown(wait=False)
+
+
+# Global tool executor instance
+_tool_executor: Optional[ToolExecutor] = None
+
+
+def get_tool_executor() -> ToolExecutor:
+    """
+    Get global tool executor instance
+    Lazy initialization on first call
+    """
+    global _tool_executor
+    if _tool_executor is None:
+        settings = get_settings()
+        _tool_executor = ToolExecutor(
+            max_workers=settings.tool_executor_workers,
+            cache_size=settings.tool_result_cache_size,
+            budgets={
+                "get_legal_knowledge": settings.tool_budget_legal_knowledge_tokens,
+                "get_procedural_guidance": settings.tool_budget_procedural_guidance_tokens,
+                "search_legal_sections": settings.tool_budget_search_tokens,
+            },
+        )
+    return _tool_executor
+
+
+def close_tool_executor():
+    """Stop the global tool executor's threads (called on shutdown)"""
+    global _tool_executor
+    if _tool_executor is not None:
+        _tool_executor.close()
+        _tool_executor = None
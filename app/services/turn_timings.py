@@ -0,0 +1,114 @@
+"""
+Turn Timings
+Span waterfall of one chat turn: Server-Timing header, query_analytics.timings, slowest recent turns
+"""
+
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional
+
+from app.config import get_settings
+
+
+class TurnTimings:
+    """
+    Spans of one chat turn, as offsets from the start of the request
+
+    Span names: history, context, llm_<round>, tools_<round> (round is 0,
+    1, 2, final or fast_path) and store. The stages run one after another,
+    so gaps between spans are time spent outside them.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+
+    def add(self, name: str, started: float):
+        """Record a span that began at `started` (time.perf_counter()) and ends now"""
+        ended = time.perf_counter()
+        self.spans.append({
+            "name": name,
+            "start_ms": round((started - self.started) * 1000, 1),
+            "ms": round((ended - started) * 1000, 1),
+        })
+
+    def total_ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000, 1)
+
+    def waterfall(self) -> Dict[str, Any]:
+        """{"total_ms", "spans": [{"name", "start_ms", "ms"}]} (stored in query_analytics.timings)"""
+        return {"total_ms": self.total_ms(), "spans": list(self.spans)}
+
+    def server_timing(self) -> str:
+        """Server-Timing header value (durations in ms, in span order, then total)"""
+        parts = [f"{span['name']};dur={span['ms']}" for span in self.spans]
+        parts.append(f"total;dur={self.total_ms()}")
+        return ", ".join(parts)
+
+
+# The turn being handled by the current task (None outside /chat and /chat/stream)
+_current_turn: ContextVar[Optional[TurnTimings]] = ContextVar("turn_timings", default=None)
+
+
+def start_turn() -> TurnTimings:
+    """Begin timing a turn in the current task"""
+    timings = TurnTimings()
+    _current_turn.set(timings)
+    return timings
+
+
+def end_turn():
+    """Stop attributing spans to the current task's turn"""
+    _current_turn.set(None)
+
+
+def record_span(name: str, started: float):
+    """Add a span to the current turn, if one is being timed (no-op otherwise)"""
+    timings = _current_turn.get()
+    if timings is not None:
+        timings.add(name, started)
+
+
+class RecentTurns:
+    """
+    Waterfalls of the last `size` turns in this process
+
+    Only ids (profile, session), the intent and the tool names are kept,
+    never the message text.
+    """
+
+    def __init__(self, size: int = 500):
+        """
+        Initialize buffer
+
+        Args:
+            size: Turns kept (oldest dropped first)
+        """
+        self._turns: Deque[Dict[str, Any]] = deque(maxlen=size)
+
+    def add(self, turn: Dict[str, Any]):
+        """Keep one turn ({"total_ms", "spans", ...})"""
+        self._turns.append(turn)
+
+    def slowest(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Slowest kept turns, slowest first"""
+        return sorted(self._turns, key=lambda turn: turn["total_ms"], reverse=True)[:limit]
+
+    def __len__(self) -> int:
+        return len(self._turns)
+
+
+# Global recent turns buffer
+_recent_turns: Optional[RecentTurns] = None
+
+
+def get_recent_turns() -> RecentTurns:
+    """
+    Get global recent turns buffer
+    Lazy initialization on first call
+    """
+    global _recent_turns
+    if _recent_turns is None:
+        _recent_turns = RecentTurns(get_settings().slow_turns_kept)
+    return _recent_turns
@@ -0,0 +1,260 @@
+"""
+Write-Behind Writer
+Batches Supabase inserts in a background task so they stay off the response path
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger()
+
+FlushFn = Callable[[str, List[Dict[str, Any]]], Awaitable[None]]
+
+
+class WriteBehindWriter:
+    """
+    Background writer that coalesces row inserts into multi-row inserts
+
+    Rows are queued per table. Tables in `immediate_tables` (conversations) are
+    flushed on the next loop iteration together with whatever else is queued;
+    other tables (analytics) are flushed when `batch_size` rows are pending or
+    `flush_interval` seconds have passed since the oldest pending row.
+
+    Memory is bounded by `max_queue_size` queued items: enqueue() returns False
+    when the queue is full (or the writer is not running) so the caller can
+    write directly instead of losing the row.
+
+    The rows of one enqueue() call (a user/assistant pair) are never split
+    across inserts. A failing batch is retried with backoff for at most
+    `max_retry_seconds`, so an outage delays the queue behind it by that much
+    per batch; after that each group is tried once on its own and dropped if
+    it still fails.
+    """
+
+    def __init__(
+        self,
+        flush_fn: FlushFn,
+        immediate_tables: Iterable[str] = (),
+        max_queue_size: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_retries: int = 5,
+        max_retry_seconds: float = 3.0,
+        backoff_base: float = 0.25,
+        backoff_max: float = 2.0,
+    ):
+        """
+        Initialize writer
+
+        Args:
+            flush_fn: Coroutine inserting a list of rows into a table (raises on failure)
+            immediate_tables: Tables flushed as soon as the loop sees them
+            max_queue_size: Maximum number of queued enqueue() calls
+            batch_size: Maximum rows per insert (a larger single group is inserted alone)
+            flush_interval: Maximum seconds a batched row waits before flushing
+            max_retries: Retries per batch before falling back to per-group inserts
+            max_retry_seconds: Total backoff per batch before falling back to per-group inserts
+            backoff_base: First retry delay in seconds (doubles per attempt)
+            backoff_max: Retry delay cap in seconds
+        """
+        self._flush_fn = flush_fn
+        self._immediate_tables = set(immediate_tables)
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.max_retry_seconds = max_retry_seconds
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Dict[str, List[List[Dict[str, Any]]]] = {}  # row groups per table, one per enqueue()
+        self._pending_since: Dict[str, float] = {}
+
+        # Counters
+        self.enqueued_rows = 0
+        self.rejected_rows = 0
+        self.flushed_rows = 0
+        self.failed_rows = 0
+        self.batches = 0
+        self.retries = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Start the background flush task"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run())
+        logger.info("write_behind_started", batch_size=self.batch_size, flush_interval=self.flush_interval)
+
+    async def stop(self):
+        """Flush everything still queued, then stop the background task"""
+        if not self.running:
+            return
+        await self._queue.put(None)  # Sentinel: flush all and exit
+        await self._task
+        self._task = None
+        logger.info("write_behind_stopped", **self.stats())
+
+    def enqueue(self, table: str, rows: List[Dict[str, Any]]) -> bool:
+        """
+        Queue rows for a table (rows of one call are always inserted together)
+
+        Returns:
+            True if queued, False if the caller must write directly
+        """
+        if not self.running:
+            return False
+        try:
+            self._queue.put_nowait((table, rows))
+        except asyncio.QueueFull:
+            self.rejected_rows += len(rows)
+            logger.warning("write_behind_queue_full", table=table, queue_depth=self._queue.qsize())
+            return False
+        self.enqueued_rows += len(rows)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, throughput counters and flush latency"""
+        pending_rows = sum(len(group) for groups in self._pending.values() for group in groups)
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "pending_rows": pending_rows,
+            "enqueued_rows": self.enqueued_rows,
+            "rejected_rows": self.rejected_rows,
+            "flushed_rows": self.flushed_rows,
+            "failed_rows": self.failed_rows,
+            "batches": self.batches,
+            "retries": self.retries,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "avg_flush_ms": round(self._total_flush_ms / self.batches, 2) if self.batches else 0.0,
+            "max_flush_ms": round(self.max_flush_ms, 2),
+        }
+
+    def _absorb(self, item: Tuple[str, List[Dict[str, Any]]]):
+        """Move one queued item into the per-table pending buffers"""
+        table, rows = item
+        if table not in self._pending:
+            self._pending[table] = []
+            self._pending_since[table] = time.monotonic()
+        self._pending[table].append(rows)
+
+    def _next_timeout(self) -> Optional[float]:
+        """Seconds until the oldest batched table is due, or None if nothing is pending"""
+        if not self._pending_since:
+            return None
+        oldest = min(self._pending_since.values())
+        return max(0.0, oldest + self.flush_interval - time.monotonic())
+
+    def _due_tables(self, flush_all: bool = False) -> List[str]:
+        now = time.monotonic()
+        due = []
+        for table, groups in self._pending.items():
+            if (
+                flush_all
+                or table in self._immediate_tables
+                or sum(len(group) for group in groups) >= self.batch_size
+                or now - self._pending_since[table] >= self.flush_interval
+            ):
+                due.append(table)
+        return due
+
+    async def _run(self):
+        """Background loop: wait for rows, drain the queue, flush due tables"""
+        stopping = False
+        while not stopping:
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout=self._next_timeout())
+            except asyncio.TimeoutError:
+                item = False  # Time-based flush
+
+            if item is None:
+                stopping = True
+            elif item:
+                self._absorb(item)
+
+            # Drain whatever else is already queued without waiting
+            while not self._queue.empty():
+                queued = self._queue.get_nowait()
+                if queued is None:
+                    stopping = True
+                else:
+                    self._absorb(queued)
+
+            for table in self._due_tables(flush_all=stopping):
+                groups = self._pending.pop(table)
+                self._pending_since.pop(table, None)
+                for batch in self._batches(groups):
+                    await self._flush_batch(table, batch)
+
+    def _batches(self, groups: List[List[Dict[str, Any]]]) -> List[List[List[Dict[str, Any]]]]:
+        """Split row groups into batches of up to batch_size rows without splitting a group"""
+        batches, current, size = [], [], 0
+        for group in groups:
+            if current and size + len(group) > self.batch_size:
+                batches.append(current)
+                current, size = [], 0
+            current.append(group)
+            size += len(group)
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _flush_batch(self, table: str, groups: List[List[Dict[str, Any]]]):
+        """Insert one batch with bounded backoff; isolate bad groups if it keeps failing"""
+        rows = [row for group in groups for row in group]
+        started = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._flush_fn(table, rows)
+                self._record_flush(table, len(rows), started)
+                return
+            except Exception as e:
+                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                waited = time.perf_counter() - started
+                if attempt == self.max_retries or waited + delay > self.max_retry_seconds:
+                    logger.error("write_behind_batch_failed", table=table, rows=len(rows), attempts=attempt + 1,
+                                 error=str(e))
+                    break
+                self.retries += 1
+                logger.warning("write_behind_retry", table=table, attempt=attempt + 1, delay=delay, error=str(e))
+                await asyncio.sleep(delay)
+
+        if len(groups) == 1:
+            self.failed_rows += len(rows)
+            logger.error("write_behind_rows_dropped", table=table, rows=len(rows))
+            return
+
+        # One bad group must not drop the whole batch: retry each group (a message pair) once on its own
+        written = 0
+        for group in groups:
+            try:
+                await self._flush_fn(table, group)
+                written += len(group)
+            except Exception as e:
+                self.failed_rows += len(group)
+                logger.error("write_behind_rows_dropped", table=table, rows=len(group), error=str(e))
+        if written:
+            self._record_flush(table, written, started)
+
+    def _record_flush(self, table: str, row_count: int, started: float):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.batches += 1
+        self.flushed_rows += row_count
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self._total_flush_ms += elapsed_ms
+        logger.info("write_behind_flushed", table=table, rows=row_count, flush_ms=round(elapsed_ms, 2),
+                    queue_depth=self._queue.qsize())
@@ -3,11 +3,23 @@ Legal Tools for OpenAI Function Calling
 Provides access to legal knowledge and procedural guidance
 """
 
-from typing import Dict, Any
+import copy
+import json
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+from app.services.context_builder import estimate_tokens
 from app.services.data_loader import get_data_loader
+from app.services.semantic_index import HashingEmbedder, get_semantic_index
+from app.services.text_normalization import normalize_act_title
 
 MAX_SUMMARY_SECTIONS = 200
 
+# Browse results kept when a query ranks them (best BM25 matches first)
+SEARCH_TOP_K = 30
+
+# Same output as json.dumps(value, ensure_ascii=False) without building an encoder per call
+_to_json = json.JSONEncoder(ensure_ascii=False).encode
+
 INTENT_ENUM = [
     "rape_sexual_violence", "domestic_violence_general", "dowry",
     "child_marriage", "custody", "maintenance", "divorce_talaq",
@@ -74,18 +86,23 @@ LEGAL_TOOLS = [
         "type": "function",
         "function": {
             "name": "search_legal_sections",
-            "description": "Search Bangladesh acts by act_ids. Returns section summaries by default. Pass section_numbers to get full law text for specific sections.\n\n== Act Groups (pick act_ids by topic) ==\n\nVIOLENCE & PROTECTION: 835 (নারী ও শিশু নির্যাতন দমন আইন ২০০০), 1063 (পারিবারিক সহিংসতা আইন ২০১০), 1207 (বাল্যবিবাহ নিরোধ আইন ২০১৭), 1256 (যৌতুক নিরোধ আইন ২০১৮), 1351 (নারী ও শিশু নির্যাতন দমন সংশোধন ২০২০), 1524 (নারী ও শিশু নির্যাতন দমন সংশোধন অধ্যাদেশ ২০২৫)\n\nMUSLIM FAMILY LAW: 305 (Muslim Family Laws Ordinance 1961), 180 (Dissolution of Muslim Marriages 1939), 476 (Muslim Marriages and Divorces Registration 1974), 173 (Muslim Personal Law Shariat 1937), 101 (Mussalman Wakf Validating 1913)\n\nHINDU FAMILY LAW: 9 (Hindu Widow's Re-marriage 1856), 105 (Hindu Disposition of Property 1916), 147 (Hindu Inheritance Removal of Disabilities 1928), 148 (Hindu Law of Inheritance Amendment 1929), 152 (Hindu Gains of Learning 1930), 171 (Hindu Women's Rights to Property 1937), 201 (Hindu Women's Property Agricultural Land 1943), 214 (Hindu Married Women's Separate Residence and Maintenance 1946), 215 (Hindu Marriage Disabilities Removal 1946), 1105 (হিন্দু বিবাহ নিবন্ধন আইন ২০১২)\n\nCHRISTIAN & OTHER MARRIAGE: 20 (Divorce Act 1869), 25 (Special Marriage Act 1872), 27 (Christian Marriage Act 1872), 83 (Foreign Marriage Act 1903), 92 (Anand Marriage Act 1909), 168 (Parsi Marriage and Divorce 1936), 172 (Arya Marriage Validation 1937), 178 (Cutchi Memons Act 1938)\n\nCHILDREN & GUARDIANSHIP: 64 (Guardians and Wards Act 1890), 149 (Child Marriage Restraint 1929), 470 (Children Act 1974), 621 (Abandoned Children Ordinance 1982), 1119 (শিশু আইন ২০১৩), 1375 (শিশু দিবাযত্ন কেন্দ্র আইন ২০২১)\n\nCOURTS & PROCEDURE: 682 (Family Courts Ordinance 1985), 1444 (পারিবারিক আদালত আইন ২০২৩), 1488 (গ্রাম আদালত সংশোধন আইন ২০২৪)\n\nPROPERTY & INHERITANCE: 30 (Married Women's Property Act 1874), 68 (Partition Act 1893), 138 (Succession Act 1925), 660 (Hindu Religious Welfare Trust 1983), 661 (Buddhist Religious Welfare Trust 1983), 1109 (ওয়াক্‌ফ সম্পত্তি হস্তান্তর আইন ২০১৩)\n\nMAINTENANCE: 122 (Maintenance Orders Enforcement 1921), 290 (Claims for Maintenance Recovery Abroad 1959), 1132 (পিতা-মাতার ভরণ-পোষণ আইন ২০১৩)\n\nREGISTRATION & CIVIL: 33 (Majority Act 1875), 56 (Births Deaths Marriages Registration 1886), 921 (জন্ম ও মৃত্যু নিবন্ধন আইন ২০০৪)\n\nOTHER: 207 (Orphanages and Widows' Homes 1944), 529 (Public Servants Marriage with Foreign Nationals 1976), 607 (Dowry Prohibition Act 1980), 673 (Women's Rehabilitation Foundation Repeal 1984), 749 (জাতীয় মহিলা সংস্থা আইন ১৯৯১), 956 (কারাগারে আটক সাজাপ্রাপ্ত নারীদের বিশেষ সুবিধা ২০০৬), 1172 (গণকর্মচারী বিদেশি বিবাহ আইন ২০১৫), 1543 (জুলাই গণঅভ্যুত্থানে শহিদ পরিবার কল্যাণ অধ্যাদেশ ২০২৫)",
+            "description": "Search Bangladesh acts by act_ids. Returns section summaries by default. Pass section_numbers to get full law text for specific sections. When unsure which act covers the question, use mode \"semantic\" with a query (act_ids optional) to find the closest sections across all acts.\n\n== Act Groups (pick act_ids by topic) ==\n\nVIOLENCE & PROTECTION: 835 (নারী ও শিশু নির্যাতন দমন আইন ২০০০), 1063 (পারিবারিক সহিংসতা আইন ২০১০), 1207 (বাল্যবিবাহ নিরোধ আইন ২০১৭), 1256 (যৌতুক নিরোধ আইন ২০১৮), 1351 (নারী ও শিশু নির্যাতন দমন সংশোধন ২০২০), 1524 (নারী ও শিশু নির্যাতন দমন সংশোধন অধ্যাদেশ ২০২৫)\n\nMUSLIM FAMILY LAW: 305 (Muslim Family Laws Ordinance 1961), 180 (Dissolution of Muslim Marriages 1939), 476 (Muslim Marriages and Divorces Registration 1974), 173 (Muslim Personal Law Shariat 1937), 101 (Mussalman Wakf Validating 1913)\n\nHINDU FAMILY LAW: 9 (Hindu Widow's Re-marriage 1856), 105 (Hindu Disposition of Property 1916), 147 (Hindu Inheritance Removal of Disabilities 1928), 148 (Hindu Law of Inheritance Amendment 1929), 152 (Hindu Gains of Learning 1930), 171 (Hindu Women's Rights to Property 1937), 201 (Hindu Women's Property Agricultural Land 1943), 214 (Hindu Married Women's Separate Residence and Maintenance 1946), 215 (Hindu Marriage Disabilities Removal 1946), 1105 (হিন্দু বিবাহ নিবন্ধন আইন ২০১২)\n\nCHRISTIAN & OTHER MARRIAGE: 20 (Divorce Act 1869), 25 (Special Marriage Act 1872), 27 (Christian Marriage Act 1872), 83 (Foreign Marriage Act 1903), 92 (Anand Marriage Act 1909), 168 (Parsi Marriage and Divorce 1936), 172 (Arya Marriage Validation 1937), 178 (Cutchi Memons Act 1938)\n\nCHILDREN & GUARDIANSHIP: 64 (Guardians and Wards Act 1890), 149 (Child Marriage Restraint 1929), 470 (Children Act 1974), 621 (Abandoned Children Ordinance 1982), 1119 (শিশু আইন ২০১৩), 1375 (শিশু দিবাযত্ন কেন্দ্র আইন ২০২১)\n\nCOURTS & PROCEDURE: 682 (Family Courts Ordinance 1985), 1444 (পারিবারিক আদালত আইন ২০২৩), 1488 (গ্রাম আদালত সংশোধন আইন ২০২৪)\n\nPROPERTY & INHERITANCE: 30 (Married Women's Property Act 1874), 68 (Partition Act 1893), 138 (Succession Act 1925), 660 (Hindu Religious Welfare Trust 1983), 661 (Buddhist Religious Welfare Trust 1983), 1109 (ওয়াক্‌ফ সম্পত্তি হস্তান্তর আইন ২০১৩)\n\nMAINTENANCE: 122 (Maintenance Orders Enforcement 1921), 290 (Claims for Maintenance Recovery Abroad 1959), 1132 (পিতা-মাতার ভরণ-পোষণ আইন ২০১৩)\n\nREGISTRATION & CIVIL: 33 (Majority Act 1875), 56 (Births Deaths Marriages Registration 1886), 921 (জন্ম ও মৃত্যু নিবন্ধন আইন ২০০৪)\n\nOTHER: 207 (Orphanages and Widows' Homes 1944), 529 (Public Servants Marriage with Foreign Nationals 1976), 607 (Dowry Prohibition Act 1980), 673 (Women's Rehabilitation Foundation Repeal 1984), 749 (জাতীয় মহিলা সংস্থা আইন ১৯৯১), 956 (কারাগারে আটক সাজাপ্রাপ্ত নারীদের বিশেষ সুবিধা ২০০৬), 1172 (গণকর্মচারী বিদেশি বিবাহ আইন ২০১৫), 1543 (জুলাই গণঅভ্যুত্থানে শহিদ পরিবার কল্যাণ অধ্যাদেশ ২০২৫)",
             "parameters": {
                 "type": "object",
                 "properties": {
                     "query": {
                         "type": "string",
-                        "description": "The user's question in their own words."
+                        "description": "The user's question in their own words. Section summaries are ranked by relevance to it and only the best matches are returned."
                     },
                     "act_ids": {
                         "type": "array",
                         "items": {"type": "string"},
-                        "description": "Act IDs to search within. Pick from the act list in this tool's description."
+                        "description": "Act IDs to search within. Pick from the act list in this tool's description. Optional in semantic mode (omit to search every act)."
+                    },
+                    "mode": {
+                        "type": "string",
+                        "enum": ["keyword", "semantic"],
+                        "description": "keyword (default): rank the given acts' sections by the query's words. semantic: rank sections by meaning across all acts (or the given act_ids); requires query."
                     },
                     "section_numbers": {
                         "type": "array",
@@ -93,13 +110,353 @@ LEGAL_TOOLS = [
                         "description": "Optional: section numbers (in Bengali numerals, e.g. '১', '২ক', '১০') to get full law text for. Use the exact section_number values from the summaries response. Sections not listed get summaries only."
                     }
                 },
-                "required": ["act_ids"]
+                "required": []
             }
         }
     }
 ]
 
 
+def _catalog_act_aliases() -> Dict[str, str]:
+    """Act names as listed in search_legal_sections' catalog ("305 (Muslim Family Laws Ordinance 1961)")"""
+    description = next(tool for tool in LEGAL_TOOLS if tool["function"]["name"] == "search_legal_sections")["function"]["description"]
+    names: Dict[str, Set[str]] = {}
+    for act_id, name in re.findall(r"\b(\d+) \(([^()]+)\)", description):
+        title = normalize_act_title(name)
+        for alias in (title, re.sub(r"\s+\d{4}$", "", title)):
+            names.setdefault(alias, set()).add(act_id)
+    return {alias: next(iter(ids)) for alias, ids in names.items() if len(ids) == 1}
+
+
+# GPT copies act names from the catalog when it sends a name instead of an ID
+CATALOG_ACT_ALIASES = _catalog_act_aliases()
+
+# search_legal_sections wording that only holds while an embedding index is loaded
+_SEMANTIC_SEARCH_HINT = ' When unsure which act covers the question, use mode "semantic" with a query (act_ids optional) to find the closest sections across all acts.'
+_SEMANTIC_ACT_IDS_HINT = " Optional in semantic mode (omit to search every act)."
+
+
+def _keyword_only_tools() -> List[Dict[str, Any]]:
+    """LEGAL_TOOLS without search_legal_sections' semantic mode"""
+    tools = copy.deepcopy(LEGAL_TOOLS)
+    search = next(tool for tool in tools if tool["function"]["name"] == "search_legal_sections")["function"]
+    search["description"] = search["description"].replace(_SEMANTIC_SEARCH_HINT, "", 1)
+    properties = search["parameters"]["properties"]
+    properties["act_ids"]["description"] = properties["act_ids"]["description"].replace(_SEMANTIC_ACT_IDS_HINT, "", 1)
+    del properties["mode"]
+    return tools
+
+
+# Tool schemas sent while semantic search isn't available
+KEYWORD_TOOLS = _keyword_only_tools()
+
+
+def semantic_search_available() -> bool:
+    """
+    Whether to offer mode "semantic" to the model
+
+    Only with a loaded index from a real embedding model: the hashing
+    embedder is lexical overlap (tests and benchmarks), not search by meaning.
+    """
+    index = get_semantic_index(get_data_loader())
+    return index is not None and not isinstance(index.embedder, HashingEmbedder)
+
+
+# A browse response is planned as segments: ("act", act_id) for every section
+# of an act unchanged, ("section", act_id, section_number, extra) for one
+# section's summary, where extra adds "relevance" (or is None), or
+# ("text", act_id, section_number) for one section with its full text
+Segment = Tuple
+
+
+def _search_plan(loader, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Decide what a search_legal_sections call returns, without building entries
+
+    act_ids and section_numbers are resolved leniently (ASCII or Bengali
+    numerals, "12A", act titles); references that match nothing are listed
+    in the result instead of being silently ignored. mode "semantic" ranks
+    by the embedding index instead of BM25, over every act if act_ids is
+    empty.
+
+    Returns:
+        {"error": ...}, or a dict with:
+        - act_ids: Resolved act IDs, in request order
+        - summary_act_ids: Acts that have an act summary, in request order
+        - header: Result keys between act_summaries and legal_sections, in output order
+        - segments: The legal_sections content (see Segment)
+        - references / reference_misses: act and section references given / unresolved
+    """
+    semantic = arguments.get("mode") == "semantic"
+    requested_acts = arguments.get("act_ids") or []
+    if isinstance(requested_acts, (str, int)):
+        requested_acts = [requested_acts]
+    if not isinstance(requested_acts, list):
+        return {"error": "act_ids must be an array of act IDs"}
+    if not requested_acts and not semantic:
+        return {"error": "act_ids is required"}
+
+    act_ids: List[str] = []
+    unknown_acts = []
+    for reference in requested_acts:
+        act_id = loader.resolve_act_id(reference)
+        if act_id is None:
+            act_id = CATALOG_ACT_ALIASES.get(normalize_act_title(str(reference)))
+        if act_id is None or act_id not in loader.sections:
+            unknown_acts.append(reference)
+        elif act_id not in act_ids:
+            act_ids.append(act_id)
+
+    requested_sections = arguments.get("section_numbers") or []
+    if isinstance(requested_sections, (str, int)):
+        requested_sections = [requested_sections]
+    if not isinstance(requested_sections, list):
+        return {"error": "section_numbers must be an array of section numbers"}
+    # act_id -> stored section numbers requested from that act
+    wanted: Dict[str, Set[str]] = {act_id: set() for act_id in act_ids}
+    unresolved_sections = []
+    for reference in requested_sections:
+        found = False
+        for act_id in act_ids:
+            section_num = loader.resolve_section_number(act_id, reference)
+            if section_num is not None:
+                wanted[act_id].add(section_num)
+                found = True
+        if not found:
+            unresolved_sections.append(reference)
+
+    query = arguments.get("query") or ""
+    if not isinstance(query, str):
+        return {"error": "query must be a string"}
+    query = query.strip()
+    summary_act_ids = [act_id for act_id in act_ids if act_id in loader.act_summary_entries]
+    header: Dict[str, Any] = {}
+    segments: List[Segment] = []
+
+    if semantic:
+        if not query:
+            return {"error": "query is required for semantic mode"}
+        index = get_semantic_index(loader)
+        if index is None:
+            return {"error": "Semantic search is not available; search with act_ids instead"}
+        ranked = index.search(query, act_ids=act_ids if requested_acts else None, limit=SEARCH_TOP_K)
+        header["mode"] = "semantic"
+    else:
+        ranked = loader.search_index.search(query, act_ids=act_ids, limit=SEARCH_TOP_K) if query else []
+    if ranked:
+        # Requested sections with full text, then the top-ranked summaries
+        included = set()
+        for act_id in act_ids:
+            for section_num in loader.sections.get(act_id, {}):
+                if section_num in wanted[act_id]:
+                    segments.append(("text", act_id, section_num))
+                    included.add((act_id, section_num))
+        for act_id, section_num, score in ranked:
+            if (act_id, section_num) not in included:
+                segments.append(("section", act_id, section_num, {"relevance": round(score, 2)}))
+
+        scope = act_ids if requested_acts else loader.sections
+        total_available = sum(len(loader.sections.get(act_id, {})) for act_id in scope)
+        header["query"] = query
+        header["sections_count"] = len(segments)
+        header["total_sections_available"] = total_available
+        if total_available > len(segments):
+            header["truncated"] = True
+            header["truncation_note"] = (
+                f"Showing the sections most relevant to the query; {total_available - len(segments)} others omitted. "
+                + ("Use section_numbers for full text, or a different query for other sections." if requested_acts
+                   else "Call again with act_ids and section_numbers for full text.")
+            )
+    else:
+        # No query (or nothing matched): every section in document order
+        total_available = 0
+        for act_id in act_ids:
+            act_sections = loader.sections.get(act_id)
+            if not act_sections:
+                continue
+            total_available += len(act_sections)
+            if wanted[act_id]:
+                for section_num in act_sections:
+                    if section_num in wanted[act_id]:
+                        segments.append(("text", act_id, section_num))
+                    else:
+                        segments.append(("section", act_id, section_num, None))
+            else:
+                segments.append(("act", act_id))
+
+        sections_count = total_available
+        if not requested_sections and total_available > MAX_SUMMARY_SECTIONS:
+            segments = _cap_segments(loader, segments, MAX_SUMMARY_SECTIONS)
+            sections_count = MAX_SUMMARY_SECTIONS
+        header["sections_count"] = sections_count
+        if sections_count < total_available:
+            header["total_sections_available"] = total_available
+            header["truncated"] = True
+            header["truncation_note"] = f"{total_available - MAX_SUMMARY_SECTIONS} sections omitted. Use section_numbers to request specific sections."
+
+    if unknown_acts:
+        header["unknown_act_ids"] = unknown_acts
+    if unresolved_sections:
+        header["unresolved_section_numbers"] = unresolved_sections
+        header["section_numbers_note"] = "These match no section of the requested acts; use section_number values from the summaries."
+
+    return {
+        "act_ids": act_ids,
+        "summary_act_ids": summary_act_ids,
+        "header": header,
+        "segments": segments,
+        "references": len(requested_acts) + len(requested_sections),
+        "reference_misses": len(unknown_acts) + len(unresolved_sections),
+    }
+
+
+def _cap_segments(loader, segments: List[Segment], limit: int) -> List[Segment]:
+    """Keep the first `limit` sections of whole-act segments (splitting the last act)"""
+    capped = []
+    remaining = limit
+    for segment in segments:
+        act_id = segment[1]
+        act_size = len(loader.browse_entries[act_id])
+        if act_size <= remaining:
+            capped.append(segment)
+            remaining -= act_size
+        else:
+            for section_num in list(loader.browse_entries[act_id])[:remaining]:
+                capped.append(("section", act_id, section_num, None))
+            remaining = 0
+        if remaining == 0:
+            break
+    return capped
+
+
+def _search_result(loader, plan: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the search_legal_sections result dict from a plan (shares the precomputed entries)"""
+    legal_sections = []
+    for segment in plan["segments"]:
+        if segment[0] == "act":
+            legal_sections.extend(loader.browse_entries[segment[1]].values())
+        elif segment[0] == "text":
+            legal_sections.append(loader.section_with_text(segment[1], segment[2]))
+        else:
+            _, act_id, section_num, extra = segment
+            entry = loader.browse_entries[act_id][section_num]
+            legal_sections.append({**entry, **extra} if extra else entry)
+
+    return {
+        "acts_searched": plan["act_ids"],
+        "act_summaries": [loader.act_summary_entries[act_id] for act_id in plan["summary_act_ids"]],
+        **plan["header"],
+        "legal_sections": legal_sections,
+    }
+
+
+def _search_result_json(loader, plan: Dict[str, Any]) -> str:
+    """
+    Serialize a search_legal_sections plan by joining precomputed fragments
+
+    Produces exactly json.dumps(_search_result(...), ensure_ascii=False).
+    """
+    section_parts = []
+    for segment in plan["segments"]:
+        if segment[0] == "act":
+            section_parts.append(loader.browse_act_json[segment[1]])
+        elif segment[0] == "text":
+            section_parts.append(_to_json(loader.section_with_text(segment[1], segment[2])))
+        else:
+            _, act_id, section_num, extra = segment
+            fragment = loader.browse_fragments[act_id][section_num]
+            if extra:
+                # '{... "semantic_summary": "..."}' + '"relevance": 1.5}' → one object
+                fragment = fragment[:-1] + ", " + _to_json(extra)[1:]
+            section_parts.append(fragment)
+
+    parts = [
+        '{"acts_searched": ', _to_json(plan["act_ids"]),
+        ', "act_summaries": [', ", ".join(loader.act_summary_fragments[a] for a in plan["summary_act_ids"]), "]",
+    ]
+    for key, value in plan["header"].items():
+        parts.append(f", {_to_json(key)}: {_to_json(value)}")
+    parts.append(', "legal_sections": [')
+    parts.append(", ".join(section_parts))
+    parts.append("]}")
+    return "".join(parts)
+
+
+def _procedural_guidance_json(loader, intent: str, topics: List[str]) -> str:
+    """
+    Join the precomputed guidance fragments for one call
+
+    Produces exactly json.dumps(execute_tool("get_procedural_guidance", ...), ensure_ascii=False).
+    """
+    procedures = ", ".join(
+        f"{_to_json(topic)}: {loader.general_procedure_json[topic]}"
+        for topic in dict.fromkeys(topics or [])
+        if topic in loader.general_procedure_json
+    )
+    return "".join((
+        '{"intent": ', _to_json(intent),
+        ', "topics_requested": ', _to_json(topics),
+        ', "intent_guidance": ', loader.intent_guidance_json.get(intent, "{}"),
+        ', "general_procedures": {', procedures, "}}",
+    ))
+
+
+def _argument_error(tool_name: str, arguments: Any) -> Optional[Dict[str, str]]:
+    """Tool error for intent-tool arguments of the wrong type (search arguments are checked by _search_plan)"""
+    if not isinstance(arguments, dict):
+        return {"error": "Arguments must be a JSON object"}
+    if tool_name in ("get_legal_knowledge", "get_procedural_guidance"):
+        if not isinstance(arguments.get("intent", ""), str):
+            return {"error": "Intent must be a string"}
+    if tool_name == "get_procedural_guidance":
+        topics = arguments.get("topics", [])
+        if topics and not (isinstance(topics, list) and all(isinstance(topic, str) for topic in topics)):
+            return {"error": "Topics must be an array of strings"}
+    return None
+
+
+def execute_tool_json(tool_name: str, arguments: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """
+    Execute a legal tool and return its result serialized for the tool message
+
+    Results are looked up or assembled from JSON precomputed by the
+    DataLoader; only errors and unknown intents fall back to json.dumps of
+    execute_tool().
+
+    Returns:
+        (JSON content, {"sections_count": n})
+    """
+    error = _argument_error(tool_name, arguments)
+    if error:
+        return _to_json(error), {"sections_count": 0}
+    loader = get_data_loader()
+
+    if tool_name == "get_legal_knowledge":
+        intent = arguments.get("intent")
+        if intent in loader.legal_knowledge_json:
+            content = loader.legal_knowledge_json[intent]
+            return content, {"sections_count": loader.legal_knowledge_results[intent]["sections_count"]}
+
+    elif tool_name == "get_procedural_guidance":
+        intent = arguments.get("intent")
+        topics = arguments.get("topics", [])
+        if intent and (not topics or isinstance(topics, list)):
+            return _procedural_guidance_json(loader, intent, topics), {"sections_count": 0}
+
+    elif tool_name == "search_legal_sections":
+        plan = _search_plan(loader, arguments)
+        if "error" not in plan:
+            return _search_result_json(loader, plan), {
+                "sections_count": plan["header"]["sections_count"],
+                "references": plan["references"],
+                "reference_misses": plan["reference_misses"],
+            }
+        return _to_json(plan), {"sections_count": 0}
+
+    result = execute_tool(tool_name, arguments)
+    return _to_json(result), {"sections_count": result.get("sections_count", 0)}
+
+
 def execute_tool(tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
     """
     Execute a legal tool and return results
@@ -111,12 +468,17 @@ def execute_tool(tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Dict with tool results
     """
+    error = _argument_error(tool_name, arguments)
+    if error:
+        return error
     loader = get_data_loader()
 
     if tool_name == "get_legal_knowledge":
         intent = arguments.get("intent")
         if not intent:
             return {"error": "Intent parameter is required"}
+        if intent in loader.legal_knowledge_results:
+            return loader.legal_knowledge_results[intent]
 
         result = loader.get_legal_knowledge(intent)
 
@@ -136,9 +498,6 @@ def execute_tool(tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         if not intent:
             return {"error": "Intent parameter is required"}
 
-        if topics and not isinstance(topics, list):
-            return {"error": "Topics must be an array"}
-
         # Get procedural guidance
         result = loader.get_procedural_guidance(intent, topics)
 
@@ -150,57 +509,72 @@ def execute_tool(tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         }
 
     elif tool_name == "search_legal_sections":
-        act_ids = arguments.get("act_ids")
-        if not act_ids:
-            return {"error": "act_ids is required"}
+        plan = _search_plan(loader, arguments)
+        if "error" in plan:
+            return plan
+        return _search_result(loader, plan)
 
-        section_numbers = set(arguments.get("section_numbers", []))
+    else:
+        return {"error": f"Unknown tool: {tool_name}"}
 
-        all_sections = []
-        act_summaries = []
-        for act_id in act_ids:
-            # Include act summary
-            act_summary = loader.act_summaries.get(act_id)
-            if act_summary:
-                act_summaries.append({
-                    "act_id": act_id,
-                    "act_title": act_summary.get("title", ""),
-                    "summary": act_summary.get("summary", ""),
-                })
-
-            if act_id not in loader.sections:
-                continue
-            for section_num, section_data in loader.sections[act_id].items():
-                entry = {
-                    "act_id": act_id,
-                    "act_title": section_data.get("act_title", ""),
-                    "section_number": section_num,
-                    "section_title": section_data.get("section_title", ""),
-                    "semantic_summary": section_data.get("semantic_summary", ""),
-                }
-                if section_numbers and section_num in section_numbers:
-                    entry["section_text"] = section_data.get("section_text", "")
-                all_sections.append(entry)
-
-        if not section_numbers and len(all_sections) > MAX_SUMMARY_SECTIONS:
-            total_available = len(all_sections)
-            all_sections = all_sections[:MAX_SUMMARY_SECTIONS]
-            return {
-                "acts_searched": act_ids,
-                "act_summaries": act_summaries,
-                "sections_count": len(all_sections),
-                "total_sections_available": total_available,
-                "truncated": True,
-                "truncation_note": f"{total_available - MAX_SUMMARY_SECTIONS} sections omitted. Use section_numbers to request specific sections.",
-                "legal_sections": all_sections
-            }
 
-        return {
-            "acts_searched": act_ids,
-            "act_summaries": act_summaries,
-            "sections_count": len(all_sections),
-            "legal_sections": all_sections
-        }
+def fit_tool_result(tool_name: str, arguments: Dict[str, Any], max_tokens: int) -> Tuple[str, Dict[str, Any]]:
+    """
+    Re-serialize a tool result trimmed to about max_tokens (estimated)
+
+    Whole items are dropped from the end: legal_sections keep at least one
+    section, whose text is cut if it alone is over; guidance drops the
+    requested topics last to first, then intent-guidance keys. The result
+    says what was left out so GPT can ask for it explicitly.
 
+    Returns:
+        (JSON content, {"sections_count": n}) like execute_tool_json
+    """
+    result = dict(execute_tool(tool_name, arguments))  # shallow copy: precomputed results are shared
+    budget = max_tokens - estimate_tokens(_to_json(result))
+    if budget >= 0 or "error" in result:
+        return _to_json(result), {"sections_count": result.get("sections_count", 0)}
+
+    if "legal_sections" in result:
+        # get_legal_knowledge lists what it left out (GPT can't know it otherwise);
+        # a trimmed search keeps only a count, since browse/query cover the rest
+        list_omitted = tool_name == "get_legal_knowledge"
+        result["budget_note"] = (
+            "Some sections omitted to keep this response short. "
+            + ("Request them with search_legal_sections section_numbers." if list_omitted
+               else "Use a query or section_numbers to get other sections.")
+        )
+        budget -= estimate_tokens(_to_json(result["budget_note"])) + 10  # note plus the omitted-keys overhead
+        sections = list(result["legal_sections"])
+        costs = [estimate_tokens(_to_json(section)) for section in sections]
+        omitted = []
+        while budget < 0 and len(sections) > 1:
+            section = sections.pop()
+            ref = {"act_id": section["act_id"], "section_number": section["section_number"]}
+            budget += costs.pop() - (estimate_tokens(_to_json(ref)) if list_omitted else 0)
+            omitted.append(ref)
+        if budget < 0 and sections[0].get("section_text"):
+            text = sections[0]["section_text"]
+            keep = max(0, len(text) * (costs[0] + budget) // costs[0])
+            sections[0] = {**sections[0], "section_text": text[:keep] + "…", "section_text_truncated": True}
+        result["legal_sections"] = sections
+        result["sections_count"] = len(sections)
+        if list_omitted:
+            result["omitted_sections"] = omitted[::-1]
+        else:
+            result["sections_omitted"] = len(omitted)
     else:
-        return {"error": f"Unknown tool: {tool_name}"}
+        result["budget_note"] = "Some guidance omitted to keep this response short; request fewer topics at a time."
+        budget -= estimate_tokens(_to_json(result["budget_note"])) + 10  # note plus the omitted-keys overhead
+        guidance = {key: dict(result.get(key) or {}) for key in ("general_procedures", "intent_guidance")}
+        omitted = []
+        for key, parts in guidance.items():
+            while budget < 0 and parts:
+                name, part = parts.popitem()
+                budget += estimate_tokens(_to_json({name: part}))
+                budget -= estimate_tokens(_to_json(name)) + 1
+                omitted.append(name)
+        result.update(guidance)
+        result["omitted_guidance"] = omitted[::-1]
+
+    return _to_json(result), {"sections_count": result.get("sections_count", 0)}
@@ -0,0 +1,4 @@
+"""
+Benchmarks module
+Load tests and micro-benchmarks run against local stand-ins (no OpenAI / Supabase cost)
+"""
@@ -0,0 +1,130 @@
+"""
+search_legal_sections browse cost per call
+Per-call dict building + json.dumps vs. joining precomputed JSON fragments
+
+The "before" path is the original implementation: build a 5-key dict per
+section on every call, then json.dumps the whole result (as LLMService did).
+The "after" path is execute_tool_json(). Both must produce identical strings.
+
+Run:
+    python -m benchmarks.browse_payloads --iterations 200
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import time
+import tracemalloc
+from typing import Any, Dict
+
+import structlog
+
+CASES = {
+    "1 act, 43 sections": {"act_ids": ["835"]},
+    "3 acts, 84 sections": {"act_ids": ["835", "1063", "1256"]},
+    "Succession Act, 395 (capped 200)": {"act_ids": ["138"]},
+    "3 acts + 2 full texts": {"act_ids": ["305", "180", "476"], "section_numbers": ["৬", "৭"]},
+}
+
+
+def naive_search(loader, arguments: Dict[str, Any]) -> str:
+    """Original browse implementation (no query), serialized the way LLMService did"""
+    from app.tools.legal_tools import MAX_SUMMARY_SECTIONS
+
+    act_ids = arguments["act_ids"]
+    section_numbers = set(arguments.get("section_numbers", []))
+
+    all_sections = []
+    act_summaries = []
+    for act_id in act_ids:
+        act_summary = loader.act_summaries.get(act_id)
+        if act_summary:
+            act_summaries.append({
+                "act_id": act_id,
+                "act_title": act_summary.get("title", ""),
+                "summary": act_summary.get("summary", ""),
+            })
+        if act_id not in loader.sections:
+            continue
+        for section_num, section_data in loader.sections[act_id].items():
+            entry = {
+                "act_id": act_id,
+                "act_title": section_data.act_title,
+                "section_number": section_num,
+                "section_title": section_data.section_title,
+                "semantic_summary": section_data.semantic_summary,
+            }
+            if section_numbers and section_num in section_numbers:
+                del entry["semantic_summary"]  # not sent next to the full text (DataLoader.section_with_text)
+                entry["section_text"] = section_data.section_text
+            all_sections.append(entry)
+
+    if not section_numbers and len(all_sections) > MAX_SUMMARY_SECTIONS:
+        total_available = len(all_sections)
+        result = {
+            "acts_searched": act_ids,
+            "act_summaries": act_summaries,
+            "sections_count": MAX_SUMMARY_SECTIONS,
+            "total_sections_available": total_available,
+            "truncated": True,
+            "truncation_note": f"{total_available - MAX_SUMMARY_SECTIONS} sections omitted. Use section_numbers to request specific sections.",
+            "legal_sections": all_sections[:MAX_SUMMARY_SECTIONS],
+        }
+    else:
+        result = {
+            "acts_searched": act_ids,
+            "act_summaries": act_summaries,
+            "sections_count": len(all_sections),
+            "legal_sections": all_sections,
+        }
+    return json.dumps(result, ensure_ascii=False)
+
+
+def time_call(fn, iterations: int) -> float:
+    """Median microseconds per call"""
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(samples)
+
+
+def peak_allocation(fn) -> float:
+    """Peak KiB allocated during one call"""
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    from app.services.data_loader import get_data_loader
+    from app.tools.legal_tools import execute_tool_json
+
+    loader = get_data_loader()
+
+    print(f"{'case':<34} {'before µs':>10} {'after µs':>9} {'speedup':>8} {'peak KiB before':>16} {'after':>6}")
+    for name, arguments in CASES.items():
+        before_fn = lambda: naive_search(loader, arguments)  # noqa: E731
+        after_fn = lambda: execute_tool_json("search_legal_sections", arguments)  # noqa: E731
+        assert before_fn() == after_fn()[0], f"output differs for {name}"
+
+        before_us = time_call(before_fn, args.iterations)
+        after_us = time_call(after_fn, args.iterations)
+        print(
+            f"{name:<34} {before_us:>10.0f} {after_us:>9.0f} {before_us / after_us:>7.1f}x "
+            f"{peak_allocation(before_fn):>16.0f} {peak_allocation(after_fn):>6.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+get_legal_knowledge / get_procedural_guidance cost per call
+Rebuilding result dicts + json.dumps vs. the DataLoader's precomputed JSON
+
+Checks that every intent, and every intent with every ordered choice of up
+to 3 topics, serializes to the same string both ways, then times a typical
+mix of calls.
+
+Run:
+    python -m benchmarks.closed_tools --iterations 2000
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import statistics
+import time
+from typing import Any, Dict
+
+import structlog
+
+
+def naive_json(loader, tool_name: str, arguments: Dict[str, Any]) -> str:
+    """Previous path: build the result dicts, then json.dumps them (as LLMService did)"""
+    intent = arguments["intent"]
+    if tool_name == "get_legal_knowledge":
+        legal_sections = loader.get_legal_knowledge(intent)["legal_sections"]
+        result = {"intent": intent, "sections_count": len(legal_sections), "legal_sections": legal_sections}
+    else:
+        topics = arguments.get("topics", [])
+        guidance = loader.get_procedural_guidance(intent, topics)
+        result = {
+            "intent": intent,
+            "topics_requested": topics,
+            "intent_guidance": guidance["intent_guidance"],
+            "general_procedures": guidance["general_procedures"],
+        }
+    return json.dumps(result, ensure_ascii=False)
+
+
+def median_us(fn, calls, iterations: int) -> float:
+    samples = []
+    for i in range(iterations):
+        tool_name, arguments = calls[i % len(calls)]
+        started = time.perf_counter()
+        fn(tool_name, arguments)
+        samples.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    from app.services.data_loader import get_data_loader
+    from app.tools.legal_tools import INTENT_ENUM, TOPIC_ENUM, execute_tool_json
+
+    loader = get_data_loader()
+
+    checked = 0
+    for intent in INTENT_ENUM:
+        calls = [("get_legal_knowledge", {"intent": intent}), ("get_procedural_guidance", {"intent": intent})]
+        for size in range(1, 4):
+            for topics in itertools.permutations(TOPIC_ENUM, size):
+                calls.append(("get_procedural_guidance", {"intent": intent, "topics": list(topics)}))
+        for tool_name, arguments in calls:
+            assert execute_tool_json(tool_name, arguments)[0] == naive_json(loader, tool_name, arguments), (tool_name, arguments)
+            checked += 1
+    print(f"identical output for {checked} argument combinations")
+
+    mixes = {
+        "get_legal_knowledge": [("get_legal_knowledge", {"intent": intent}) for intent in INTENT_ENUM],
+        "get_procedural_guidance": [
+            ("get_procedural_guidance", {"intent": intent, "topics": TOPIC_ENUM[i % 6:i % 6 + 3]})
+            for i, intent in enumerate(INTENT_ENUM)
+        ],
+    }
+    print(f"\n{'tool':<26} {'before µs':>10} {'after µs':>9} {'speedup':>8}")
+    for tool_name, calls in mixes.items():
+        before = median_us(lambda name, arguments: naive_json(loader, name, arguments), calls, args.iterations)
+        after = median_us(execute_tool_json, calls, args.iterations)
+        print(f"{tool_name:<26} {before:>10.1f} {after:>9.1f} {before / after:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Cold start: corpus snapshot vs. JSON parse
+Time for a fresh worker process to get a ready DataLoader
+
+Compiles a snapshot into a temporary directory, then starts a fresh
+interpreter per run (as a Railway restart or scale-out does) and times
+importing the data loader plus constructing it, from the JSON files and
+from the snapshot.
+
+Run:
+    python -m benchmarks.cold_start --runs 10
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import structlog
+
+WORKER = """
+import json, logging, sys, time
+started = time.perf_counter()
+import structlog
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+from app.services.data_loader import DataLoader
+imported = time.perf_counter()
+snapshot_path = sys.argv[2] or None
+loader = DataLoader(sys.argv[1], text_blob_dir=sys.argv[3], snapshot_path=snapshot_path)
+ready = time.perf_counter()
+print(json.dumps({"source": loader.source, "import_ms": (imported - started) * 1000, "load_ms": (ready - imported) * 1000}))
+"""
+
+
+def run_worker(data_dir: str, snapshot_path: str, blob_dir: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", WORKER, data_dir, snapshot_path, blob_dir],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--data-dir", default="data")
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    from app.cli import main as cli_main
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_path = str(Path(tmp) / "corpus.snapshot")
+        if cli_main(["compile-corpus", "--data-dir", args.data_dir, "--output", snapshot_path]) != 0:
+            raise SystemExit("compile-corpus failed")
+
+        print(f"\n{args.runs} fresh processes each; DataLoader() time (import time separately)")
+        print(f"{'source':<10} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'import ms':>10}")
+        for label, path in (("json", ""), ("snapshot", snapshot_path)):
+            samples = [run_worker(args.data_dir, path, tmp) for _ in range(args.runs)]
+            assert all(s["source"] == label for s in samples), f"expected {label} loads"
+            load = sorted(s["load_ms"] for s in samples)
+            p95 = load[min(len(load) - 1, int(round(0.95 * (len(load) - 1))))]
+            print(
+                f"{label:<10} {statistics.median(load):>8.0f} {p95:>8.0f} {load[-1]:>8.0f} "
+                f"{statistics.median(s['import_ms'] for s in samples):>10.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
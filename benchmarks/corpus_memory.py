@@ -0,0 +1,147 @@
+"""
+Legal corpus memory per worker
+Full section dicts (previous layout) vs. compact records + memory-mapped section text
+
+Starts N worker processes per layout, each loading family_laws_final.json and
+reading every section text once (as the search index build does), then reads
+/proc/<pid>/smaps_rollup while all of them are alive. RSS counts shared pages
+in every process; PSS splits them between the processes that map them, so PSS
+is what each extra worker really costs. Linux only.
+
+Run:
+    python -m benchmarks.corpus_memory --workers 4
+"""
+
+import argparse
+import gc
+import json
+import logging
+import subprocess
+import sys
+import tempfile
+from typing import Dict
+
+LAYOUTS = ("dicts", "records")
+
+
+def load_dicts(data_dir: str):
+    """Previous DataLoader layout: every parsed section dict kept whole"""
+    with open(f"{data_dir}/family_laws_final.json", "r", encoding="utf-8") as f:
+        sections_list = json.load(f)
+    sections: Dict[str, Dict[str, dict]] = {}
+    for section in sections_list:
+        act_id = section.get("act_id")
+        section_number = section.get("section_number")
+        if act_id and section_number:
+            sections.setdefault(act_id, {})[section_number] = section
+    return sections, lambda section: section.get("section_text", "")
+
+
+def load_records(data_dir: str, blob_dir: str):
+    """Current DataLoader layout: SectionRecords, text in the shared blob"""
+    from pathlib import Path
+
+    from app.services.section_store import load_section_store
+
+    sections, _ = load_section_store(Path(data_dir) / "family_laws_final.json", blob_dir)
+    return sections, lambda section: section.section_text
+
+
+def worker(layout: str, data_dir: str, blob_dir: str):
+    """Load one layout, touch every text, then wait for the parent to measure"""
+    import structlog
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    if layout == "dicts":
+        sections, text_of = load_dicts(data_dir)
+    else:
+        sections, text_of = load_records(data_dir, blob_dir)
+    for act_sections in sections.values():
+        for section in act_sections.values():
+            text_of(section)
+    gc.collect()
+    print("ready", flush=True)
+    sys.stdin.readline()
+
+
+def smaps_rollup(pid: int) -> Dict[str, int]:
+    """Rss / Pss / Anonymous in KiB"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in ("Rss", "Pss", "Anonymous"):
+                values[name] = int(rest.split()[0])
+    return values
+
+
+def measure(layout: str, workers: int, data_dir: str, blob_dir: str) -> Dict[str, float]:
+    """Average smaps_rollup over `workers` concurrent processes"""
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.corpus_memory", "--worker", layout,
+             "--data-dir", data_dir, "--blob-dir", blob_dir],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+        for _ in range(workers)
+    ]
+    try:
+        for proc in procs:
+            if proc.stdout.readline().strip() != "ready":
+                raise SystemExit(f"{layout} worker failed")
+        samples = [smaps_rollup(proc.pid) for proc in procs]
+    finally:
+        for proc in procs:
+            proc.stdin.close()
+            proc.wait()
+    return {key: sum(s[key] for s in samples) / len(samples) for key in samples[0]}
+
+
+def baseline(workers: int) -> Dict[str, float]:
+    """Interpreter + imports, nothing loaded"""
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", "import json, structlog, app.services.section_store, sys; print('ready', flush=True); sys.stdin.readline()"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+        for _ in range(workers)
+    ]
+    try:
+        for proc in procs:
+            proc.stdout.readline()
+        samples = [smaps_rollup(proc.pid) for proc in procs]
+    finally:
+        for proc in procs:
+            proc.stdin.close()
+            proc.wait()
+    return {key: sum(s[key] for s in samples) / len(samples) for key in samples[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--blob-dir", help="Text blob directory (default: a temporary one)")
+    parser.add_argument("--worker", choices=LAYOUTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.data_dir, args.blob_dir)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        blob_dir = args.blob_dir or tmp
+        base = baseline(args.workers)
+        print(f"{args.workers} workers; KiB per worker above an idle interpreter "
+              f"(idle: RSS {base['Rss']:.0f}, PSS {base['Pss']:.0f})")
+        print(f"{'layout':<10} {'RSS':>8} {'PSS':>8} {'private':>8}")
+        for layout in LAYOUTS:
+            result = measure(layout, args.workers, args.data_dir, blob_dir)
+            print(
+                f"{layout:<10} {result['Rss'] - base['Rss']:>8.0f} {result['Pss'] - base['Pss']:>8.0f} "
+                f"{result['Anonymous'] - base['Anonymous']:>8.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Fake OpenAI server
+/v1/chat/completions stand-in for load tests: replays tool-call sequences, streams, sleeps
+
+Each turn follows a scenario picked at random on its first call (weights
+from FAKE_OPENAI_SCENARIOS). Later calls of the turn continue from the tool
+calls already in the messages, so the app executes real tools on real data:
+- direct: answers at once
+- intent: get_legal_knowledge + get_procedural_guidance, then answers
+- search: search_legal_sections browse, a drill-down on sections picked
+  from the browse result, then answers
+Calls without tools (rolling summaries) and first calls that already carry
+tool results (intent fast path) get a text answer.
+
+Latency per call is log-normal: median FAKE_OPENAI_LATENCY_MS, spread
+FAKE_OPENAI_LATENCY_SIGMA (0 = fixed). Streamed answers arrive in chunks
+FAKE_OPENAI_CHUNK_MS apart after that latency.
+
+Run:
+    FAKE_OPENAI_LATENCY_MS=500 uvicorn benchmarks.fake_openai:app --port 8765
+    FAKE_OPENAI_SCENARIOS=direct:2,intent:5,search:3 FAKE_OPENAI_LATENCY_SIGMA=0.5 uvicorn benchmarks.fake_openai:app --port 8765
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+from app.tools.legal_tools import INTENT_ENUM, TOPIC_ENUM
+
+LATENCY_MS = float(os.getenv("FAKE_OPENAI_LATENCY_MS", "500"))
+LATENCY_SIGMA = float(os.getenv("FAKE_OPENAI_LATENCY_SIGMA", "0"))
+CHUNK_MS = float(os.getenv("FAKE_OPENAI_CHUNK_MS", "20"))
+SCENARIOS = {
+    name: float(weight)
+    for name, weight in (item.split(":") for item in os.getenv("FAKE_OPENAI_SCENARIOS", "direct:1").split(","))
+}
+
+ANSWER = "আপনি এখন নিরাপদ তো? আইন অনুযায়ী আপনার অধিকার আছে। প্রথমে নিকটস্থ থানায় অভিযোগ করুন, তারপর লিগ্যাল এইডে যোগাযোগ করুন।"
+SEARCH_CALLS = [
+    {"act_ids": ["305", "180"], "query": "স্বামী দ্বিতীয় বিয়ে করেছে অনুমতি ছাড়া"},
+    {"act_ids": ["138", "64"], "query": "বিধবা স্ত্রীর সম্পত্তিতে উত্তরাধিকার"},
+    {"act_ids": ["835", "1063"], "query": "যৌতুকের জন্য নির্যাতন"},
+    {"mode": "semantic", "query": "সন্তানের হেফাজত কে পাবে"},
+]
+
+app = FastAPI(title="Fake OpenAI")
+calls = Counter()
+
+
+def _latency() -> float:
+    """Seconds for one completion call"""
+    if LATENCY_SIGMA <= 0:
+        return LATENCY_MS / 1000
+    return random.lognormvariate(0, LATENCY_SIGMA) * LATENCY_MS / 1000
+
+
+def _tool_call(name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": f"call_{uuid.uuid4().hex[:12]}",
+        "type": "function",
+        "function": {"name": name, "arguments": json.dumps(arguments, ensure_ascii=False)},
+    }
+
+
+def _drill_down(messages: List[Dict[str, Any]], browse: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Second search call: full text for the top two sections of the browse result"""
+    for message in reversed(messages):
+        if message.get("role") == "tool":
+            try:
+                sections = json.loads(message["content"]).get("legal_sections", [])
+            except ValueError:
+                return None
+            picked = sections[:2]
+            if not picked:
+                return None
+            return {
+                "act_ids": sorted({section["act_id"] for section in picked}),
+                "section_numbers": [section["section_number"] for section in picked],
+                "query": browse.get("query", ""),
+            }
+    return None
+
+
+def next_step(body: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Tool calls for this completion call ([] = answer with text)"""
+    messages = body.get("messages", [])
+    if not body.get("tools") or body.get("tool_choice") == "none":
+        return []
+
+    turn_start = max(i for i, message in enumerate(messages) if message.get("role") == "user")
+    previous = [m for m in messages[turn_start + 1:] if m.get("role") == "assistant" and m.get("tool_calls")]
+    if not previous:
+        if messages[-1].get("role") == "tool":
+            return []  # fast path already ran the intent tools
+        scenario = random.choices(list(SCENARIOS), weights=list(SCENARIOS.values()))[0]
+        calls[f"scenario:{scenario}"] += 1
+        if scenario == "intent":
+            intent = random.choice(INTENT_ENUM)
+            return [
+                _tool_call("get_legal_knowledge", {"intent": intent}),
+                _tool_call("get_procedural_guidance", {"intent": intent, "topics": random.sample(TOPIC_ENUM, 2)}),
+            ]
+        if scenario == "search":
+            return [_tool_call("search_legal_sections", random.choice(SEARCH_CALLS))]
+        return []
+
+    last = previous[-1]["tool_calls"][0]["function"]
+    arguments = json.loads(last["arguments"] or "{}")
+    if len(previous) == 1 and last["name"] == "search_legal_sections" and "section_numbers" not in arguments:
+        drill_down = _drill_down(messages, arguments)
+        if drill_down:
+            return [_tool_call("search_legal_sections", drill_down)]
+    return []
+
+
+def _usage(body: Dict[str, Any]) -> Dict[str, int]:
+    prompt_tokens = sum(len(str(message.get("content") or "")) for message in body.get("messages", [])) // 3 + 1000
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": 60, "total_tokens": prompt_tokens + 60}
+
+
+def _chunk(body: Dict[str, Any], delta: Dict[str, Any], finish_reason: Optional[str] = None, usage=None) -> str:
+    chunk = {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [] if usage else [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    if usage:
+        chunk["usage"] = usage
+    return f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+
+
+async def _stream(body: Dict[str, Any], tool_calls: List[Dict[str, Any]]):
+    await asyncio.sleep(_latency())
+    if tool_calls:
+        for index, call in enumerate(tool_calls):
+            yield _chunk(body, {"tool_calls": [{"index": index, **call}]})
+        yield _chunk(body, {}, "tool_calls")
+    else:
+        words = ANSWER.split(" ")
+        for start in range(0, len(words), 4):
+            yield _chunk(body, {"content": " ".join(words[start:start + 4]) + " "})
+            await asyncio.sleep(CHUNK_MS / 1000)
+        yield _chunk(body, {}, "stop")
+    if (body.get("stream_options") or {}).get("include_usage"):
+        yield _chunk(body, {}, usage=_usage(body))
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    """Sleep for a sampled latency, then return the scenario's next tool calls or a text answer."""
+    body = await request.json()
+    tool_calls = next_step(body) if body.get("messages") else []
+    calls["completions"] += 1
+    calls["tool_call_responses" if tool_calls else "text_responses"] += 1
+
+    if body.get("stream"):
+        calls["streamed"] += 1
+        return StreamingResponse(_stream(body, tool_calls), media_type="text/event-stream")
+
+    await asyncio.sleep(_latency())
+    message = {"role": "assistant", "content": None if tool_calls else ANSWER}
+    if tool_calls:
+        message["tool_calls"] = tool_calls
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [{
+            "index": 0,
+            "message": message,
+            "finish_reason": "tool_calls" if tool_calls else "stop",
+        }],
+        "usage": _usage(body),
+    }
+
+
+@app.get("/stats")
+async def stats():
+    """Calls served so far, by kind and scenario."""
+    return dict(calls)
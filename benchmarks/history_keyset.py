@@ -0,0 +1,117 @@
+"""
+History fetch cost on a synthetic 10k-message session
+Compares the keyset page query against OFFSET paging and the old ASC window
+
+Uses an in-memory SQLite table with the same (session_id, created_at) index as
+supabase_schema.sql, so it runs anywhere. The shape of the result (keyset cost
+flat at any depth, OFFSET cost growing with depth) carries over to Postgres.
+
+Run:
+    python -m benchmarks.history_keyset --messages 10000 --page-size 50
+"""
+
+import argparse
+import sqlite3
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+KEYSET_LATEST = """
+    SELECT id, role, content, created_at FROM conversations
+    WHERE session_id = ?
+    ORDER BY created_at DESC, id DESC LIMIT ?
+"""
+
+KEYSET_BEFORE = """
+    SELECT id, role, content, created_at FROM conversations
+    WHERE session_id = ?
+      AND created_at <= ? AND (created_at < ? OR id < ?)
+    ORDER BY created_at DESC, id DESC LIMIT ?
+"""
+
+OFFSET_PAGE = """
+    SELECT id, role, content, created_at FROM conversations
+    WHERE session_id = ?
+    ORDER BY created_at DESC LIMIT ? OFFSET ?
+"""
+
+OLD_ASC_WINDOW = """
+    SELECT role, content, created_at FROM conversations
+    WHERE session_id = ?
+    ORDER BY created_at ASC LIMIT ?
+"""
+
+
+def build_db(messages: int) -> sqlite3.Connection:
+    """Create the conversations table with one long session plus background sessions"""
+    db = sqlite3.connect(":memory:")
+    db.execute("""
+        CREATE TABLE conversations (
+            id text PRIMARY KEY, profile_id text, session_id text,
+            role text, content text, created_at text
+        )
+    """)
+    db.execute("CREATE INDEX idx_conversations_session_created ON conversations(session_id, created_at ASC)")
+
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    content = "আমার স্বামী আমাকে মারধর করে। আমি কী করতে পারি? " * 8
+    rows = []
+    for session in ["long-session"] + [f"other-{i}" for i in range(50)]:
+        count = messages if session == "long-session" else 200
+        for i in range(count):
+            rows.append((
+                str(uuid.uuid4()), "profile", session,
+                "user" if i % 2 == 0 else "assistant", content,
+                (start + timedelta(seconds=i)).isoformat(),
+            ))
+    db.executemany("INSERT INTO conversations VALUES (?, ?, ?, ?, ?, ?)", rows)
+    db.commit()
+    return db
+
+
+def timed(db: sqlite3.Connection, sql: str, params: tuple, repeat: int) -> tuple:
+    samples = []
+    rows = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = db.execute(sql, params).fetchall()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(samples), rows
+
+
+def main(args):
+    db = build_db(args.messages)
+    session = "long-session"
+    all_rows = db.execute(
+        "SELECT id, created_at FROM conversations WHERE session_id = ? ORDER BY created_at DESC, id DESC",
+        (session,),
+    ).fetchall()
+
+    _, old_rows = timed(db, OLD_ASC_WINDOW, (session, args.page_size), 1)
+    latest_at = all_rows[0][1]
+    print(f"old ASC window returns messages up to {old_rows[-1][2]} (latest is {latest_at})")
+    print()
+    print(f"{'depth':>8} {'keyset µs':>10} {'offset µs':>10}")
+
+    for depth in args.depths:
+        depth = min(depth, args.messages - args.page_size)
+        if depth == 0:
+            keyset_us, _ = timed(db, KEYSET_LATEST, (session, args.page_size), args.repeat)
+        else:
+            cursor_id, cursor_at = all_rows[depth - 1]
+            keyset_us, _ = timed(
+                db, KEYSET_BEFORE,
+                (session, cursor_at, cursor_at, cursor_id, args.page_size), args.repeat,
+            )
+        offset_us, _ = timed(db, OFFSET_PAGE, (session, args.page_size, depth), args.repeat)
+        print(f"{depth:>8} {keyset_us:>10.0f} {offset_us:>10.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=10000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--depths", type=int, nargs="+", default=[0, 1000, 5000, 9950])
+    parser.add_argument("--repeat", type=int, default=50)
+    main(parser.parse_args())
@@ -0,0 +1,154 @@
+"""
+Intent classifier agreement with GPT
+Replays historical query_analytics rows through the local classifier
+
+The reference label is the intent GPT itself passed to get_legal_knowledge /
+get_procedural_guidance in `tools_used` (calls made by the fast path are
+skipped). Rows where GPT called neither tool are counted but not scored.
+Reports overall top-1 agreement, coverage and precision at the configured
+thresholds, a threshold sweep, per-intent results and the common confusions.
+
+Run:
+    python -m benchmarks.intent_agreement                      # reads Supabase (SUPABASE_URL/KEY)
+    python -m benchmarks.intent_agreement --input rows.jsonl   # exported rows (JSON array or JSONL)
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+import structlog
+
+INTENT_TOOLS = ("get_legal_knowledge", "get_procedural_guidance")
+
+
+def gpt_intent(tools_used: Any) -> Optional[str]:
+    """Intent chosen by the model in one analytics row, if any"""
+    if isinstance(tools_used, str):
+        tools_used = json.loads(tools_used or "[]")
+    for tool_use in tools_used or []:
+        if tool_use.get("fast_path"):
+            continue
+        if tool_use.get("tool") in INTENT_TOOLS:
+            intent = (tool_use.get("args") or {}).get("intent")
+            if intent:
+                return intent
+    return None
+
+
+def load_rows_file(path: str) -> List[Dict[str, Any]]:
+    """Rows exported from query_analytics as a JSON array or JSON lines"""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read().strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+async def load_rows_supabase(limit: int) -> List[Dict[str, Any]]:
+    """Most recent successful analytics rows from Supabase"""
+    from app.services.supabase_service import get_supabase_service
+
+    service = get_supabase_service()
+    if not service.enabled:
+        raise SystemExit("Supabase is not configured; pass --input with exported rows")
+    client = await service.connect()
+    result = await (
+        client.table("query_analytics")
+        .select("user_query, tools_used")
+        .eq("success", True)
+        .order("created_at", desc=True)
+        .limit(limit)
+        .execute()
+    )
+    return result.data or []
+
+
+def evaluate(classifier, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Classify every labeled row and collect (label, prediction) pairs"""
+    labeled = []
+    for row in rows:
+        label = gpt_intent(row.get("tools_used"))
+        if label and row.get("user_query"):
+            labeled.append((label, classifier.classify(row["user_query"])))
+    return {"rows": len(rows), "labeled": labeled}
+
+
+def report(classifier, evaluation: Dict[str, Any]):
+    """Print agreement, threshold sweep, per-intent results and confusions"""
+    labeled = evaluation["labeled"]
+    print(f"rows: {evaluation['rows']}   with a GPT intent: {len(labeled)}")
+    if not labeled:
+        return
+
+    top1 = sum(1 for label, p in labeled if p["intent"] == label)
+    print(f"top-1 agreement (all labeled rows): {top1 / len(labeled):.1%}")
+
+    confident = [(label, p) for label, p in labeled if p["confident"]]
+    correct = sum(1 for label, p in confident if p["intent"] == label)
+    print(
+        f"at min_score={classifier.min_score} min_margin={classifier.min_margin}: "
+        f"coverage {len(confident) / len(labeled):.1%}, "
+        f"precision {correct / len(confident):.1%}" if confident else "no confident predictions"
+    )
+
+    print("\nthreshold sweep (min_margin fixed)")
+    print(f"{'min_score':>10} {'coverage':>9} {'precision':>10}")
+    for min_score in (0.3, 0.35, 0.4, 0.42, 0.45, 0.5, 0.55, 0.6, 0.7):
+        chosen = [
+            (label, p) for label, p in labeled
+            if p["score"] >= min_score and p["margin"] >= classifier.min_margin
+        ]
+        precision = sum(1 for label, p in chosen if p["intent"] == label) / len(chosen) if chosen else 0.0
+        print(f"{min_score:>10.2f} {len(chosen) / len(labeled):>9.1%} {precision:>10.1%}")
+
+    print("\nper intent (GPT label)")
+    print(f"{'intent':<28} {'rows':>5} {'top-1':>7} {'fast path':>10} {'fp prec':>8}")
+    by_label = defaultdict(list)
+    for label, p in labeled:
+        by_label[label].append(p)
+    for label, predictions in sorted(by_label.items(), key=lambda item: -len(item[1])):
+        hits = sum(1 for p in predictions if p["intent"] == label)
+        fast = [p for p in predictions if p["confident"]]
+        fast_hits = sum(1 for p in fast if p["intent"] == label)
+        precision = f"{fast_hits / len(fast):.0%}" if fast else "-"
+        print(f"{label:<28} {len(predictions):>5} {hits / len(predictions):>7.0%} {len(fast):>10} {precision:>8}")
+
+    confusions = Counter(
+        (label, p["intent"]) for label, p in confident if p["intent"] != label
+    )
+    if confusions:
+        print("\nconfident disagreements (GPT -> classifier)")
+        for (label, predicted), count in confusions.most_common(10):
+            print(f"  {count:>4}  {label} -> {predicted}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", help="Exported query_analytics rows (JSON array or JSONL)")
+    parser.add_argument("--limit", type=int, default=5000, help="Rows to read from Supabase")
+    parser.add_argument("--min-score", type=float, help="Confidence threshold (default: classifier default)")
+    parser.add_argument("--min-margin", type=float, help="Lead over the runner-up (default: classifier default)")
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    from app.services.data_loader import get_data_loader
+    from app.services.intent_classifier import IntentClassifier
+
+    thresholds = {}
+    if args.min_score is not None:
+        thresholds["min_score"] = args.min_score
+    if args.min_margin is not None:
+        thresholds["min_margin"] = args.min_margin
+    classifier = IntentClassifier(get_data_loader(), **thresholds)
+
+    rows = load_rows_file(args.input) if args.input else asyncio.run(load_rows_supabase(args.limit))
+    report(classifier, evaluate(classifier, rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Concurrent /chat load test
+Shows that throughput scales with in-flight requests now that the request path is async
+
+Starts benchmarks.fake_openai on a local port, then drives the FastAPI app in-process
+(in-memory storage, no Supabase) at increasing concurrency levels.
+
+Run:
+    python -m benchmarks.load_chat --latency-ms 500 --levels 1 4 16 64
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+import structlog
+
+
+def start_fake_openai(port: int, latency_ms: float) -> subprocess.Popen:
+    """Start the fake OpenAI server in a subprocess and wait until it accepts connections."""
+    env = dict(os.environ, FAKE_OPENAI_LATENCY_MS=str(latency_ms))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.fake_openai:app",
+         "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        try:
+            httpx.post(f"http://127.0.0.1:{port}/v1/chat/completions", json={}, timeout=latency_ms / 1000 + 5)
+            return proc
+        except httpx.TransportError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("fake OpenAI server did not start")
+
+
+async def run_level(client: httpx.AsyncClient, concurrency: int, requests_per_worker: int) -> dict:
+    """Run `concurrency` workers, each sending sequential /chat requests."""
+    latencies = []
+
+    async def worker():
+        session = (await client.post("/chat/new", json={})).json()
+        for _ in range(requests_per_worker):
+            started = time.perf_counter()
+            response = await client.post("/chat", json={
+                "profile_id": session["profile_id"],
+                "session_id": session["session_id"],
+                "message": "আমার স্বামী আমাকে মারধর করে",
+            })
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+    }
+
+
+async def main(args):
+    from app.main import app  # Import after env is configured
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+        print(f"{'concurrency':>12} {'requests':>9} {'req/s':>8} {'p50 ms':>8}")
+        for level in args.levels:
+            r = await run_level(client, level, args.requests_per_worker)
+            print(f"{r['concurrency']:>12} {r['requests']:>9} {r['throughput_rps']:>8.2f} {r['p50_ms']:>8.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=500)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests-per-worker", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "bench")
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.port}/v1"
+    os.environ["SUPABASE_URL"] = ""
+    os.environ["SUPABASE_KEY"] = ""
+
+    server = start_fake_openai(args.port, args.latency_ms)
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    try:
+        asyncio.run(main(args))
+    finally:
+        server.terminate()
+        server.wait()
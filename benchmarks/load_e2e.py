@@ -0,0 +1,229 @@
+"""
+End-to-end load test
+Real uvicorn workers against local OpenAI and Supabase stand-ins: throughput, tail latency, per-stage cost
+
+Starts benchmarks.fake_openai (tool-call scenarios, log-normal latency),
+benchmarks.fake_supabase (PostgREST tables and RPCs in memory) and the app
+itself (`uvicorn app.main:app --workers N`), then at each concurrency level
+every worker opens sessions with /chat/new and sends several /chat turns.
+Reports req/s and p50/p95/p99 per level, per-stage p50/p95 from the
+Server-Timing header, and OpenAI / Supabase calls per turn from the fakes.
+
+Run:
+    python -m benchmarks.load_e2e --levels 1 8 32 --workers 2
+    python -m benchmarks.load_e2e --llm-latency-ms 1200 --llm-sigma 0.6 --scenarios direct:1,intent:6,search:3
+    python -m benchmarks.load_e2e --no-supabase  # in-memory storage, OpenAI stand-in only
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.fake_supabase import FAKE_SUPABASE_KEY
+
+MESSAGES = [
+    "আমার স্বামী আমাকে মারধর করে",
+    "স্বামী অনুমতি ছাড়া দ্বিতীয় বিয়ে করেছে, আমি কী করতে পারি?",
+    "তালাকের পর সন্তানের হেফাজত কে পাবে?",
+    "বাবার সম্পত্তিতে মেয়ের অংশ কত?",
+    "শ্বশুরবাড়ি থেকে যৌতুক চাইছে",
+    "দেনমোহর না দিলে কোথায় মামলা করব?",
+    "থানা জিডি নিতে চাইছে না",
+    "How do I register my marriage?",
+]
+
+# Server-Timing spans grouped into stages (llm_0, llm_1, ... -> llm)
+STAGES = ["history", "context", "llm", "tools", "store", "total"]
+
+
+def start_server(target: str, port: int, env: Dict[str, str], ready_path: str, log, extra_args=()) -> subprocess.Popen:
+    """Start a uvicorn app in a subprocess and wait until ready_path answers."""
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", target, "--port", str(port), "--log-level", "warning", *extra_args],
+        env=dict(os.environ, **env), stdout=log, stderr=subprocess.STDOUT,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            break
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}{ready_path}", timeout=5).status_code == 200:
+                return proc
+        except httpx.TransportError:
+            pass
+        time.sleep(0.25)
+    proc.terminate()
+    raise RuntimeError(f"{target} did not start (log: {log.name})")
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile (0 for no values)"""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    """Stage durations (ms) from a Server-Timing header"""
+    stages: Dict[str, float] = defaultdict(float)
+    for part in header.split(","):
+        name, _, duration = part.strip().partition(";dur=")
+        if duration:
+            stages[name.split("_")[0]] += float(duration)
+    return stages
+
+
+async def fake_stats(client: httpx.AsyncClient, url: Optional[str]) -> Dict[str, int]:
+    if url is None:
+        return {}
+    return (await client.get(f"{url}/stats")).json()
+
+
+async def run_level(client: httpx.AsyncClient, concurrency: int, sessions: int, turns: int) -> dict:
+    """Run `concurrency` workers, each opening `sessions` sessions of `turns` sequential /chat turns."""
+    latencies: List[float] = []
+    new_latencies: List[float] = []
+    stages: Dict[str, List[float]] = defaultdict(list)
+    errors = 0
+
+    async def worker(offset: int):
+        nonlocal errors
+        for s in range(sessions):
+            started = time.perf_counter()
+            response = await client.post("/chat/new", json={})
+            new_latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+                continue
+            session = response.json()
+            for t in range(turns):
+                started = time.perf_counter()
+                response = await client.post("/chat", json={
+                    "profile_id": session["profile_id"],
+                    "session_id": session["session_id"],
+                    "message": MESSAGES[(offset + s + t) % len(MESSAGES)],
+                })
+                if response.status_code != 200:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+                for stage, ms in parse_server_timing(response.headers.get("server-timing", "")).items():
+                    stages[stage].append(ms)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "turns": len(latencies),
+        "errors": errors,
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "new_p50_ms": percentile(new_latencies, 50) * 1000,
+        "stages": stages,
+    }
+
+
+def calls_per_turn(before: Dict[str, int], after: Dict[str, int], turns: int) -> Dict[str, float]:
+    """Counter deltas from a fake's /stats, per completed turn"""
+    return {
+        key: (after[key] - before.get(key, 0)) / max(turns, 1)
+        for key in sorted(after)
+        if not key.startswith("stored:") and after[key] != before.get(key, 0)
+    }
+
+
+async def main(args, app_url: str, openai_url: str, supabase_url: Optional[str]):
+    async with httpx.AsyncClient(base_url=app_url, timeout=300,
+                                 limits=httpx.Limits(max_connections=None, max_keepalive_connections=None)) as client:
+        await run_level(client, 1, 1, 1)  # warm-up: imports, semantic index, first connections
+
+        results = []
+        print(f"{'concurrency':>12} {'turns':>6} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'new p50':>8}")
+        for level in args.levels:
+            openai_before = await fake_stats(client, openai_url)
+            supabase_before = await fake_stats(client, supabase_url)
+            r = await run_level(client, level, args.sessions_per_worker, args.turns)
+            await asyncio.sleep(1.5)  # let the write-behind writer flush (WRITE_BEHIND_FLUSH_INTERVAL_MS)
+            r["openai"] = calls_per_turn(openai_before, await fake_stats(client, openai_url), r["turns"])
+            r["supabase"] = calls_per_turn(supabase_before, await fake_stats(client, supabase_url), r["turns"])
+            results.append(r)
+            print(f"{r['concurrency']:>12} {r['turns']:>6} {r['errors']:>7} {r['throughput_rps']:>8.2f} "
+                  f"{r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} {r['p99_ms']:>8.0f} {r['new_p50_ms']:>8.0f}")
+
+        print("\nper-stage ms from Server-Timing (p50 / p95)")
+        print(f"{'concurrency':>12} " + " ".join(f"{stage:>13}" for stage in STAGES))
+        for r in results:
+            cells = [f"{percentile(r['stages'][stage], 50):.0f} / {percentile(r['stages'][stage], 95):.0f}" for stage in STAGES]
+            print(f"{r['concurrency']:>12} " + " ".join(f"{cell:>13}" for cell in cells))
+
+        print("\ncalls per turn (includes /chat/new)")
+        for r in results:
+            openai = ", ".join(f"{key} {value:.2f}" for key, value in r["openai"].items() if not key.startswith("scenario:"))
+            supabase = ", ".join(f"{key} {value:.2f}" for key, value in r["supabase"].items())
+            print(f"{r['concurrency']:>12}  openai: {openai}")
+            if supabase:
+                print(f"{'':>12}  supabase: {supabase}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes for the app")
+    parser.add_argument("--sessions-per-worker", type=int, default=2)
+    parser.add_argument("--turns", type=int, default=3, help="/chat turns per session")
+    parser.add_argument("--llm-latency-ms", type=float, default=800, help="median completion latency")
+    parser.add_argument("--llm-sigma", type=float, default=0.5, help="log-normal spread (0 = fixed)")
+    parser.add_argument("--scenarios", default="direct:2,intent:5,search:3", help="tool-call scenario weights")
+    parser.add_argument("--db-latency-ms", type=float, default=15, help="median Supabase call latency")
+    parser.add_argument("--db-sigma", type=float, default=0.5)
+    parser.add_argument("--no-supabase", action="store_true", help="in-memory storage instead of the Supabase stand-in")
+    parser.add_argument("--port", type=int, default=8765, help="first of three consecutive ports")
+    args = parser.parse_args()
+
+    openai_port, supabase_port, app_port = args.port, args.port + 1, args.port + 2
+    openai_url = f"http://127.0.0.1:{openai_port}"
+    supabase_url = None if args.no_supabase else f"http://127.0.0.1:{supabase_port}"
+
+    servers = []
+    log = tempfile.NamedTemporaryFile("w", prefix="load_e2e_", suffix=".log", delete=False)
+    try:
+        servers.append(start_server("benchmarks.fake_openai:app", openai_port, {
+            "FAKE_OPENAI_LATENCY_MS": str(args.llm_latency_ms),
+            "FAKE_OPENAI_LATENCY_SIGMA": str(args.llm_sigma),
+            "FAKE_OPENAI_SCENARIOS": args.scenarios,
+        }, "/stats", log))
+        if supabase_url:
+            servers.append(start_server("benchmarks.fake_supabase:app", supabase_port, {
+                "FAKE_SUPABASE_LATENCY_MS": str(args.db_latency_ms),
+                "FAKE_SUPABASE_LATENCY_SIGMA": str(args.db_sigma),
+            }, "/stats", log))
+        servers.append(start_server("app.main:app", app_port, {
+            "OPENAI_API_KEY": "bench",
+            "OPENAI_BASE_URL": f"{openai_url}/v1",
+            "SUPABASE_URL": supabase_url or "",
+            "SUPABASE_KEY": FAKE_SUPABASE_KEY if supabase_url else "",
+            "SEMANTIC_EMBEDDER": "hashing",  # the fake serves no embeddings
+        }, "/health", log, ("--workers", str(args.workers))))
+
+        print(f"app: {args.workers} worker(s); openai: {args.llm_latency_ms:g}ms median, sigma {args.llm_sigma:g}, "
+              f"{args.scenarios}; supabase: {f'{args.db_latency_ms:g}ms median, sigma {args.db_sigma:g}' if supabase_url else 'off'}")
+        print(f"server log: {log.name}\n")
+        asyncio.run(main(args, f"http://127.0.0.1:{app_port}", openai_url, supabase_url))
+    finally:
+        for server in reversed(servers):
+            server.terminate()
+            server.wait()
+        log.close()
@@ -0,0 +1,97 @@
+"""
+Supabase calls per chat turn, with and without the profile cache
+Counts RPCs and inserts issued by SupabaseService against a counting stand-in client
+
+Each simulated user opens a session (/chat/new → ensure_profile) and sends
+several messages (store_turn + log_analytics per turn). The write-behind writer
+is disabled so every call is visible.
+
+Run:
+    python -m benchmarks.profile_cache_calls --profiles 50 --turns 10
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+from collections import Counter
+
+import structlog
+
+
+class _Request:
+    def __init__(self, counter: Counter, key: str):
+        self._counter = counter
+        self._key = key
+
+    async def execute(self):
+        self._counter[self._key] += 1
+        return type("Result", (), {"data": [{"id": "bench"}]})()
+
+
+class _Table:
+    def __init__(self, counter: Counter, name: str):
+        self._counter = counter
+        self._name = name
+
+    def insert(self, rows):
+        return _Request(self._counter, f"insert:{self._name}")
+
+
+class CountingClient:
+    """Stand-in for the async Supabase client that only counts calls"""
+
+    def __init__(self):
+        self.calls: Counter = Counter()
+
+    def rpc(self, name, params=None):
+        return _Request(self.calls, f"rpc:{name}")
+
+    def table(self, name):
+        return _Table(self.calls, name)
+
+
+async def simulate(cache_enabled: bool, profiles: int, turns: int) -> Counter:
+    from app.services.profile_cache import ProfileCache
+    from app.services.supabase_service import SupabaseService
+
+    service = SupabaseService()
+    service.client = CountingClient()
+    if not cache_enabled:
+        service.profile_cache = ProfileCache(max_size=0)
+
+    for p in range(profiles):
+        profile_id = f"profile-{p}"
+        await service.ensure_profile(profile_id)
+        for _ in range(turns):
+            await service.store_turn(profile_id, f"session-{p}", "প্রশ্ন", "উত্তর")
+            await service.log_analytics(profile_id=profile_id, user_query="প্রশ্ন", model="bench")
+
+    # One debounced bulk UPDATE covers every touched profile
+    await service.flush_profile_touches()
+    return service.client.calls
+
+
+async def main(args):
+    total_turns = args.profiles * args.turns
+    for label, cache_enabled in (("no cache", False), ("profile cache", True)):
+        calls = await simulate(cache_enabled, args.profiles, args.turns)
+        total = sum(calls.values())
+        rpcs = sum(count for key, count in calls.items() if key.startswith("rpc:"))
+        print(f"{label:>14}: {total / total_turns:.2f} Supabase calls/turn "
+              f"({rpcs / total_turns:.2f} RPC/turn) {dict(calls)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "bench")
+    os.environ["SUPABASE_URL"] = "http://supabase.invalid"
+    os.environ["SUPABASE_KEY"] = "bench"
+    os.environ["WRITE_BEHIND_ENABLED"] = "false"
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    asyncio.run(main(args))
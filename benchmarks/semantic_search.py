@@ -0,0 +1,93 @@
+"""
+Semantic search cost per query
+One matrix-vector product over every section vs. scoring rows one by one
+
+Builds the index with the local hashing embedder (nothing is written),
+checks that both scorers return the same top sections, then times
+queries across all acts and restricted to a few acts.
+
+Run:
+    python -m benchmarks.semantic_search --iterations 500
+"""
+
+import argparse
+import logging
+import statistics
+import time
+from typing import List, Optional, Tuple
+
+import structlog
+
+QUERIES = [
+    "সন্তানের হেফাজত কে পাবে",
+    "স্বামী দ্বিতীয় বিয়ে করেছে অনুমতি ছাড়া",
+    "বিধবা স্ত্রীর সম্পত্তিতে উত্তরাধিকার",
+    "যৌতুক চাইলে শাস্তি",
+    "maintenance after divorce",
+    "guardian of a minor's property",
+]
+
+
+def per_row_search(index, query: str, act_ids: Optional[List[str]] = None, limit: int = 30) -> List[Tuple[str, str, float]]:
+    """Previous style: a Python loop with one dot product per section"""
+    from app.services.semantic_index import MIN_SCORE
+
+    vector = index.embedder.embed([query])[0]
+    wanted = set(act_ids) if act_ids is not None else None
+    scored = []
+    for row, (act_id, section_number) in enumerate(index.keys):
+        if wanted is not None and act_id not in wanted:
+            continue
+        score = float(index.matrix[row].dot(vector))
+        if score > MIN_SCORE:
+            scored.append((act_id, section_number, score))
+    scored.sort(key=lambda item: -item[2])
+    return scored[:limit]
+
+
+def median_us(fn, calls, iterations: int) -> float:
+    samples = []
+    for i in range(iterations):
+        query, act_ids = calls[i % len(calls)]
+        started = time.perf_counter()
+        fn(query, act_ids)
+        samples.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    from app.services.data_loader import get_data_loader
+    from app.services.semantic_index import HashingEmbedder, build_index
+
+    loader = get_data_loader()
+    started = time.perf_counter()
+    index, _ = build_index(loader, HashingEmbedder())
+    build_ms = (time.perf_counter() - started) * 1000
+    print(f"built {index.size} x {index.matrix.shape[1]} in {build_ms:.0f}ms ({index.matrix.nbytes // 1024} KiB)")
+
+    mixes = {
+        "all acts": [(query, None) for query in QUERIES],
+        "3 acts": [(query, ["305", "835", "1119"]) for query in QUERIES],
+    }
+    for calls in mixes.values():
+        for query, act_ids in calls:
+            vectorized = [(a, s) for a, s, _ in index.search(query, act_ids)]
+            looped = [(a, s) for a, s, _ in per_row_search(index, query, act_ids)]
+            assert vectorized[:10] == looped[:10], (query, act_ids)
+    print(f"same top sections for {sum(len(calls) for calls in mixes.values())} queries")
+
+    print(f"\n{'scope':<10} {'per-row µs':>11} {'matrix µs':>10} {'speedup':>8}")
+    for scope, calls in mixes.items():
+        before = median_us(lambda query, act_ids: per_row_search(index, query, act_ids), calls, args.iterations)
+        after = median_us(index.search, calls, args.iterations)
+        print(f"{scope:<10} {before:>11.0f} {after:>10.0f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Tool result size: field projection and per-tool token budgets
+Estimated tokens each tool message adds to every later completion call
+
+Compares, per tool, the results as previously sent (semantic_summary next
+to every full section text), after projection, and after the configured
+budgets (settings defaults unless overridden), over every intent and a set
+of typical search_legal_sections calls.
+
+Run:
+    python -m benchmarks.tool_payload_size
+    python -m benchmarks.tool_payload_size --search-budget 4000
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+from typing import Any, Dict, List, Tuple
+
+import structlog
+
+from app.config import Settings
+
+DEFAULTS = Settings.model_fields
+
+SEARCH_CALLS = [
+    {"act_ids": ["138"]},
+    {"act_ids": ["835", "1063", "1256"]},
+    {"act_ids": ["305", "180"], "section_numbers": ["৬", "৭"]},
+    {"act_ids": ["305", "180"], "query": "স্বামী দ্বিতীয় বিয়ে করেছে অনুমতি ছাড়া"},
+    {"act_ids": ["138", "64"], "query": "বিধবা স্ত্রীর সম্পত্তিতে উত্তরাধিকার"},
+    {"act_ids": ["138", "27"], "query": "বিধবা সম্পত্তি", "section_numbers": ["৩২", "৫"]},
+    {"act_ids": ["138", "27", "1119"]},
+]
+
+
+def unprojected(loader, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Previous shape: full-text sections also carried their semantic_summary"""
+    sections = []
+    for section in result.get("legal_sections", []):
+        if "section_text" in section:
+            record = loader.sections[section["act_id"]][section["section_number"]]
+            section = {**section, "semantic_summary": record.semantic_summary}
+        sections.append(section)
+    return {**result, "legal_sections": sections} if "legal_sections" in result else result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--legal-knowledge-budget", type=int, default=DEFAULTS["tool_budget_legal_knowledge_tokens"].default)
+    parser.add_argument("--guidance-budget", type=int, default=DEFAULTS["tool_budget_procedural_guidance_tokens"].default)
+    parser.add_argument("--search-budget", type=int, default=DEFAULTS["tool_budget_search_tokens"].default)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    from app.services.context_builder import estimate_tokens
+    from app.services.data_loader import get_data_loader
+    from app.services.tool_executor import ToolExecutor
+    from app.tools.legal_tools import INTENT_ENUM, _to_json, execute_tool
+
+    loader = get_data_loader()
+    executor = ToolExecutor(cache_size=0, budgets={
+        "get_legal_knowledge": args.legal_knowledge_budget,
+        "get_procedural_guidance": args.guidance_budget,
+        "search_legal_sections": args.search_budget,
+    })
+
+    mixes: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {
+        "get_legal_knowledge": [("get_legal_knowledge", {"intent": intent}) for intent in INTENT_ENUM],
+        "get_procedural_guidance": [
+            ("get_procedural_guidance", {"intent": intent, "topics": ["file_fir", "evidence_collection", "get_legal_aid"]})
+            for intent in INTENT_ENUM
+        ],
+        "search_legal_sections": [("search_legal_sections", arguments) for arguments in SEARCH_CALLS],
+    }
+
+    print(f"\nestimated tokens per result (budgets: legal {args.legal_knowledge_budget}, "
+          f"guidance {args.guidance_budget}, search {args.search_budget}; 0 = none)")
+    print(f"{'tool':<26} {'calls':>5} {'before':>8} {'projected':>10} {'budgeted':>9} {'max':>7} {'trimmed':>8} {'saved':>6}")
+    for tool_name, calls in mixes.items():
+        before = [estimate_tokens(_to_json(unprojected(loader, execute_tool(name, arguments)))) for name, arguments in calls]
+        projected = [estimate_tokens(_to_json(execute_tool(name, arguments))) for name, arguments in calls]
+        results = asyncio.run(executor.run(calls))
+        budgeted = [info["tokens"] for _, info in results]
+        trimmed = sum(1 for _, info in results if info.get("trimmed"))
+        saved = 1 - sum(budgeted) / sum(before)
+        print(
+            f"{tool_name:<26} {len(calls):>5} {statistics.mean(before):>8.0f} {statistics.mean(projected):>10.0f} "
+            f"{statistics.mean(budgeted):>9.0f} {max(budgeted):>7} {trimmed:>8} {saved:>6.0%}"
+        )
+    executor.close()
+
+
+if __name__ == "__main__":
+    main()
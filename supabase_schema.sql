@@ -70,6 +70,12 @@ CREATE TABLE query_analytics (
     tokens_used integer DEFAULT 0,
     response_time_ms integer DEFAULT 0,
     model text,
+    context_tokens_saved integer DEFAULT 0,  -- history tokens avoided by summarization
+    dedup_tokens_saved integer DEFAULT 0,  -- repeated law text replaced by references within a turn
+    prompt_tokens integer DEFAULT 0,
+    cached_tokens integer DEFAULT 0,  -- prompt tokens served from OpenAI's prompt cache
+    response_cache text,  -- 'hit' / 'miss' for cacheable first turns, NULL otherwise
+    timings jsonb,  -- {"total_ms", "spans": [{"name", "start_ms", "ms"}]} per pipeline stage
 
     -- Success tracking
     success boolean DEFAULT true,
@@ -168,7 +174,17 @@ BEGIN
 END;
 $$;
 
--- Get conversation history
+-- Bulk-update last_active for profiles seen since the last flush
+CREATE OR REPLACE FUNCTION touch_profiles(p_profile_ids text[])
+RETURNS void
+LANGUAGE sql
+AS $$
+    UPDATE user_profiles
+    SET last_active = now()
+    WHERE profile_id = ANY(p_profile_ids);
+$$;
+
+-- Get conversation history (most recent p_limit messages, chronological order)
 CREATE OR REPLACE FUNCTION get_conversation_history(
     p_session_id text,
     p_limit integer DEFAULT 50
@@ -178,12 +194,46 @@ LANGUAGE plpgsql
 AS $$
 BEGIN
     RETURN QUERY
-    SELECT c.role, c.content, c.created_at
+    SELECT h.role, h.content, h.created_at
+    FROM (
+        SELECT c.role, c.content, c.created_at
+        FROM conversations c
+        WHERE c.session_id = p_session_id
+        ORDER BY c.created_at DESC
+        LIMIT p_limit
+    ) h
+    ORDER BY h.created_at ASC;
+END;
+$$;
+
+-- Get one page of conversation history, newest first (keyset pagination)
+-- metadata carries the rolling context summary on assistant rows
+-- Walks idx_conversations_session_created backwards from the cursor, so the
+-- cost is the same for the latest page and for a page 10k messages back.
+-- (p_before_created_at, p_before_id) is the oldest row of the previous page.
+DROP FUNCTION IF EXISTS get_conversation_page(text, integer, timestamptz, uuid);
+CREATE OR REPLACE FUNCTION get_conversation_page(
+    p_session_id text,
+    p_limit integer DEFAULT 50,
+    p_before_created_at timestamptz DEFAULT NULL,
+    p_before_id uuid DEFAULT NULL
+)
+RETURNS TABLE (id uuid, role text, content text, metadata jsonb, created_at timestamptz)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT c.id, c.role, c.content, c.metadata, c.created_at
     FROM conversations c
     WHERE c.session_id = p_session_id
-    ORDER BY c.created_at ASC
+      AND (
+          p_before_created_at IS NULL
+          OR (
+              c.created_at <= p_before_created_at
+              AND (c.created_at < p_before_created_at OR c.id < p_before_id)
+          )
+      )
+    ORDER BY c.created_at DESC, c.id DESC
     LIMIT p_limit;
-END;
 $$;
 
 -- Get intent analytics
@@ -211,3 +261,40 @@ BEGIN
     ORDER BY COUNT(*) DESC;
 END;
 $$;
+
+-- Prompt-cache hit ratio per intent
+CREATE OR REPLACE FUNCTION get_prompt_cache_analytics()
+RETURNS TABLE (
+    intent text,
+    total_queries bigint,
+    prompt_tokens bigint,
+    cached_tokens bigint,
+    cached_ratio numeric
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        COALESCE(intent_detected, '(none)')::text,
+        COUNT(*)::bigint,
+        SUM(query_analytics.prompt_tokens)::bigint,
+        SUM(query_analytics.cached_tokens)::bigint,
+        ROUND(SUM(query_analytics.cached_tokens)::numeric / NULLIF(SUM(query_analytics.prompt_tokens), 0)::numeric * 100, 2)
+    FROM query_analytics
+    WHERE success = true
+    GROUP BY COALESCE(intent_detected, '(none)')
+    ORDER BY COUNT(*) DESC;
+END;
+$$;
+
+-- ========================================
+-- MIGRATIONS (existing deployments)
+-- Safe to re-run; the CREATE TABLE statements above already include these
+-- ========================================
+ALTER TABLE query_analytics ADD COLUMN IF NOT EXISTS context_tokens_saved integer DEFAULT 0;
+ALTER TABLE query_analytics ADD COLUMN IF NOT EXISTS prompt_tokens integer DEFAULT 0;
+ALTER TABLE query_analytics ADD COLUMN IF NOT EXISTS cached_tokens integer DEFAULT 0;
+ALTER TABLE query_analytics ADD COLUMN IF NOT EXISTS response_cache text;
+ALTER TABLE query_analytics ADD COLUMN IF NOT EXISTS dedup_tokens_saved integer DEFAULT 0;
+ALTER TABLE query_analytics ADD COLUMN IF NOT EXISTS timings jsonb;